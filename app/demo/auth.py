@@ -8,7 +8,6 @@ _logger = logging.getLogger(__name__)
 _logger.addHandler(logging.StreamHandler(sys.stdout))
 
 from typing_extensions import Annotated
-from asyncer import asyncify
 from fastapi import APIRouter, Header, Request
 
 from snapapi import SNAPRoute, SNAPLog
@@ -19,7 +18,7 @@ from snapapi.model.oauth2 import (
     )
 from snapapi.codes import SERVICE_CODE_OAUTH2
 from app.setting import TOKEN_EXPIRE
-from app.demo.setting import Crypto, NAMESPACE
+from app.demo.setting import Registry, NAMESPACE, LogQueue
 from app.demo.backend import logger
 
 class SNAPOAuth2(SNAPRoute):
@@ -30,7 +29,8 @@ class SNAPOAuth2(SNAPRoute):
         self.logger = SNAPLog(
                 namespace=NAMESPACE, 
                 service_code=SERVICE_CODE_OAUTH2,
-                backend=logger
+                backend=logger,
+                queue=LogQueue
             )
 
 router = APIRouter(route_class=SNAPOAuth2)
@@ -167,7 +167,9 @@ async def access_token_b2b(
     |4017301        |Invalid Token (B2B)            |
     """
     request_headers = dict(headers)
-    access_token = await asyncify(Crypto.create_access_token)(
+    # Partner berdasarkan X-CLIENT-KEY
+    Crypto = Registry.lookup_oauth2(request_headers)
+    access_token = await Crypto.create_access_token_async(
             request_headers = request_headers,
             expires_in=TOKEN_EXPIRE
         )
@@ -2,7 +2,7 @@
 # SNAP-API Demo: Backend
 # Author: S Deta Harvianto <sdetta@gmail.com>
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 from pprint import pformat as pp
 
 
@@ -17,4 +17,11 @@ async def logger(log: Dict[str, Any]) -> None:
         # Tips: Celery lebih cocok untuk tugas ini, karena Exception
         # akan dikelola oleh Celery; misal retries management dll
         pass
+    return None
+
+
+async def logger_batch(logs: List[Dict[str, Any]]) -> None:
+    """ SNAPLogQueue: sekali kirim untuk beberapa log, misal bulk insert """
+    for log in logs:
+        await logger(log)
     return None
\ No newline at end of file
@@ -8,7 +8,8 @@ from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from snapapi import SNAPAPI, SNAPResponse
-from app.demo.setting import Cache
+from snapapi.middleware import SNAPBodyDigestMiddleware
+from app.demo.setting import Cache, Registry, LogQueue
 
 app = SNAPAPI(
         title='SNAP-API Demo',
@@ -26,6 +27,27 @@ app.add_middleware(
         allow_methods=["GET", "POST"],
         allow_headers=["*"]
     )
+app.add_middleware(SNAPBodyDigestMiddleware)
+
+@app.on_event('startup')
+async def startup() -> None:
+    # hot reload config dan cert Partner
+    Registry.start(interval=5)
+    # process pool SHA256withRSA (jika CRYPTO_WORKERS) dan kalibrasi
+    # strategi eksekusi crypto, di luar event loop
+    await Registry.warm_up()
+    # connection pool redis/memcached
+    await Cache.open()
+    if LogQueue:
+        LogQueue.start()
+
+@app.on_event('shutdown')
+async def shutdown() -> None:
+    Registry.shutdown()
+    await Cache.close()
+    # kirim sisa log di antrian
+    if LogQueue:
+        await LogQueue.close()
 
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(
@@ -42,7 +64,10 @@ async def http_exception_handler(
     """
     if exc.status_code >=500:
         request_headers = dict(request.headers)
-        await Cache.delete(key=request_headers['x-external-id'])
+        await Cache.delete(
+                key=request_headers['x-external-id'],
+                partner=request_headers.get('x-partner-id', '')
+            )
     return SNAPResponse(
             status_code=exc.status_code, 
             content=exc.detail,
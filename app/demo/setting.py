@@ -3,23 +3,42 @@
 # Author: S Deta Harvianto <sdetta@gmail.com>
 
 from snapapi.cache import SNAPCache
-from snapapi.security.crypto import SNAPCrypto
+from snapapi.logger import SNAPLogQueue
+from snapapi.security.registry import SNAPKeyRegistry
 
+from app.demo.backend import logger_batch
 from app.setting import (
         config, 
         CONFIG_PATH, 
         TIMEOUT,
         CACHE,
+        CACHE_POOL_SIZE,
+        CACHE_PARTITION,
+        CACHE_BLOOM_CAPACITY,
+        CACHE_REPLAY,
+        CACHE_FALLBACK,
+        CACHE_JOURNAL,
+        CACHE_NODES,
+        CACHE_COMPACT_KEYS,
+        CACHE_REPLICAS,
+        CACHE_VALUE_SIZE,
+        LOG_QUEUE_SIZE,
+        LOG_BATCH_SIZE,
+        LOG_BATCH_INTERVAL,
+        LOG_POLICY,
+        CRYPTO_WORKERS,
+        CRYPTO_EXECUTION,
+        CRYPTO_BACKEND,
+        SIGNATURE_CACHE_TTL,
+        TIMESTAMP_SKEW,
         MEMCACHED_HOST, MEMCACHED_PORT,
-        REDIS_HOST, REDIS_PORT, REDIS_DB
+        REDIS_HOST, REDIS_PORT, REDIS_DB,
+        SHARED_PATH
     )
 
 config_demo = config['demo']
 NAMESPACE = config_demo['namespace']
 FLOW = 'inbound'
-CLIENT_ID = config_demo['client_id']
-CLIENT_SECRET = config_demo['client_secret']
-TOKEN_PASSPHRASE = config_demo['token_passphrase']
 
 # Hanya Flow API -> Bank yang punya Private Key
 # private_key_file = CONFIG_PATH / f'{NAMESPACE}.key.pem'
@@ -28,13 +47,9 @@ TOKEN_PASSPHRASE = config_demo['token_passphrase']
 # if oct(private_key_file.stat().st_mode)[-3:] != '600':
 #     raise SystemError(f"{private_key_file} permission harus diset 600")
 
-# Apapun flownya, Public Cert harusnya selalu ada
-public_cert_file = CONFIG_PATH / f'{NAMESPACE}.cert.pem'
-with open(public_cert_file, 'rb') as public_cert:
-    PUBLIC_CERT = public_cert.read()
-if oct(public_cert_file.stat().st_mode)[-3:] != '600':
-    raise SystemError(f"{public_cert_file} permission harus diset 600")
-
+# Apapun flownya, Public Cert harusnya selalu ada: {namespace}.cert.pem
+# Cert lama saat rotasi: {namespace}.cert.{apapun}.pem
+# Semua Partner (section yang punya client_id) diload oleh SNAPKeyRegistry
 
 # Di-instantiate sekali saat loading
 HOST = PORT = DB = None
@@ -50,12 +65,36 @@ Cache = SNAPCache(NAMESPACE,
             host=HOST,
             port=PORT,
             db=DB,
-            timeout=TIMEOUT
+            timeout=TIMEOUT,
+            pool_size=CACHE_POOL_SIZE,
+            path=SHARED_PATH,
+            partition=CACHE_PARTITION,
+            bloom_capacity=CACHE_BLOOM_CAPACITY,
+            fallback=CACHE_FALLBACK,
+            journal=CACHE_JOURNAL,
+            nodes=CACHE_NODES,
+            replicas=CACHE_REPLICAS,
+            compact_keys=CACHE_COMPACT_KEYS,
+            value_size=CACHE_VALUE_SIZE
+        )
+
+# Log dikirim per batch di background, dipakai bersama semua endpoint
+LogQueue = None
+if LOG_QUEUE_SIZE:
+    LogQueue = SNAPLogQueue(logger_batch,
+            maxsize=LOG_QUEUE_SIZE,
+            batch_size=LOG_BATCH_SIZE,
+            batch_interval=LOG_BATCH_INTERVAL,
+            policy=LOG_POLICY
         )
 
-Crypto = SNAPCrypto(
-        client_id = CLIENT_ID,
-        client_secret = CLIENT_SECRET,
-        public_cert = PUBLIC_CERT,
-        token_passphrase = TOKEN_PASSPHRASE
-    )
\ No newline at end of file
+# Partner dicari berdasarkan X-CLIENT-KEY / X-PARTNER-ID,
+# config dan cert direload otomatis, lihat main.py
+Registry = SNAPKeyRegistry(
+        execution = CRYPTO_EXECUTION,
+        token_cache_size = 1024,
+        signature_cache_ttl = SIGNATURE_CACHE_TTL,
+        timestamp_skew = TIMESTAMP_SKEW,
+        crypto_workers = CRYPTO_WORKERS,
+        backend = CRYPTO_BACKEND
+    ).load(CONFIG_PATH)
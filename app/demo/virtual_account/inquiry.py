@@ -8,7 +8,6 @@ _logger = logging.getLogger(__name__)
 _logger.addHandler(logging.StreamHandler(sys.stdout))
 
 from typing_extensions import Annotated
-from asyncer import asyncify
 from fastapi import APIRouter, Header, Request, Depends, Body
 
 from snapapi import SNAPRoute, SNAPLog
@@ -22,7 +21,7 @@ from snapapi.exceptions import TransactionConflict
 from snapapi import tools
 from snapapi.codes import SERVICE_CODE_VIRTUAL_ACCOUNT_INQUIRY
 from snapapi.security.oauth2 import Oauth2ClientCredentials
-from app.demo.setting import Cache, Crypto, NAMESPACE
+from app.demo.setting import Cache, Registry, NAMESPACE, CACHE_REPLAY, LogQueue
 from app.demo.billing import BillDemo
 from app.demo.backend import logger
 Bill = BillDemo(service_code=SERVICE_CODE_VIRTUAL_ACCOUNT_INQUIRY)
@@ -36,8 +35,12 @@ class VAInquiryOAuth2(SNAPRoute):
         self.logger = SNAPLog(
                 namespace=NAMESPACE, 
                 service_code=SERVICE_CODE_VIRTUAL_ACCOUNT_INQUIRY,
-                backend=logger
+                backend=logger,
+                queue=LogQueue
             )
+        # retry dengan X-External-Id yang sama mendapat response pertama
+        if CACHE_REPLAY:
+            self.replay_cache = Cache
 
 router = APIRouter(route_class=VAInquiryOAuth2)
 oauth2_scheme = Oauth2ClientCredentials(
@@ -46,9 +49,14 @@ oauth2_scheme = Oauth2ClientCredentials(
         tokenUrl='/snap/v1.0/access-token/b2b'
     )
 async def verify_token(
-        access_token: Annotated[str, Depends(oauth2_scheme)]
+        access_token: Annotated[str, Depends(oauth2_scheme)],
+        x_partner_id: Annotated[str, Header()]
     ) -> str:
-    await asyncify(Crypto.verify_access_token)(access_token)
+    # Partner berdasarkan X-PARTNER-ID. Tanpa Header tsb dependency ini
+    # tidak dipanggil, validasi Header yang menjawab 400 Missing
+    # Mandatory Field
+    Crypto = Registry.lookup_transactional({'x-partner-id': x_partner_id})
+    await Crypto.verify_access_token_async(access_token)
     return access_token
 
 @router.post(
@@ -93,16 +101,20 @@ async def inquiry(
     HTTP Status Code sesuai dengan 3 digit pertama dari `responseCode`
     """
     request_headers: dict = headers.model_dump()
-    request_body: dict = await request.json()
+    # raw body, dibaca sekali oleh SNAPRoute; tidak perlu parse JSON ulang
+    request_body: bytes = request.state.x_body
     account: str = body.virtualAccountNo.strip()
 
     #1 Check Signature
-    await asyncify(Crypto.verify_signature_transactional)(
+    Crypto = Registry.lookup_transactional(request_headers)
+    await Crypto.verify_signature_transactional_async(
             path = '/snap/v1.0/transfer-va/inquiry',
             http_method = 'POST',
             access_token = access_token,
             request_headers = request_headers,
-            request_body = request_body
+            request_body = request_body,
+            # dihitung oleh SNAPBodyDigestMiddleware saat body diterima
+            request_body_digest = getattr(request.state, 'x_body_digest', None)
         )
     
     #2 Cache X-External-Id, mencegah duplicate request
@@ -110,7 +122,8 @@ async def inquiry(
     try:
         await Cache.add(
                 key=request_headers['x_external_id'],
-                ttl=ttl
+                ttl=ttl,
+                partner=request_headers['x_partner_id']
             )
     except ValueError:
         raise TransactionConflict()
@@ -7,6 +7,7 @@ import os
 import functools
 
 from pathlib import Path
+from typing import Dict, Any
 from configparser import ConfigParser
 
 HOMEDIR = Path.home()
@@ -45,6 +46,58 @@ CACHE = config_idsnap.get('cache')
 TOKEN_EXPIRE = int(config_idsnap.get('token_expire', 60*15 - 1))
 # detik, Timeout SNAP 10 detik, 1 detik sebagai overhead
 TIMEOUT = int(config_idsnap.get('timeout', 9))
+# detik, cache OAuth2 Signature yang valid saat Bank retry, 0 = off
+SIGNATURE_CACHE_TTL = int(config_idsnap.get('signature_cache_ttl', 60))
+# detik, selisih maksimal X-TIMESTAMP dengan waktu server
+TIMESTAMP_SKEW = int(config_idsnap.get('timestamp_skew', 300))
+# jumlah process untuk operasi RSA, 0 berarti pakai thread pool
+CRYPTO_WORKERS = int(config_idsnap.get('crypto_workers', 0))
+# backend RSA: 'pycryptodome' (default) atau 'cryptography'
+CRYPTO_BACKEND: Any = config_idsnap.get('crypto_backend', 'pycryptodome')
+# strategi eksekusi crypto: 'inline', 'thread' atau 'process'
+# jika tidak diisi, diukur saat startup oleh SNAPCrypto.calibrate()
+CRYPTO_EXECUTION: Dict[Any, Any] = {
+        operation: config_idsnap[key]
+        for operation, key in (
+                ('SHA256withRSA', 'execution_rsa'),
+                ('HMAC-SHA512', 'execution_hmac'),
+                ('JWT', 'execution_jwt')
+            )
+        if config_idsnap.get(key)
+    }
+
+# jumlah koneksi per worker ke redis/memcached
+CACHE_POOL_SIZE = int(config_idsnap.get('cache_pool_size', 8))
+
+# X-External-Id per hari (WIB), expired bersamaan saat tengah malam
+CACHE_PARTITION = config_idsnap.getboolean('cache_partition', False)
+# retry X-External-Id yang sama mendapat response pertama, bukan Conflict
+CACHE_REPLAY = config_idsnap.getboolean('cache_replay', False)
+# jumlah X-External-Id per hari per worker untuk Bloom filter, 0 = off
+CACHE_BLOOM_CAPACITY = int(config_idsnap.get('cache_bloom_capacity', 0))
+# key digest 20 byte (namespace, X-PARTNER-ID, X-External-Id)
+CACHE_COMPACT_KEYS = config_idsnap.getboolean('cache_compact_keys', False)
+# beberapa node redis/memcached "host:port, host:port", consistent hash
+CACHE_NODES = [node for node in config_idsnap.get('cache_nodes', '')
+                                            .split(',') if node.strip()]
+# jumlah salinan per key di node berbeda, untuk failover
+CACHE_REPLICAS = int(config_idsnap.get('cache_replicas', 1))
+# redis/memcached lambat atau down: fallback lokal, bukan 504
+CACHE_FALLBACK = config_idsnap.getboolean('cache_fallback', False)
+# folder write-ahead journal saat fallback, None = hanya di memory
+CACHE_JOURNAL = config_idsnap.get('cache_journal')
+# antrian log per worker, dikirim per batch di background, 0 = inline
+LOG_QUEUE_SIZE = int(config_idsnap.get('log_queue_size', 0))
+LOG_BATCH_SIZE = int(config_idsnap.get('log_batch_size', 100))
+LOG_BATCH_INTERVAL = float(config_idsnap.get('log_batch_interval', 1))
+# antrian penuh: drop, drop_oldest atau block (Response menunggu)
+LOG_POLICY = config_idsnap.get('log_policy', 'drop')
+# maksimal byte value per key jika cache = shared; replay menyimpan
+# response, memory file = 262144 key x (value_size + 26) byte
+CACHE_VALUE_SIZE = int(config_idsnap.get('cache_value_size',
+                                         1024 if CACHE_REPLAY else 16))
+# file shared memory jika cache = shared, default /dev/shm
+SHARED_PATH = config_idsnap.get('shared_path')
 
 # Memcacahed
 MEMCACHED_HOST = config_idsnap.get('memcached_host', 'localhost')
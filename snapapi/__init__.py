@@ -9,4 +9,5 @@ from .responses import SNAPResponse as SNAPResponse
 from .routing import SNAPRoute as SNAPRoute
 from .security.crypto import SNAPCrypto as SNAPCrypto
 from .cache import SNAPCache as SNAPCache
-from .logger import SNAPLog as SNAPLog
\ No newline at end of file
+from .logger import SNAPLog as SNAPLog
+from .logger import SNAPLogQueue as SNAPLogQueue
\ No newline at end of file
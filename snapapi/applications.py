@@ -94,8 +94,8 @@ class SNAPAPI(FastAPI):
         self._namespace = namespace
         self.set_cache()
 
-    def set_cache(self) -> Any:
-        cache = SNAPCache(self._namespace).cache
+    def set_cache(self) -> Union[SNAPCache, None]:
+        cache = self._namespace and SNAPCache(self._namespace) or None
         self._cache = cache
         return cache
 
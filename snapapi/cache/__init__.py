@@ -0,0 +1,691 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Cache
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+import logging
+import sys
+import time
+_logger = logging.getLogger(__name__)
+_logger.addHandler(logging.StreamHandler(sys.stdout))
+
+from typing import TypeVar, Union, Any, Dict, List, Tuple
+
+from snapapi.exceptions import TimeOut
+from snapapi.tools import DayPartition
+from snapapi.cache.base import (
+        CacheBackend, StreamBackend, CacheError, Connection
+    )
+from snapapi.cache.memory import MemoryBackend, TimingWheel
+from snapapi.cache.redis import RedisBackend
+from snapapi.cache.memcached import MemcachedBackend
+from snapapi.cache.shared import SharedMemoryBackend, default_path
+from snapapi.cache.bloom import BloomFilter
+from snapapi.cache.breaker import CircuitBreaker, FallbackBackend
+from snapapi.cache.ring import HashRing, ShardedBackend
+from snapapi.cache.keys import KeyEncoder, short_prefix
+from snapapi.cache import replay
+
+AppType = TypeVar("AppType", bound="SNAPCache")
+
+
+class SNAPCache:
+    """
+    Fitur utama SNAPCache hanya dua, `add` dan `delete`.
+
+    - `add`:    setelah request selesai diverifikasi, add key X-External-Id
+                ke Cache. By default TTL adalah sisa detik hingga jam 24:00
+                pada hari ini. Secara otomatis backend ('memory', 'shared',
+                'redis', 'memcached') akan menghapus keys saat TTL expires
+    - `delete`  jika ada error status code >=500, sebaiknya X-External-Id 
+                dihapus, sehingga bisa digunakan kembali tanpa harus 
+                `Conflict`
+
+    Note:   backend 'memory' hanya digunakan saat Dev, karena setiap kali 
+            woker reload, keys pasti akan hilang.
+            Di Production gunakan antara 'memcached' atau 'redis', atau
+            'shared' (shared memory `path`) jika semua worker ada di
+            satu host
+
+    Backend native (`snapapi.cache.redis`, `snapapi.cache.memcached`),
+    `add` adalah satu round trip atomic (SET NX / add), tanpa aiocache.
+    Connection pool per worker (`pool_size`), dibuka dengan `open` saat
+    startup dan ditutup dengan `close` saat shutdown, metrics di `stats`.
+
+    `partition=True`: keys disimpan per hari, `{namespace}:{YYYYMMDD}`
+    (WIB), dan expired bersamaan saat tengah malam, param `ttl` di `add`
+    diabaikan. Redis menyimpan satu partition sebagai satu HASH, memory
+    sebagai satu dict, sehingga partition kemarin di-drop dalam satu
+    operasi (`rollover`). Key yang sudah disimpan tanpa partition tidak
+    terbaca setelah partition diaktifkan.
+
+    `bloom_capacity` > 0: Bloom filter per hari per worker di depan
+    backend. Filter hanya melihat `add` dari worker ini, sehingga "belum
+    pernah" tidak berlaku untuk worker lain: `add` tetap selalu ke
+    backend (atomic), filter tidak mengurangi round trip. Gunanya untuk
+    mengukur: `bloom_stats()` berisi fill ratio, estimasi false positive
+    rate, dan false positive yang terukur (filter "mungkin sudah", backend
+    "belum"), untuk sizing filter yang nantinya dibagi antar worker.
+
+    `fallback=True` (redis/memcached): circuit breaker di depan backend.
+    Jika backend lambat atau error, `add` tidak lagi `TimeOut` (504)
+    tetapi dicatat di store lokal (write-ahead `journal`, folder) dan
+    dikirim ulang ke backend setelah sehat. Selama degraded, duplicate
+    hanya terdeteksi per worker; state dan jumlah fallback di
+    `breaker_stats()` dan `stats()`, lihat `FallbackBackend`.
+
+    `nodes` (redis/memcached): list "host:port", key dibagi ke semua
+    node dengan consistent hashing, `replicas` > 1 menyimpan salinan di
+    node berikutnya untuk failover, lihat `ShardedBackend`. `host` dan
+    `port` diabaikan.
+
+    `compact_keys=True`: key disimpan sebagai digest berukuran tetap
+    (namespace, partner, X-External-Id), 20 byte, lihat `KeyEncoder`.
+    Param `partner` (X-PARTNER-ID) hanya dipakai di compact key, tanpa
+    compact key format tetap `namespace + key`.
+
+    Replay: `store` menyimpan response (status dan body) request pertama,
+    `replay` mengembalikannya untuk retry yang sama persis, lihat
+    `SNAPRoute.replay_cache`. Response disimpan dengan sisa TTL dari
+    `add`, sehingga expired bersamaan. Backend 'shared' butuh
+    `value_size` minimal `replay.MIN_VALUE_SIZE` (`check_replay`).
+    """
+    def __init__(
+            self: AppType,
+            namespace: str,
+            /,
+            host: Union[str, None] = None,
+            port: Union[int, None] = None,
+            db: Union[int, None] = None,
+            timeout: Union[int, None] = 9,
+            backend: Union[str, None] = None,
+            pool_size: int = 8,
+            path: Union[str, None] = None,
+            partition: bool = False,
+            bloom_capacity: int = 0,
+            bloom_error_rate: float = 0.001,
+            fallback: bool = False,
+            journal: Union[str, None] = None,
+            nodes: Union[List[str], None] = None,
+            replicas: int = 1,
+            compact_keys: bool = False,
+            value_size: int = 16
+        ) -> None:
+        self._namespace = namespace
+        self._compact_keys = compact_keys
+        self._keys: Union[KeyEncoder, None] = None
+        self.initiate_keys()
+        self._partition = partition
+        self._bloom_capacity = bloom_capacity
+        self._bloom_error_rate = bloom_error_rate
+        self._bloom: Union[BloomFilter, None] = None
+        self._bloom_day = ''
+        self._inflight: Dict[str, asyncio.Event] = {}
+        # monotonic saat key yang di-claim expired, None = tanpa TTL
+        self._expires: Dict[str, Union[float, None]] = {}
+        self._today = DayPartition()
+        self.initiate_bloom()
+        self._pool_size = pool_size
+        self._path = path
+        self._value_size = value_size
+        self._fallback = fallback
+        self._journal = journal
+        self._nodes = nodes
+        self._replicas = replicas
+        self._host = host
+        self._port = port
+        self._db = db
+        self._backend = backend
+        self._timeout = timeout
+        self._cache = self.initiate_cache()
+
+    @property
+    def namespace(self):
+        return self._namespace
+    
+    @namespace.setter
+    def namespace(self, namespace: str) -> None:
+        self._namespace = namespace
+        self.initiate_keys()
+        self.initiate_cache()
+
+    @property
+    def compact_keys(self) -> bool:
+        return self._compact_keys
+
+    @compact_keys.setter
+    def compact_keys(self, compact_keys: bool) -> None:
+        self._compact_keys = compact_keys
+        self.initiate_keys()
+
+    def initiate_keys(self) -> Union[KeyEncoder, None]:
+        keys = None
+        if self._compact_keys and self._namespace:
+            keys = KeyEncoder(self._namespace)
+        self._keys = keys
+        return keys
+
+    @property
+    def host(self) -> Union[str, None]:
+        return self._host
+
+    @host.setter
+    def host(self, host: Union[str, None]) -> None:
+        self._host = host
+        self.initiate_cache()
+
+    @property
+    def port(self) -> Union[int, None]:
+        return self._port
+
+    @port.setter
+    def port(self, port: Union[int, None]) -> None:
+        self._port = port
+        self.initiate_cache()
+    
+    @property
+    def db(self) -> Union[int, None]:
+        return self._db
+
+    @db.setter
+    def db(self, db: Union[int, None]) -> None:
+        self._db = db
+        self.initiate_cache()
+    
+    @property
+    def timeout(self) -> Union[int, None]:
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self, timeout: Union[int, None]) -> None:
+        self._timeout = timeout
+        self.initiate_cache()
+    
+    @property
+    def backend(self) -> Union[str, None]:
+        return self._backend
+
+    @backend.setter
+    def backend(self, value: Union[str, None]) -> None:
+        self._backend = value
+        self.initiate_cache()
+
+    @property
+    def pool_size(self) -> int:
+        return self._pool_size
+
+    @pool_size.setter
+    def pool_size(self, pool_size: int) -> None:
+        self._pool_size = pool_size
+        self.initiate_cache()
+
+    @property
+    def path(self) -> Union[str, None]:
+        return self._path
+
+    @path.setter
+    def path(self, path: Union[str, None]) -> None:
+        self._path = path
+        self.initiate_cache()
+
+    @property
+    def value_size(self) -> int:
+        """ Maksimal byte value untuk backend 'shared' """
+        return self._value_size
+
+    @value_size.setter
+    def value_size(self, value_size: int) -> None:
+        self._value_size = value_size
+        self.initiate_cache()
+
+    @property
+    def fallback(self) -> bool:
+        return self._fallback
+
+    @fallback.setter
+    def fallback(self, fallback: bool) -> None:
+        self._fallback = fallback
+        self.initiate_cache()
+
+    @property
+    def journal(self) -> Union[str, None]:
+        return self._journal
+
+    @journal.setter
+    def journal(self, journal: Union[str, None]) -> None:
+        self._journal = journal
+        self.initiate_cache()
+
+    @property
+    def nodes(self) -> Union[List[str], None]:
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, nodes: Union[List[str], None]) -> None:
+        self._nodes = nodes
+        self.initiate_cache()
+
+    @property
+    def replicas(self) -> int:
+        return self._replicas
+
+    @replicas.setter
+    def replicas(self, replicas: int) -> None:
+        self._replicas = replicas
+        self.initiate_cache()
+
+    @property
+    def partition(self) -> bool:
+        return self._partition
+
+    @partition.setter
+    def partition(self, partition: bool) -> None:
+        self._partition = partition
+
+    @property
+    def bloom_capacity(self) -> int:
+        return self._bloom_capacity
+
+    @bloom_capacity.setter
+    def bloom_capacity(self, bloom_capacity: int) -> None:
+        self._bloom_capacity = bloom_capacity
+        self.initiate_bloom()
+
+    @property
+    def bloom_error_rate(self) -> float:
+        return self._bloom_error_rate
+
+    @bloom_error_rate.setter
+    def bloom_error_rate(self, bloom_error_rate: float) -> None:
+        self._bloom_error_rate = bloom_error_rate
+        self.initiate_bloom()
+
+    @property
+    def bloom(self) -> Union[BloomFilter, None]:
+        """ Readonly, filter hari ini """
+        return self._bloom
+
+    def initiate_bloom(self) -> Union[BloomFilter, None]:
+        bloom = None
+        if self._bloom_capacity > 0:
+            bloom = BloomFilter(self._bloom_capacity, self._bloom_error_rate)
+        self._bloom = bloom
+        self._bloom_day = self._today.label()
+        self.bloom_negatives = 0
+        self.bloom_positives = 0
+        self.bloom_false_positives = 0
+        return bloom
+
+    def _bloom_check(self, key: str) -> bool:
+        """ True jika filter bilang "mungkin sudah", reset tiap hari """
+        bloom = self._bloom
+        if bloom is None:
+            return False
+        label = self._today.label()
+        if label != self._bloom_day:
+            bloom.clear()
+            self._bloom_day = label
+        if key in bloom:
+            self.bloom_positives += 1
+            return True
+        self.bloom_negatives += 1
+        return False
+
+    def bloom_stats(self) -> Dict[str, Union[int, float]]:
+        if self._bloom is None:
+            return {}
+        stats = self._bloom.stats()
+        stats.update(
+                negatives=self.bloom_negatives,
+                positives=self.bloom_positives,
+                false_positives=self.bloom_false_positives,
+                # FP / (FP + TN), semua negative pasti benar
+                observed_false_positive_rate=self.bloom_false_positives \
+                        and round(self.bloom_false_positives / (
+                            self.bloom_negatives
+                            + self.bloom_false_positives), 6)
+                        or 0.0
+            )
+        return stats
+
+    @property
+    def cache(self) -> Union[CacheBackend, None]:
+        """ 
+        Readonly. Hanya berubah jika attributes lain berubah
+        """
+        return self._cache
+    
+    def initiate_cache(self) -> Union[CacheBackend, None]:
+        cache: Union[CacheBackend, None] = None
+        if self._namespace:
+            if self._backend in ('redis', 'memcached') and self._nodes:
+                backends: Dict[str, CacheBackend] = {}
+                for node in self._nodes:
+                    host, _, port = node.strip().rpartition(':')
+                    backends[node.strip()] = self.initiate_stream(
+                            host, int(port))
+                cache = ShardedBackend(backends, replicas=self._replicas)
+            elif self._backend in ('redis', 'memcached'):
+                cache = self.initiate_stream(self._host, self._port)
+            elif self._backend == 'shared':
+                cache = SharedMemoryBackend(
+                        self._path or default_path(self._namespace),
+                        value_size=self._value_size)
+            else:
+                cache = MemoryBackend()
+                _logger.warning('Cache Memory hanya untuk Demo. '\
+                    'Setiap kali worker/server restart, keys akan hilang')
+            if self._fallback \
+                    and isinstance(cache, (StreamBackend, ShardedBackend)):
+                cache = FallbackBackend(
+                        cache,
+                        breaker=CircuitBreaker(name=self._namespace),
+                        journal=self._journal,
+                        name=self._namespace
+                    )
+        previous = getattr(self, '_cache', None)
+        if previous is not None:
+            previous.abort()
+        self._cache = cache
+        return cache
+
+    def initiate_stream(
+            self,
+            host: Union[str, None],
+            port: Union[int, None]
+        ) -> StreamBackend:
+        """ Backend redis/memcached untuk satu server """
+        if self._backend == 'redis':
+            return RedisBackend(
+                    host or 'localhost',
+                    port or 6379,
+                    db=8 if self._db is None else self._db,
+                    timeout=self._timeout,
+                    pool_size=self._pool_size
+                )
+        return MemcachedBackend(
+                host or 'localhost',
+                port or 11211,
+                timeout=self._timeout,
+                pool_size=self._pool_size
+            )
+
+    def __str__(self) -> str:
+        return f'namespace: {self.namespace}, cache: {self.cache}'
+
+    def __repr__(self)->str:
+        return f"{self.__class__.__name__}({self.__str__()})"
+
+    def build_key(self, key: str, partner: str = '') -> str:
+        """
+        Sama dengan aiocache: namespace + key, tanpa separator. Jika
+        `compact_keys`, digest berukuran tetap termasuk `partner`
+        """
+        if self._keys is not None:
+            return self._keys.encode(key, partner)
+        return f'{self._namespace}{key}'
+
+    def build_field(self, key: str, partner: str = '') -> str:
+        """ Key di dalam partition (namespace sudah di nama partition) """
+        if self._keys is not None:
+            return self._keys.field(key, partner)
+        return key
+
+    def partition_name(self, days: int = 0) -> str:
+        """ `{namespace}:{YYYYMMDD}`, `days` = -1 untuk kemarin """
+        return f'{self._namespace}:{self._today.label(days)}'
+
+    async def add(
+            self,
+            key: str,
+            value: Union[bytes, str, None] = None,
+            ttl: Union[int, None] = None,
+            partner: str = ''
+        ) -> None:
+        """
+        Cache Key and Value, raise ValueError jika key sudah ada
+        """
+        if self.cache is None:
+            return None
+        if value is None:
+            value = b'1'
+        elif isinstance(value, str):
+            value = value.encode()
+        built = self.build_key(key, partner)
+        # filter memakai key backend (termasuk Partner jika compact_keys)
+        seen = self._bloom_check(built)
+        try:
+            if self._partition:
+                label, seconds_left = self._today.current()
+                added = await self.cache.partition_add(
+                        f'{self._namespace}:{label}',
+                        self.build_field(key, partner), value, seconds_left)
+            else:
+                added = await self.cache.add(built, value, ttl)
+        except asyncio.TimeoutError:
+            raise TimeOut()
+        if not added:
+            raise ValueError(f"Key {key} already exists")
+        if self._bloom is not None:
+            self._bloom.add(built)
+            if seen:
+                self.bloom_false_positives += 1
+        claimed = replay.claims.get()
+        if claimed is not None:
+            # request ini pemilik key, duplicate di worker ini menunggu
+            claimed.add(key)
+            self._inflight[built] = asyncio.Event()
+            self._expires[built] = None if ttl is None \
+                                    else time.monotonic() + ttl
+        return None
+
+    async def set(
+            self,
+            key: str,
+            value: Union[bytes, str],
+            ttl: Union[int, None] = None,
+            partner: str = ''
+        ) -> None:
+        """ Simpan/timpa value, jika partition `ttl` diabaikan """
+        if self.cache is None:
+            return None
+        if isinstance(value, str):
+            value = value.encode()
+        try:
+            if self._partition:
+                label, seconds_left = self._today.current()
+                await self.cache.partition_set(
+                        f'{self._namespace}:{label}',
+                        self.build_field(key, partner), value, seconds_left)
+            else:
+                await self.cache.set(
+                        self.build_key(key, partner), value, ttl)
+        except asyncio.TimeoutError:
+            raise TimeOut()
+        return None
+
+    async def replay(
+            self,
+            key: str,
+            fingerprint: bytes,
+            wait: float = 5,
+            partner: str = ''
+        ) -> Union[Tuple[int, bytes], None]:
+        """
+        Response yang tersimpan untuk `key`: (status_code, body).
+
+        Jika request pertama masih diproses, tunggu hingga `wait` detik:
+        di worker yang sama menunggu `asyncio.Event`, di worker lain
+        polling backend. Returns None jika belum ada, masih diproses
+        setelah `wait`, atau `fingerprint` berbeda (request lain dengan
+        X-External-Id yang sama, tetap `Conflict`)
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        delay = 0.005
+        while True:
+            value = await self.get(key, partner)
+            if value is None or value == replay.DONE:
+                return None
+            record = replay.decode(value)
+            if record is not None:
+                stored, status_code, body = record
+                if stored != fingerprint:
+                    return None
+                return status_code, body
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            event = self._inflight.get(self.build_key(key, partner))
+            if event is not None:
+                try:
+                    await asyncio.wait_for(event.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return None
+            else:
+                await asyncio.sleep(min(delay, remaining))
+                delay = min(delay * 2, 0.2)
+
+    async def store(
+            self,
+            key: str,
+            fingerprint: bytes,
+            status_code: int,
+            body: bytes,
+            partner: str = ''
+        ) -> bool:
+        """
+        Simpan response request pemilik `key` untuk di-replay, dengan sisa
+        TTL dari `add` (tanpa `add` di worker ini: sisa detik hari ini).
+        Returns False jika gagal (misal value terlalu besar untuk backend),
+        retry berikutnya tetap `Conflict` seperti tanpa replay; key tidak
+        dihapus agar transaksi tidak diproses dua kali
+        """
+        ttl = self.remaining_ttl(key, partner)
+        try:
+            await self.set(key, replay.encode(fingerprint, status_code,
+                                              body), ttl, partner)
+            return True
+        except Exception as exc:
+            _logger.warning(f'Response {key} tidak bisa disimpan: {exc}')
+            try:
+                await self.set(key, replay.DONE, ttl, partner)
+            except Exception:
+                pass
+            return False
+        finally:
+            self.release(key, partner)
+
+    def remaining_ttl(self, key: str, partner: str = '') -> Union[int, None]:
+        """ Sisa TTL key yang di-claim `add` di worker ini """
+        built = self.build_key(key, partner)
+        if built not in self._expires:
+            return self._today.seconds_left() or 1
+        expires = self._expires[built]
+        if expires is None:
+            return None
+        return max(int(expires - time.monotonic() + 0.999), 1)
+
+    def check_replay(self) -> None:
+        """ Raise CacheError jika backend tidak bisa menyimpan response """
+        cache = self.cache
+        if isinstance(cache, SharedMemoryBackend) \
+                and cache.value_size < replay.MIN_VALUE_SIZE:
+            raise CacheError(
+                    f'Replay butuh value_size minimal '
+                    f'{replay.MIN_VALUE_SIZE} byte, backend shared '
+                    f'{cache.value_size} byte')
+        return None
+
+    def release(self, key: str, partner: str = '') -> None:
+        """ Bangunkan duplicate yang menunggu `key` di worker ini """
+        built = self.build_key(key, partner)
+        self._expires.pop(built, None)
+        event = self._inflight.pop(built, None)
+        if event is not None:
+            event.set()
+        return None
+
+    async def get(self, key: str, partner: str = '') -> Union[bytes, None]:
+        if self.cache is None:
+            return None
+        try:
+            if self._partition:
+                return await self.cache.partition_get(
+                        self.partition_name(), self.build_field(key, partner))
+            return await self.cache.get(self.build_key(key, partner))
+        except asyncio.TimeoutError:
+            raise TimeOut()
+
+    async def delete(self, key: str, partner: str = '') -> None:
+        """ Delete Key """
+        if self.cache is None:
+            return None
+        try:
+            if self._partition:
+                await self.cache.partition_delete(
+                        self.partition_name(), self.build_field(key, partner))
+            else:
+                await self.cache.delete(self.build_key(key, partner))
+        except Exception:
+            pass
+        return None
+
+    async def exists(self, key: str, partner: str = '') -> bool:
+        if self.cache is None:
+            return False
+        try:
+            if self._partition:
+                return await self.cache.partition_exists(
+                        self.partition_name(), self.build_field(key, partner))
+            return await self.cache.exists(self.build_key(key, partner))
+        except asyncio.TimeoutError:
+            raise TimeOut()
+
+    async def rollover(self) -> bool:
+        """
+        Drop partition kemarin dalam satu operasi. Tidak wajib, partition
+        juga expired sendiri saat tengah malam; berguna untuk membebaskan
+        memory segera. Returns False jika tidak ada atau backend tidak
+        mendukung
+        """
+        if self.cache is None or not self._partition:
+            return False
+        try:
+            return await self.cache.drop_partition(self.partition_name(-1))
+        except asyncio.TimeoutError:
+            raise TimeOut()
+
+    async def open(self) -> None:
+        """ Buka koneksi backend, misal saat startup """
+        if self.cache is None:
+            return None
+        try:
+            await self.cache.open()
+        except asyncio.TimeoutError:
+            raise TimeOut()
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """ Metrics backend, misal connection pool """
+        if self.cache is None:
+            return {}
+        return self.cache.stats()
+
+    def breaker_stats(self) -> Dict[str, Union[int, float, str]]:
+        """ State circuit breaker, kosong jika tanpa `fallback` """
+        if not isinstance(self.cache, FallbackBackend):
+            return {}
+        stats = self.cache.breaker.stats()
+        stats.update(
+                fallbacks=self.cache.fallbacks,
+                pending=self.cache.pending,
+                reconciled=self.cache.reconciled,
+                reconcile_existing=self.cache.reconcile_existing
+            )
+        return stats
+
+    async def close(self) -> None:
+        """ Tutup koneksi backend, misal saat shutdown """
+        if self.cache is not None:
+            await self.cache.close()
+        return None
@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Cache: Base Backend
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+import time
+
+from collections import deque
+from typing import (
+        Union, Optional, Callable, Awaitable, TypeVar, Deque, Dict
+    )
+
+T = TypeVar("T")
+
+
+class CacheError(Exception):
+    """ Error dari server cache (bukan timeout/koneksi) """
+
+
+# error koneksi/timeout: server tidak tersedia, CacheError tidak termasuk
+UNAVAILABLE = (asyncio.TimeoutError, OSError, asyncio.IncompleteReadError)
+
+
+class CacheBackend:
+    """
+    Base class backend idempotency store `SNAPCache`.
+
+    Semua method async, `key` sudah termasuk namespace:
+
+    - `add`:    simpan jika belum ada (atomic), returns False jika
+                key sudah ada. `ttl` detik, None berarti tanpa expiry
+    - `set`:    simpan/timpa value, misal response untuk replay
+    - `get`:    value, None jika tidak ada/expired
+    - `exists`: True jika ada dan belum expired
+    - `delete`: returns True jika key ada
+    - `partition_*`: sama, di dalam partition (misal per hari) yang
+                expired/di-drop bersamaan, lihat `drop_partition`
+    - `open`:   siapkan koneksi (startup), opsional
+    - `close`:  tutup koneksi, dibuka lagi otomatis saat dibutuhkan
+    """
+    name: str = ''
+
+    async def add(
+            self,
+            key: str,
+            value: bytes = b'1',
+            ttl: Union[int, None] = None
+        ) -> bool:
+        raise NotImplementedError()
+
+    async def set(
+            self,
+            key: str,
+            value: bytes,
+            ttl: Union[int, None] = None
+        ) -> None:
+        raise NotImplementedError()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError()
+
+    async def exists(self, key: str) -> bool:
+        return await self.get(key) is not None
+
+    async def delete(self, key: str) -> bool:
+        raise NotImplementedError()
+
+    async def partition_add(
+            self,
+            partition: str,
+            key: str,
+            value: bytes = b'1',
+            ttl: float = 1
+        ) -> bool:
+        """
+        `add` ke dalam `partition` yang expired dalam `ttl` detik (semua
+        key di partition yang sama expired bersamaan). Default: per key
+        `{partition}:{key}`, override jika backend bisa menyimpan satu
+        partition sebagai satu object agar `drop_partition` satu operasi
+        """
+        return await self.add(f'{partition}:{key}', value,
+                              max(int(ttl + 0.5), 1))
+
+    async def partition_set(
+            self,
+            partition: str,
+            key: str,
+            value: bytes,
+            ttl: float = 1
+        ) -> None:
+        return await self.set(f'{partition}:{key}', value,
+                              max(int(ttl + 0.5), 1))
+
+    async def partition_get(
+            self,
+            partition: str,
+            key: str
+        ) -> Optional[bytes]:
+        return await self.get(f'{partition}:{key}')
+
+    async def partition_exists(self, partition: str, key: str) -> bool:
+        return await self.partition_get(partition, key) is not None
+
+    async def partition_delete(self, partition: str, key: str) -> bool:
+        return await self.delete(f'{partition}:{key}')
+
+    async def drop_partition(self, partition: str) -> bool:
+        """
+        Hapus satu partition sekaligus, returns False jika backend tidak
+        mendukung (key tetap expired masing-masing sesuai ttl)
+        """
+        return False
+
+    async def open(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+    def abort(self) -> None:
+        """ Lepas resource tanpa menunggu (sync), misal saat diganti """
+        return None
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        return {}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+class Connection:
+    """ Satu koneksi TCP di pool `StreamBackend` """
+    __slots__ = ('reader', 'writer', 'last_used')
+
+    def __init__(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter
+        ) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+
+    @property
+    def broken(self) -> bool:
+        """ Ditutup server atau oleh kita """
+        return self.writer.is_closing() or self.reader.at_eof()
+
+    def close(self) -> None:
+        self.writer.close()
+        return None
+
+
+class StreamBackend(CacheBackend):
+    """
+    Base backend TCP (Redis, memcached) dengan connection pool per
+    worker (event loop):
+
+    - maksimal `pool_size` koneksi, request berikutnya menunggu koneksi
+      dikembalikan; waktu tunggu termasuk dalam `timeout`
+    - koneksi idle dipakai ulang LIFO. Sebelum dipakai, koneksi yang
+      sudah ditutup server dibuang; yang idle lebih dari
+      `health_check_interval` detik dicek dulu dengan `_ping`
+    - jika timeout atau error, koneksi dibuang karena posisi stream
+      sudah tidak pasti, koneksi lain di pool tidak terpengaruh
+    - `open` membuka `pool_minsize` koneksi (saat startup), `close`
+      menutup semua koneksi idle (saat shutdown)
+
+    Metrics di `stats()`.
+    """
+    def __init__(
+            self,
+            host: str,
+            port: int,
+            *,
+            timeout: Union[float, None] = 9,
+            pool_size: int = 8,
+            pool_minsize: int = 1,
+            health_check_interval: float = 30
+        ) -> None:
+        assert pool_size > 0 and 0 <= pool_minsize <= pool_size
+        self._host = host
+        self._port = port
+        self._timeout = timeout
+        self._pool_size = pool_size
+        self._pool_minsize = pool_minsize
+        self._health_check_interval = health_check_interval
+        self._idle: Deque[Connection] = deque()
+        self._size = 0
+        self._loop: Union[asyncio.AbstractEventLoop, None] = None
+        self._semaphore: Union[asyncio.Semaphore, None] = None
+        self.reset_stats()
+
+    @property
+    def host(self) -> str:
+        return self._host
+
+    @property
+    def port(self) -> int:
+        return self._port
+
+    @property
+    def timeout(self) -> Union[float, None]:
+        return self._timeout
+
+    @property
+    def pool_size(self) -> int:
+        return self._pool_size
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}("\
+               f"host='{self._host}', port={self._port}, "\
+               f"pool_size={self._pool_size})"
+
+    def reset_stats(self) -> None:
+        self.requests = 0
+        self.created = 0
+        self.discarded = 0
+        self.health_checks = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.wait_time_max = 0.0
+        return None
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """
+        Metrics pool: `size` koneksi terbuka (`idle` + `in_use`),
+        `waits` jumlah request yang menunggu karena pool penuh, dan
+        `wait_time` (detik) total/rata-rata/maksimal-nya
+        """
+        idle = len(self._idle)
+        return dict(
+                pool_size=self._pool_size,
+                size=self._size,
+                idle=idle,
+                in_use=self._size - idle,
+                requests=self.requests,
+                created=self.created,
+                discarded=self.discarded,
+                health_checks=self.health_checks,
+                waits=self.waits,
+                wait_time=round(self.wait_time, 6),
+                wait_time_avg=self.waits and round(
+                        self.wait_time / self.waits, 6) or 0.0,
+                wait_time_max=round(self.wait_time_max, 6)
+            )
+
+    async def _on_connect(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter
+        ) -> None:
+        """ Hook setelah connect, misal Redis SELECT db """
+        return None
+
+    async def _ping(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter
+        ) -> None:
+        """ Health check koneksi idle, raise jika tidak sehat """
+        return None
+
+    async def _connect(self) -> Connection:
+        reader, writer = await asyncio.open_connection(
+                self._host, self._port)
+        try:
+            await self._on_connect(reader, writer)
+        except BaseException:
+            writer.close()
+            raise
+        self.created += 1
+        return Connection(reader, writer)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            # koneksi dan semaphore terikat ke satu event loop
+            self.abort()
+            self._size = 0
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self._pool_size)
+        return self._semaphore
+
+    async def _acquire(self) -> Connection:
+        """ Koneksi idle yang sehat, atau koneksi baru """
+        now = time.monotonic()
+        while self._idle:
+            connection = self._idle.pop()
+            if connection.broken:
+                self._discard(connection)
+                continue
+            if now - connection.last_used > self._health_check_interval:
+                self.health_checks += 1
+                try:
+                    await self._ping(connection.reader, connection.writer)
+                except (OSError, asyncio.IncompleteReadError, CacheError):
+                    self._discard(connection)
+                    continue
+                except BaseException:
+                    self._discard(connection)
+                    raise
+            return connection
+        self._size += 1
+        try:
+            return await self._connect()
+        except BaseException:
+            self._size -= 1
+            raise
+
+    def _release(self, connection: Connection) -> None:
+        if connection.broken:
+            self._discard(connection)
+        else:
+            connection.last_used = time.monotonic()
+            self._idle.append(connection)
+        return None
+
+    def _discard(self, connection: Connection) -> None:
+        connection.close()
+        self._size -= 1
+        self.discarded += 1
+        return None
+
+    async def _request(
+            self,
+            payload: bytes,
+            parse: Callable[[asyncio.StreamReader], Awaitable[T]]
+        ) -> T:
+        """
+        Kirim `payload`, returns hasil `parse(reader)`.
+        Timeout meliputi tunggu pool, connect, kirim dan baca reply.
+        """
+        return await asyncio.wait_for(
+                self._roundtrip(payload, parse), self._timeout)
+
+    async def _roundtrip(
+            self,
+            payload: bytes,
+            parse: Callable[[asyncio.StreamReader], Awaitable[T]]
+        ) -> T:
+        semaphore = self._get_semaphore()
+        self.requests += 1
+        if semaphore.locked():
+            start = time.monotonic()
+            try:
+                await semaphore.acquire()
+            finally:
+                # termasuk yang timeout saat menunggu
+                wait = time.monotonic() - start
+                self.waits += 1
+                self.wait_time += wait
+                self.wait_time_max = max(self.wait_time_max, wait)
+        else:
+            await semaphore.acquire()
+        try:
+            connection = await self._acquire()
+            try:
+                connection.writer.write(payload)
+                await connection.writer.drain()
+                result = await parse(connection.reader)
+            except BaseException:
+                # termasuk CacheError: reply mungkin belum terbaca habis
+                self._discard(connection)
+                raise
+            self._release(connection)
+            return result
+        finally:
+            semaphore.release()
+
+    async def open(self) -> None:
+        """ Buka `pool_minsize` koneksi, misal saat startup """
+        self._get_semaphore()
+        while self._size < self._pool_minsize:
+            self._size += 1
+            try:
+                connection = await asyncio.wait_for(
+                        self._connect(), self._timeout)
+            except BaseException:
+                self._size -= 1
+                raise
+            self._idle.append(connection)
+        return None
+
+    def abort(self) -> None:
+        """ Tutup semua koneksi idle tanpa menunggu (sync) """
+        while self._idle:
+            self._discard(self._idle.pop())
+        return None
+
+    async def close(self) -> None:
+        """ Tutup semua koneksi idle, dibuka lagi saat dibutuhkan """
+        idle = list(self._idle)
+        self.abort()
+        for connection in idle:
+            try:
+                await connection.writer.wait_closed()
+            except OSError:
+                pass
+        return None
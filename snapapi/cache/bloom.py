@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Cache: Bloom Filter
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import hashlib
+import math
+
+from typing import Dict, List, Union
+
+
+class BloomFilter:
+    """
+    Bloom filter untuk X-External-Id yang sudah pernah di-`add`.
+
+    - `key not in filter`: pasti belum pernah di-add ke filter ini
+    - `key in filter`:     mungkin sudah, peluang salah `error_rate`
+                           jika jumlah key tidak melebihi `capacity`
+
+    Ukuran bit array dan jumlah hash dihitung dari `capacity` dan
+    `error_rate`. `fill_ratio` dan `false_positive_rate` (estimasi dari
+    fill ratio) untuk menentukan `capacity` sesuai volume harian.
+    """
+    def __init__(
+            self,
+            capacity: int,
+            error_rate: float = 0.001
+        ) -> None:
+        assert capacity > 0 and 0 < error_rate < 1
+        self._capacity = capacity
+        self._error_rate = error_rate
+        # m = -n ln(p) / ln(2)^2, k = m/n ln(2)
+        self._size = max(math.ceil(
+                -capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self._hashes = max(round(self._size / capacity * math.log(2)), 1)
+        self._bits = bytearray((self._size + 7) // 8)
+        self._set_bits = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        """ Jumlah key yang di-add (termasuk yang mungkin sudah ada) """
+        return self.count
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        bits = self._bits
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def error_rate(self) -> float:
+        return self._error_rate
+
+    @property
+    def size(self) -> int:
+        """ Jumlah bit """
+        return self._size
+
+    @property
+    def hashes(self) -> int:
+        return self._hashes
+
+    @property
+    def fill_ratio(self) -> float:
+        return self._set_bits / self._size
+
+    @property
+    def false_positive_rate(self) -> float:
+        """ Estimasi peluang `in` salah dengan isi filter saat ini """
+        return self.fill_ratio ** self._hashes
+
+    def _positions(self, key: str) -> List[int]:
+        """ Double hashing: h1 + i * h2, satu blake2b per key """
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        size = self._size
+        return [(h1 + i * h2) % size for i in range(self._hashes)]
+
+    def add(self, key: str) -> bool:
+        """ Returns True jika key pasti belum ada sebelumnya """
+        bits = self._bits
+        new = False
+        for position in self._positions(key):
+            index, mask = position >> 3, 1 << (position & 7)
+            if not bits[index] & mask:
+                bits[index] |= mask
+                self._set_bits += 1
+                new = True
+        self.count += 1
+        return new
+
+    def clear(self) -> None:
+        self._bits = bytearray(len(self._bits))
+        self._set_bits = 0
+        self.count = 0
+        return None
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        return dict(
+                capacity=self._capacity,
+                count=self.count,
+                bits=self._size,
+                hashes=self._hashes,
+                fill_ratio=round(self.fill_ratio, 6),
+                false_positive_rate=round(self.false_positive_rate, 6)
+            )
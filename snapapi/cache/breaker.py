@@ -0,0 +1,627 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Cache: Circuit Breaker dan Local Fallback
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+import base64
+import glob
+import json
+import logging
+import os
+import sys
+import time
+_logger = logging.getLogger(__name__)
+_logger.addHandler(logging.StreamHandler(sys.stdout))
+
+from collections import deque
+from datetime import datetime
+from typing import (
+        Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple,
+        TypeVar, Union
+    )
+
+from snapapi.cache.base import CacheBackend, UNAVAILABLE
+from snapapi.cache.memory import MemoryBackend
+
+T = TypeVar("T")
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker berdasarkan error rate dan latency `window` call
+    terakhir:
+
+    - closed:    semua call ke backend. Call yang error atau lebih lama
+                 dari `slow_call` detik dihitung gagal; jika minimal
+                 `minimum_calls` dan rasio gagal >= `failure_rate`, open
+    - open:      tidak ada call ke backend selama `open_timeout` detik
+    - half_open: satu call percobaan; berhasil -> closed, gagal -> open
+
+    Perubahan state dicatat di `history` (maksimal 32 terakhir).
+    """
+    def __init__(
+            self,
+            *,
+            failure_rate: float = 0.5,
+            slow_call: float = 0.5,
+            window: int = 20,
+            minimum_calls: int = 5,
+            open_timeout: float = 10,
+            name: str = '',
+            clock: Callable[[], float] = time.monotonic
+        ) -> None:
+        assert 0 < failure_rate <= 1 and 0 < minimum_calls <= window
+        self._failure_rate = failure_rate
+        self._slow_call = slow_call
+        self._minimum_calls = minimum_calls
+        self._open_timeout = open_timeout
+        self._name = name
+        self._clock = clock
+        self._window: Deque[bool] = deque(maxlen=window)
+        self._state = CLOSED
+        self._open_until = 0.0
+        self._probing = False
+        self.history: Deque[Dict[str, str]] = deque(maxlen=32)
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.opened = 0
+        self.latency = 0.0
+        self.latency_max = 0.0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() >= self._open_until:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    @property
+    def failure_rate(self) -> float:
+        return self._window and \
+                sum(self._window) / len(self._window) or 0.0
+
+    def allow(self) -> bool:
+        """ True jika call boleh ke backend """
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record(self, success: bool, latency: float) -> None:
+        """ Hasil call yang diizinkan `allow` """
+        self.calls += 1
+        slow = latency > self._slow_call
+        failed = not success or slow
+        self.failures += not success
+        self.slow_calls += slow
+        # EWMA, kurang lebih 20 call terakhir
+        self.latency += (latency - self.latency) * 0.1
+        self.latency_max = max(self.latency_max, latency)
+        if self._state == HALF_OPEN:
+            self._probing = False
+            if failed:
+                self._open()
+            else:
+                self._window.clear()
+                self._transition(CLOSED)
+            return None
+        self._window.append(failed)
+        if self._state == CLOSED \
+                and len(self._window) >= self._minimum_calls \
+                and self.failure_rate >= self._failure_rate:
+            self._open()
+        return None
+
+    def _open(self) -> None:
+        self._open_until = self._clock() + self._open_timeout
+        self.opened += 1
+        self._transition(OPEN)
+        return None
+
+    def _transition(self, state: str) -> None:
+        if state == self._state:
+            return None
+        _logger.warning(f'Circuit breaker {self._name}: '
+                        f'{self._state} -> {state}')
+        self.history.append(dict(
+                datetime=datetime.now().astimezone().isoformat(
+                    timespec='milliseconds'),
+                source=self._state,
+                target=state
+            ))
+        self._state = state
+        return None
+
+    def stats(self) -> Dict[str, Union[int, float, str]]:
+        return dict(
+                state=self.state,
+                failure_rate=round(self.failure_rate, 4),
+                calls=self.calls,
+                failures=self.failures,
+                slow_calls=self.slow_calls,
+                rejected=self.rejected,
+                opened=self.opened,
+                latency=round(self.latency, 6),
+                latency_max=round(self.latency_max, 6),
+                last_transition=self.history and \
+                        self.history[-1]['datetime'] or ''
+            )
+
+
+# (partition, key) -> (op, value, expires epoch atau None)
+_ENTRY = Tuple[str, bytes, Optional[float]]
+
+
+class FallbackBackend(CacheBackend):
+    """
+    Backend `primary` (redis/memcached) dengan circuit breaker dan
+    fallback lokal.
+
+    Call ke `primary` dibatasi `call_timeout` detik. Jika gagal, atau
+    breaker sedang open, operasi dijalankan di `MemoryBackend` lokal dan
+    dicatat (write-ahead) di `journal`. Setelah `primary` sehat kembali,
+    key yang tercatat dikirim ulang (`reconcile`) dengan sisa TTL-nya.
+
+    Note:   selama degraded, duplicate hanya terdeteksi di worker yang
+            sama. Saat reconcile, key yang ternyata sudah ada di
+            `primary` (duplicate dari worker lain, atau write yang
+            timeout tetapi sebenarnya tersimpan) dicatat di
+            `reconcile_existing` dan di-log untuk dicek.
+
+    `journal`: folder, satu file per worker `snapapi.{name}.{pid}.wal`.
+    Journal worker yang sudah mati diambil alih saat `open`. None berarti
+    hanya di memory, hilang jika worker restart sebelum reconcile.
+    """
+    def __init__(
+            self,
+            primary: CacheBackend,
+            *,
+            breaker: Union[CircuitBreaker, None] = None,
+            call_timeout: float = 1,
+            journal: Union[str, None] = None,
+            name: str = 'snapapi'
+        ) -> None:
+        self._primary = primary
+        self._breaker = breaker or CircuitBreaker(name=primary.name)
+        self._call_timeout = call_timeout
+        self._journal = journal
+        self._name = name
+        self._local = MemoryBackend()
+        self._pending: Dict[Tuple[Optional[str], str], _ENTRY] = {}
+        self._journal_fd: Union[int, None] = None
+        self._journal_pid = 0
+        self._reconciling: Union[asyncio.Task, None] = None
+        self.fallbacks = 0
+        self.reconciled = 0
+        self.reconcile_existing = 0
+        self.name = primary.name
+
+    @property
+    def primary(self) -> CacheBackend:
+        return self._primary
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    @property
+    def pending(self) -> int:
+        """ Jumlah key yang belum dikirim ulang ke `primary` """
+        return len(self._pending)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._primary!r})"
+
+    async def _call(
+            self,
+            call: Callable[[], Awaitable[T]]
+        ) -> Tuple[bool, Optional[T]]:
+        """ (True, hasil) jika `primary` menjawab, (False, None) jika tidak """
+        if not self._breaker.allow():
+            return False, None
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(call(), self._call_timeout)
+        except UNAVAILABLE as exc:
+            self._breaker.record(False, time.monotonic() - start)
+            _logger.warning(f'Cache {self._primary!r}: {exc!r}')
+            return False, None
+        except BaseException:
+            # CacheError, CancelledError: bukan soal ketersediaan
+            self._breaker.record(True, time.monotonic() - start)
+            raise
+        self._breaker.record(True, time.monotonic() - start)
+        if self._pending and self._reconciling is None \
+                and self._breaker.state == CLOSED:
+            self._reconciling = asyncio.ensure_future(self._reconcile())
+        return True, result
+
+    # journal
+
+    def _journal_path(self, pid: int) -> str:
+        assert self._journal is not None
+        return os.path.join(self._journal, f'snapapi.{self._name}.{pid}.wal')
+
+    def _write(self, *records: Dict[str, Any]) -> None:
+        if self._journal is None:
+            return None
+        pid = os.getpid()
+        if self._journal_fd is None or self._journal_pid != pid:
+            # setelah fork, tiap worker punya file sendiri
+            self._journal_fd = os.open(
+                    self._journal_path(pid),
+                    os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            self._journal_pid = pid
+        os.write(self._journal_fd, b''.join(
+                json.dumps(record).encode() + b'\n' for record in records))
+        return None
+
+    def _log(
+            self,
+            partition: Optional[str],
+            key: str,
+            entry: Union[_ENTRY, None]
+        ) -> Dict[str, Any]:
+        if entry is None:
+            # sudah di primary, tidak pending lagi
+            return dict(p=partition, k=key, op='drop')
+        op, value, expires = entry
+        return dict(p=partition, k=key, op=op, e=expires,
+                    v=base64.b64encode(value).decode())
+
+    def _remember(
+            self,
+            partition: Optional[str],
+            key: str,
+            entry: Union[_ENTRY, None]
+        ) -> None:
+        """ Catat di journal dulu (write-ahead), kemudian di memory """
+        self._write(self._log(partition, key, entry))
+        if entry is None:
+            self._pending.pop((partition, key), None)
+        else:
+            self._pending[(partition, key)] = entry
+        return None
+
+    def _load(self, path: str) -> None:
+        with open(path, 'rb') as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # baris terakhir terpotong saat crash
+                    continue
+                name = (record['p'], record['k'])
+                if record['op'] == 'drop':
+                    self._pending.pop(name, None)
+                else:
+                    self._pending[name] = (
+                            record['op'],
+                            base64.b64decode(record['v']),
+                            record['e']
+                        )
+        return None
+
+    def _compact(self) -> None:
+        """ Tulis ulang journal sesuai `_pending` """
+        if self._journal is None:
+            return None
+        path = self._journal_path(os.getpid())
+        if self._journal_fd is not None:
+            os.close(self._journal_fd)
+            self._journal_fd = None
+        if not self._pending:
+            if os.path.exists(path):
+                os.remove(path)
+            return None
+        temp = f'{path}.tmp'
+        with open(temp, 'wb') as journal:
+            for (partition, key), entry in self._pending.items():
+                journal.write(json.dumps(
+                        self._log(partition, key, entry)).encode() + b'\n')
+        os.chmod(temp, 0o600)
+        os.replace(temp, path)
+        return None
+
+    async def open(self) -> None:
+        """ Ambil alih journal worker yang sudah mati, lalu buka primary """
+        if self._journal is not None:
+            os.makedirs(self._journal, mode=0o700, exist_ok=True)
+            for path in glob.glob(self._journal_path(0)[:-6] + '*.wal'):
+                pid = int(path.rsplit('.', 2)[1])
+                if pid != os.getpid() and _alive(pid):
+                    continue
+                self._load(path)
+                if pid != os.getpid():
+                    os.remove(path)
+            self._compact()
+        try:
+            await asyncio.wait_for(self._primary.open(), self._call_timeout)
+        except UNAVAILABLE as exc:
+            _logger.warning(f'Cache {self._primary!r}: {exc!r}')
+        if self._pending:
+            await self.reconcile()
+        return None
+
+    async def _reconcile(self) -> None:
+        try:
+            await self.reconcile()
+        finally:
+            self._reconciling = None
+
+    async def reconcile(self) -> int:
+        """
+        Kirim ulang key yang tercatat ke `primary`, berhenti jika
+        `primary` gagal lagi. Returns jumlah yang masih pending
+        """
+        for name, entry in list(self._pending.items()):
+            partition, key = name
+            op, value, expires = entry
+            ttl = None if expires is None else expires - time.time()
+            if ttl is not None and ttl <= 0:
+                self._pending.pop(name, None)
+                continue
+            if op == 'add':
+                ok, added = await self._call(
+                        lambda: self._primary_add(partition, key, value, ttl))
+                if ok and not added:
+                    self.reconcile_existing += 1
+                    _logger.warning(f'Reconcile {key}: sudah ada di '
+                                    f'{self._primary!r}, cek duplicate')
+            elif op == 'set':
+                ok, _ = await self._call(
+                        lambda: self._primary_set(partition, key, value, ttl))
+            else:
+                ok, _ = await self._call(
+                        lambda: self._primary_delete(partition, key))
+            if not ok:
+                break
+            if self._pending.get(name) is entry:
+                self._remember(partition, key, None)
+                self.reconciled += 1
+                await self._local_delete(partition, key)
+        self._compact()
+        return len(self._pending)
+
+    # primary dan local, dengan atau tanpa partition
+
+    def _primary_add(
+            self,
+            partition: Optional[str],
+            key: str,
+            value: bytes,
+            ttl: Optional[float]
+        ) -> Awaitable[bool]:
+        if partition is None:
+            return self._primary.add(key, value, _seconds(ttl))
+        return self._primary.partition_add(partition, key, value, ttl or 1)
+
+    def _primary_set(
+            self,
+            partition: Optional[str],
+            key: str,
+            value: bytes,
+            ttl: Optional[float]
+        ) -> Awaitable[None]:
+        if partition is None:
+            return self._primary.set(key, value, _seconds(ttl))
+        return self._primary.partition_set(partition, key, value, ttl or 1)
+
+    def _primary_get(
+            self,
+            partition: Optional[str],
+            key: str
+        ) -> Awaitable[Optional[bytes]]:
+        if partition is None:
+            return self._primary.get(key)
+        return self._primary.partition_get(partition, key)
+
+    def _primary_delete(
+            self,
+            partition: Optional[str],
+            key: str
+        ) -> Awaitable[bool]:
+        if partition is None:
+            return self._primary.delete(key)
+        return self._primary.partition_delete(partition, key)
+
+    async def _local_get(
+            self,
+            partition: Optional[str],
+            key: str
+        ) -> Optional[bytes]:
+        if partition is None:
+            return await self._local.get(key)
+        return await self._local.partition_get(partition, key)
+
+    async def _local_delete(self, partition: Optional[str], key: str) -> bool:
+        if partition is None:
+            return await self._local.delete(key)
+        return await self._local.partition_delete(partition, key)
+
+    async def _add(
+            self,
+            partition: Optional[str],
+            key: str,
+            value: bytes,
+            ttl: Optional[float]
+        ) -> bool:
+        if (partition, key) in self._pending \
+                and await self._local_get(partition, key) is not None:
+            # dicatat saat degraded, belum di primary
+            return False
+        ok, added = await self._call(
+                lambda: self._primary_add(partition, key, value, ttl))
+        if ok:
+            return bool(added)
+        if partition is None:
+            added = await self._local.add(key, value, _seconds(ttl))
+        else:
+            added = await self._local.partition_add(
+                    partition, key, value, ttl or 1)
+        if added:
+            self.fallbacks += 1
+            self._remember(partition, key, ('add', value, _expires(ttl)))
+        return added
+
+    async def _set(
+            self,
+            partition: Optional[str],
+            key: str,
+            value: bytes,
+            ttl: Optional[float]
+        ) -> None:
+        entry = self._pending.get((partition, key))
+        if entry is None or entry[0] != 'add':
+            ok, _ = await self._call(
+                    lambda: self._primary_set(partition, key, value, ttl))
+            if ok:
+                return None
+        # belum di primary: `add` tetap `add` saat reconcile
+        op = entry and entry[0] == 'add' and 'add' or 'set'
+        if partition is None:
+            await self._local.set(key, value, _seconds(ttl))
+        else:
+            await self._local.partition_set(partition, key, value, ttl or 1)
+        self.fallbacks += 1
+        self._remember(partition, key, (op, value, _expires(ttl)))
+        return None
+
+    async def _get(
+            self,
+            partition: Optional[str],
+            key: str
+        ) -> Optional[bytes]:
+        if (partition, key) in self._pending:
+            value = await self._local_get(partition, key)
+            if value is not None:
+                return value
+        ok, value = await self._call(lambda: self._primary_get(partition, key))
+        if ok:
+            return value
+        self.fallbacks += 1
+        return await self._local_get(partition, key)
+
+    async def _delete(self, partition: Optional[str], key: str) -> bool:
+        local = await self._local_delete(partition, key)
+        ok, deleted = await self._call(
+                lambda: self._primary_delete(partition, key))
+        if ok:
+            if (partition, key) in self._pending:
+                self._remember(partition, key, None)
+            return bool(deleted) or local
+        self.fallbacks += 1
+        self._remember(partition, key, ('del', b'', None))
+        return local
+
+    # CacheBackend
+
+    async def add(
+            self,
+            key: str,
+            value: bytes = b'1',
+            ttl: Union[int, None] = None
+        ) -> bool:
+        return await self._add(None, key, value, ttl)
+
+    async def set(
+            self,
+            key: str,
+            value: bytes,
+            ttl: Union[int, None] = None
+        ) -> None:
+        return await self._set(None, key, value, ttl)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._get(None, key)
+
+    async def exists(self, key: str) -> bool:
+        return await self._get(None, key) is not None
+
+    async def delete(self, key: str) -> bool:
+        return await self._delete(None, key)
+
+    async def partition_add(
+            self,
+            partition: str,
+            key: str,
+            value: bytes = b'1',
+            ttl: float = 1
+        ) -> bool:
+        return await self._add(partition, key, value, ttl)
+
+    async def partition_set(
+            self,
+            partition: str,
+            key: str,
+            value: bytes,
+            ttl: float = 1
+        ) -> None:
+        return await self._set(partition, key, value, ttl)
+
+    async def partition_get(
+            self,
+            partition: str,
+            key: str
+        ) -> Optional[bytes]:
+        return await self._get(partition, key)
+
+    async def partition_delete(self, partition: str, key: str) -> bool:
+        return await self._delete(partition, key)
+
+    async def drop_partition(self, partition: str) -> bool:
+        await self._local.drop_partition(partition)
+        ok, dropped = await self._call(
+                lambda: self._primary.drop_partition(partition))
+        return bool(ok and dropped)
+
+    async def close(self) -> None:
+        if self._reconciling is not None:
+            self._reconciling.cancel()
+            self._reconciling = None
+        if self._journal_fd is not None:
+            os.close(self._journal_fd)
+            self._journal_fd = None
+        await self._primary.close()
+        return None
+
+    def abort(self) -> None:
+        self._primary.abort()
+        return None
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        stats = self._primary.stats()
+        stats.update(
+                fallbacks=self.fallbacks,
+                pending=len(self._pending),
+                reconciled=self.reconciled,
+                reconcile_existing=self.reconcile_existing
+            )
+        return stats
+
+
+def _seconds(ttl: Optional[float]) -> Optional[int]:
+    return None if ttl is None else max(int(ttl + 0.5), 1)
+
+
+def _expires(ttl: Optional[float]) -> Optional[float]:
+    return None if ttl is None else time.time() + ttl
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Cache: Compact Key
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import base64
+import hashlib
+
+from typing import Union
+
+
+def short_prefix(namespace: str) -> str:
+    """ 4 karakter base64url dari namespace, dihitung sekali """
+    return base64.urlsafe_b64encode(
+            hashlib.blake2b(namespace.encode(), digest_size=3).digest()
+        ).decode()
+
+
+class KeyEncoder:
+    """
+    Key idempotency berukuran tetap: prefix namespace (4 karakter) +
+    base64url digest blake2b (partner, X-External-Id) `digest_size` byte,
+    misal 12 byte -> 16 karakter, total 20 byte berapapun panjang
+    namespace dan X-External-Id.
+
+    Namespace menjadi key blake2b, state-nya dihitung sekali saat
+    instantiate dan di-copy per key. Key tetap ASCII tanpa spasi agar
+    valid untuk semua backend (memcached text protocol).
+
+    Peluang collision 12 byte (96 bit) untuk 10 juta key per hari kurang
+    dari 1e-14.
+    """
+    def __init__(
+            self,
+            namespace: str,
+            digest_size: int = 12,
+            prefix: Union[str, None] = None
+        ) -> None:
+        assert 12 <= digest_size <= 16
+        self._namespace = namespace
+        self._digest_size = digest_size
+        self._prefix = short_prefix(namespace) if prefix is None else prefix
+        # key blake2b maksimal 64 byte
+        self._state = hashlib.blake2b(
+                key=hashlib.blake2b(namespace.encode()).digest()
+                    if len(namespace.encode()) > 64 else namespace.encode(),
+                digest_size=digest_size)
+
+    @property
+    def prefix(self) -> str:
+        return self._prefix
+
+    @property
+    def digest_size(self) -> int:
+        return self._digest_size
+
+    @property
+    def size(self) -> int:
+        """ Panjang key hasil `encode` """
+        return len(self._prefix) + len(self.field('', ''))
+
+    def field(self, key: str, partner: str = '') -> str:
+        """ Digest tanpa prefix, misal untuk field HASH partition """
+        digest = self._state.copy()
+        digest.update(f'{partner}\x00{key}'.encode())
+        return base64.urlsafe_b64encode(digest.digest())\
+                    .rstrip(b'=').decode()
+
+    def encode(self, key: str, partner: str = '') -> str:
+        return self._prefix + self.field(key, partner)
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Cache: Memcached Backend
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+import hashlib
+import re
+
+from typing import Optional, Union
+
+from snapapi.cache.base import StreamBackend, CacheError
+
+# key memcached: maksimal 250 byte, tanpa spasi dan control character
+_KEY_INVALID = re.compile(rb'[\x00-\x20\x7f]')
+_KEY_MAXLEN = 250
+# exptime lebih dari 30 hari dianggap unix timestamp oleh memcached
+_TTL_RELATIVE_MAX = 60 * 60 * 24 * 30
+
+
+def encode_key(key: str) -> bytes:
+    """ Key yang tidak valid untuk memcached diganti hash-nya """
+    raw = key.encode()
+    if len(raw) > _KEY_MAXLEN or _KEY_INVALID.search(raw):
+        return b'snapapi:' + hashlib.blake2b(raw, digest_size=20)\
+                                    .hexdigest().encode()
+    return raw
+
+
+async def read_line(reader: asyncio.StreamReader) -> bytes:
+    line = (await reader.readuntil(b'\r\n'))[:-2]
+    if line == b'ERROR' or line.startswith((b'CLIENT_ERROR',
+                                            b'SERVER_ERROR')):
+        raise CacheError(line.decode(errors='replace'))
+    return line
+
+
+async def read_value(reader: asyncio.StreamReader) -> Optional[bytes]:
+    """ Reply `get`: `VALUE <key> <flags> <bytes>` ... `END` """
+    line = await read_line(reader)
+    if line == b'END':
+        return None
+    if not line.startswith(b'VALUE '):
+        raise CacheError(f'Reply memcached tidak dikenal: {line!r}')
+    length = int(line.rsplit(b' ', 1)[1])
+    data = (await reader.readexactly(length + 2))[:-2]
+    line = await read_line(reader)
+    if line != b'END':
+        raise CacheError(f'Reply memcached tidak dikenal: {line!r}')
+    return data
+
+
+class MemcachedBackend(StreamBackend):
+    """
+    Memcached via text protocol, satu round trip per operasi:
+
+    - `add`:    `add key 0 ttl len` (atomic, NOT_STORED jika sudah ada)
+    - `set`:    `set key 0 ttl len`
+    - `get`:    `get key`
+    - `delete`: `delete key`
+    """
+    name = 'memcached'
+
+    def __init__(
+            self,
+            host: str = 'localhost',
+            port: int = 11211,
+            *,
+            timeout: Union[float, None] = 9,
+            pool_size: int = 8,
+            pool_minsize: int = 1,
+            health_check_interval: float = 30
+        ) -> None:
+        super().__init__(host, port,
+                         timeout=timeout,
+                         pool_size=pool_size,
+                         pool_minsize=pool_minsize,
+                         health_check_interval=health_check_interval)
+
+    async def _ping(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter
+        ) -> None:
+        writer.write(b'version\r\n')
+        await writer.drain()
+        if not (await read_line(reader)).startswith(b'VERSION'):
+            raise CacheError('version gagal')
+        return None
+
+    async def _store(
+            self,
+            command: bytes,
+            key: str,
+            value: bytes,
+            ttl: Union[int, None]
+        ) -> bool:
+        """ `add` atau `set`, returns True jika STORED """
+        exptime = 0 if ttl is None \
+                    else min(max(int(ttl), 1), _TTL_RELATIVE_MAX)
+        payload = b'%s %s 0 %d %d\r\n%s\r\n' % (
+                command, encode_key(key), exptime, len(value), value)
+        reply = await self._request(payload, read_line)
+        if reply == b'STORED':
+            return True
+        if reply == b'NOT_STORED':
+            return False
+        raise CacheError(f'Reply memcached tidak dikenal: {reply!r}')
+
+    async def add(
+            self,
+            key: str,
+            value: bytes = b'1',
+            ttl: Union[int, None] = None
+        ) -> bool:
+        return await self._store(b'add', key, value, ttl)
+
+    async def set(
+            self,
+            key: str,
+            value: bytes,
+            ttl: Union[int, None] = None
+        ) -> None:
+        await self._store(b'set', key, value, ttl)
+        return None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._request(b'get %s\r\n' % encode_key(key),
+                                   read_value)
+
+    async def delete(self, key: str) -> bool:
+        reply = await self._request(b'delete %s\r\n' % encode_key(key),
+                                    read_line)
+        if reply == b'DELETED':
+            return True
+        if reply == b'NOT_FOUND':
+            return False
+        raise CacheError(f'Reply memcached tidak dikenal: {reply!r}')
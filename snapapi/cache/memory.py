@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Cache: Memory Backend
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import time
+
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+
+from snapapi.cache.base import CacheBackend
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel untuk expiry key.
+
+    `levels` roda, masing-masing `2 ** bits` slot. Roda level 0 maju satu
+    slot per tick (`resolution` detik); setiap kali roda level L kembali
+    ke slot 0, satu slot roda level L+1 diturunkan (cascade) ke roda di
+    bawahnya. Schedule, cancel dan expiry O(1) per key, tanpa heap dan
+    tanpa scan semua key.
+
+    Default 4 level x 64 slot x 1 detik, cukup untuk TTL hingga 2^24
+    detik (~194 hari); TTL lebih lama ditaruh di level teratas dan
+    dijadwalkan ulang saat di-cascade.
+    """
+    def __init__(
+            self,
+            *,
+            bits: int = 6,
+            levels: int = 4,
+            resolution: float = 1.0,
+            clock: Callable[[], float] = time.monotonic
+        ) -> None:
+        assert bits > 0 and levels > 0 and resolution > 0
+        self._bits = bits
+        self._levels = levels
+        self._mask = (1 << bits) - 1
+        self._resolution = resolution
+        self._clock = clock
+        self._wheels: List[List[Set[str]]] = [
+                [set() for _ in range(1 << bits)] for _ in range(levels)
+            ]
+        # key -> tick expiry
+        self._expires: Dict[str, int] = {}
+        self._tick: int = self.now()
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._expires
+
+    @property
+    def tick(self) -> int:
+        return self._tick
+
+    def now(self) -> int:
+        """ Tick saat ini menurut `clock` """
+        return int(self._clock() / self._resolution)
+
+    def deadline(self, ttl: float) -> int:
+        """ Tick expiry untuk `ttl` detik dari sekarang, minimal 1 tick """
+        return self.now() + max(int(ttl / self._resolution + 0.5), 1)
+
+    def expires(self, key: str) -> Optional[int]:
+        return self._expires.get(key)
+
+    def schedule(self, key: str, tick: int) -> None:
+        """ Jadwalkan (ulang) expiry `key` pada `tick` """
+        self._expires[key] = tick
+        # tick saat ini sudah diproses
+        self._place(key, tick, self._tick + 1)
+        return None
+
+    def cancel(self, key: str) -> None:
+        """ Batalkan expiry; key di slot dibuang saat slot diproses """
+        self._expires.pop(key, None)
+        return None
+
+    def advance(self, now: Optional[int] = None) -> List[str]:
+        """ Majukan roda hingga `now`, returns key yang expired """
+        now = self.now() if now is None else now
+        expired: List[str] = []
+        if now - self._tick > (1 << (self._bits * 2)):
+            # lama tidak dipakai: lebih murah menata ulang semua key
+            return self._rebuild(now)
+        while self._tick < now:
+            self._tick += 1
+            tick = self._tick
+            # cascade dari level teratas yang rodanya kembali ke slot 0
+            level = 1
+            while level < self._levels \
+                    and not tick & ((1 << (self._bits * level)) - 1):
+                level += 1
+            for upper in range(level - 1, 0, -1):
+                self._cascade(upper,
+                              (tick >> (self._bits * upper)) & self._mask)
+            index = tick & self._mask
+            slot, self._wheels[0][index] = self._wheels[0][index], set()
+            for key in slot:
+                expires = self._expires.get(key)
+                if expires is None:
+                    continue
+                if expires <= tick:
+                    del self._expires[key]
+                    expired.append(key)
+                else:
+                    # lebih dari satu putaran (1 level) atau dijadwalkan
+                    # ulang, kembalikan ke slot yang benar
+                    self._place(key, expires, tick + 1)
+        return expired
+
+    def _place(self, key: str, tick: int, earliest: int) -> None:
+        """ Taruh `key` di slot untuk `tick`, paling cepat `earliest` """
+        tick = max(tick, earliest)
+        delta = tick - self._tick
+        level = 0
+        while level < self._levels - 1 \
+                and delta >= 1 << (self._bits * (level + 1)):
+            level += 1
+        slot = (tick >> (self._bits * level)) & self._mask
+        self._wheels[level][slot].add(key)
+        return None
+
+    def _cascade(self, level: int, index: int) -> None:
+        slot = self._wheels[level][index]
+        keys, self._wheels[level][index] = slot, set()
+        for key in keys:
+            tick = self._expires.get(key)
+            if tick is not None:
+                # slot level 0 tick saat ini belum diproses
+                self._place(key, tick, self._tick)
+        return None
+
+    def _rebuild(self, now: int) -> List[str]:
+        expired = [key for key, tick in self._expires.items() if tick <= now]
+        for key in expired:
+            del self._expires[key]
+        self._tick = now
+        for wheel in self._wheels:
+            for slot in wheel:
+                slot.clear()
+        for key, tick in self._expires.items():
+            self._place(key, tick, now + 1)
+        return expired
+
+
+class MemoryBackend(CacheBackend):
+    """
+    Idempotency store in-process, expiry dengan `TimingWheel`.
+    Hanya untuk Dev/Demo atau 1 worker: key tidak dibagi antar process
+    dan hilang saat restart.
+    """
+    name = 'memory'
+
+    def __init__(
+            self,
+            *,
+            resolution: float = 1.0,
+            clock: Callable[[], float] = time.monotonic
+        ) -> None:
+        self._wheel = TimingWheel(resolution=resolution, clock=clock)
+        self._values: Dict[str, bytes] = {}
+        # partition -> (tick expiry, key -> value), tanpa timing wheel
+        self._partitions: Dict[str, Tuple[int, Dict[str, bytes]]] = {}
+
+    def __len__(self) -> int:
+        now = self._expire()
+        return len(self._values) + sum(
+                len(keys) for tick, keys in self._partitions.values()
+                if tick > now)
+
+    @property
+    def wheel(self) -> TimingWheel:
+        return self._wheel
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        return dict(size=len(self))
+
+    def _expire(self) -> int:
+        """ Buang key yang expired, returns tick saat ini """
+        now = self._wheel.now()
+        if now != self._wheel.tick:
+            for key in self._wheel.advance(now):
+                self._values.pop(key, None)
+        return now
+
+    def _alive(self, key: str, now: int) -> bool:
+        if key not in self._values:
+            return False
+        tick = self._wheel.expires(key)
+        if tick is not None and tick <= now:
+            # belum diproses roda, misal resolution kasar
+            self._wheel.cancel(key)
+            del self._values[key]
+            return False
+        return True
+
+    async def add(
+            self,
+            key: str,
+            value: bytes = b'1',
+            ttl: Union[int, None] = None
+        ) -> bool:
+        now = self._expire()
+        if self._alive(key, now):
+            return False
+        self._values[key] = value
+        if ttl is None:
+            self._wheel.cancel(key)
+        else:
+            self._wheel.schedule(key, self._wheel.deadline(ttl))
+        return True
+
+    async def set(
+            self,
+            key: str,
+            value: bytes,
+            ttl: Union[int, None] = None
+        ) -> None:
+        self._expire()
+        self._values[key] = value
+        if ttl is None:
+            self._wheel.cancel(key)
+        else:
+            self._wheel.schedule(key, self._wheel.deadline(ttl))
+        return None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        now = self._expire()
+        if not self._alive(key, now):
+            return None
+        return self._values[key]
+
+    async def exists(self, key: str) -> bool:
+        return self._alive(key, self._expire())
+
+    async def delete(self, key: str) -> bool:
+        now = self._expire()
+        alive = self._alive(key, now)
+        self._values.pop(key, None)
+        self._wheel.cancel(key)
+        return alive
+
+    def _partition(
+            self,
+            partition: str,
+            ttl: Union[float, None] = None
+        ) -> Optional[Dict[str, bytes]]:
+        """ Partition yang belum expired, dibuat jika `ttl` diisi """
+        now = self._wheel.now()
+        entry = self._partitions.get(partition)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        if ttl is None:
+            return None
+        # partition baru, biasanya sekali sehari: buang yang expired
+        for name, (tick, _) in list(self._partitions.items()):
+            if tick <= now:
+                del self._partitions[name]
+        keys: Dict[str, bytes] = {}
+        self._partitions[partition] = (self._wheel.deadline(ttl), keys)
+        return keys
+
+    async def partition_add(
+            self,
+            partition: str,
+            key: str,
+            value: bytes = b'1',
+            ttl: float = 1
+        ) -> bool:
+        keys = self._partition(partition, ttl)
+        assert keys is not None
+        if key in keys:
+            return False
+        keys[key] = value
+        return True
+
+    async def partition_set(
+            self,
+            partition: str,
+            key: str,
+            value: bytes,
+            ttl: float = 1
+        ) -> None:
+        keys = self._partition(partition, ttl)
+        assert keys is not None
+        keys[key] = value
+        return None
+
+    async def partition_get(
+            self,
+            partition: str,
+            key: str
+        ) -> Optional[bytes]:
+        keys = self._partition(partition)
+        return keys and keys.get(key) or None
+
+    async def partition_delete(self, partition: str, key: str) -> bool:
+        keys = self._partition(partition)
+        return keys is not None and keys.pop(key, None) is not None
+
+    async def drop_partition(self, partition: str) -> bool:
+        return self._partitions.pop(partition, None) is not None
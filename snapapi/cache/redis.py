@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Cache: Redis Backend
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+
+from typing import Optional, Union, Tuple
+
+from snapapi.cache.base import StreamBackend, CacheError
+
+
+def encode_command(*args: Union[bytes, str, int]) -> bytes:
+    """ RESP array of bulk strings """
+    parts = [b'*%d\r\n' % len(args)]
+    for arg in args:
+        if isinstance(arg, int):
+            arg = str(arg)
+        if isinstance(arg, str):
+            arg = arg.encode()
+        parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+    return b''.join(parts)
+
+
+async def read_reply(
+        reader: asyncio.StreamReader
+    ) -> Union[bytes, int, None]:
+    """
+    Satu reply RESP2: simple string dan bulk string sebagai bytes,
+    integer sebagai int, nil sebagai None. Error di-raise `CacheError`.
+    """
+    line = await reader.readuntil(b'\r\n')
+    prefix, body = line[:1], line[1:-2]
+    if prefix == b'+':
+        return body
+    if prefix == b':':
+        return int(body)
+    if prefix == b'$':
+        length = int(body)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if prefix == b'-':
+        raise CacheError(body.decode(errors='replace'))
+    raise CacheError(f'Reply Redis tidak dikenal: {line!r}')
+
+
+class RedisBackend(StreamBackend):
+    """
+    Redis via RESP langsung, satu round trip per operasi:
+
+    - `add`:    `SET key value NX EX ttl`
+    - `get`:    `GET key`
+    - `exists`: `EXISTS key`
+    - `delete`: `DEL key`
+
+    Partition disimpan sebagai satu HASH (`HSETNX partition key value`),
+    setiap add disertai `EXPIRE partition ttl NX` dalam round trip yang
+    sama, sehingga hash yang dibuat ulang (eviction, FLUSHALL,
+    `drop_partition`) tetap dapat TTL. Redis < 7 (tanpa `EXPIRE NX`)
+    dapat `EXPIRE partition ttl`; `ttl` adalah sisa umur partition, jadi
+    batas expired-nya tetap. `drop_partition` cukup `UNLINK partition`.
+    """
+    name = 'redis'
+
+    def __init__(
+            self,
+            host: str = 'localhost',
+            port: int = 6379,
+            *,
+            db: Union[int, None] = None,
+            password: Union[str, None] = None,
+            timeout: Union[float, None] = 9,
+            pool_size: int = 8,
+            pool_minsize: int = 1,
+            health_check_interval: float = 30
+        ) -> None:
+        super().__init__(host, port,
+                         timeout=timeout,
+                         pool_size=pool_size,
+                         pool_minsize=pool_minsize,
+                         health_check_interval=health_check_interval)
+        self._db = db
+        self._password = password
+        # False jika server menolak `EXPIRE ... NX` (Redis < 7)
+        self._expire_nx = True
+
+    @property
+    def db(self) -> Union[int, None]:
+        return self._db
+
+    async def _on_connect(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter
+        ) -> None:
+        commands = []
+        if self._password:
+            commands.append(encode_command('AUTH', self._password))
+        if self._db:
+            commands.append(encode_command('SELECT', self._db))
+        if not commands:
+            return None
+        writer.write(b''.join(commands))
+        await writer.drain()
+        for _ in commands:
+            await read_reply(reader)
+        return None
+
+    async def _ping(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter
+        ) -> None:
+        writer.write(encode_command('PING'))
+        await writer.drain()
+        if await read_reply(reader) != b'PONG':
+            raise CacheError('PING gagal')
+        return None
+
+    async def add(
+            self,
+            key: str,
+            value: bytes = b'1',
+            ttl: Union[int, None] = None
+        ) -> bool:
+        if ttl is None:
+            command = encode_command('SET', key, value, 'NX')
+        else:
+            # EX 0 ditolak Redis
+            command = encode_command('SET', key, value, 'NX', 'EX',
+                                     max(int(ttl), 1))
+        reply = await self._request(command, read_reply)
+        return reply == b'OK'
+
+    async def set(
+            self,
+            key: str,
+            value: bytes,
+            ttl: Union[int, None] = None
+        ) -> None:
+        if ttl is None:
+            command = encode_command('SET', key, value)
+        else:
+            command = encode_command('SET', key, value, 'EX',
+                                     max(int(ttl), 1))
+        await self._request(command, read_reply)
+        return None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        reply = await self._request(encode_command('GET', key), read_reply)
+        return isinstance(reply, bytes) and reply or None
+
+    async def exists(self, key: str) -> bool:
+        reply = await self._request(encode_command('EXISTS', key),
+                                    read_reply)
+        return reply == 1
+
+    async def delete(self, key: str) -> bool:
+        reply = await self._request(encode_command('DEL', key), read_reply)
+        return reply == 1
+
+    async def partition_add(
+            self,
+            partition: str,
+            key: str,
+            value: bytes = b'1',
+            ttl: float = 1
+        ) -> bool:
+        seconds = max(int(ttl + 0.5), 1)
+        expire_nx = self._expire_nx
+        command = encode_command('HSETNX', partition, key, value) \
+            + encode_command('EXPIRE', partition, seconds,
+                             *(expire_nx and ('NX',) or ()))
+
+        async def parse(reader: asyncio.StreamReader) -> Tuple[
+                Union[bytes, int, None], bool]:
+            reply = await read_reply(reader)
+            try:
+                await read_reply(reader)
+            except CacheError:
+                if not expire_nx:
+                    raise
+                return reply, False
+            return reply, True
+
+        reply, expired = await self._request(command, parse)
+        if not expired:
+            # Redis < 7: EXPIRE tanpa NX, untuk add ini dan seterusnya
+            self._expire_nx = False
+            await self._request(
+                    encode_command('EXPIRE', partition, seconds), read_reply)
+        return reply == 1
+
+    async def partition_set(
+            self,
+            partition: str,
+            key: str,
+            value: bytes,
+            ttl: float = 1
+        ) -> None:
+        """ Setelah `partition_add`, EXPIRE partition sudah diset """
+        await self._request(encode_command('HSET', partition, key, value),
+                            read_reply)
+        return None
+
+    async def partition_get(
+            self,
+            partition: str,
+            key: str
+        ) -> Optional[bytes]:
+        reply = await self._request(
+                encode_command('HGET', partition, key), read_reply)
+        return isinstance(reply, bytes) and reply or None
+
+    async def partition_exists(self, partition: str, key: str) -> bool:
+        reply = await self._request(
+                encode_command('HEXISTS', partition, key), read_reply)
+        return reply == 1
+
+    async def partition_delete(self, partition: str, key: str) -> bool:
+        reply = await self._request(
+                encode_command('HDEL', partition, key), read_reply)
+        return reply == 1
+
+    async def drop_partition(self, partition: str) -> bool:
+        """ UNLINK: hash besar dibebaskan di background oleh Redis """
+        reply = await self._request(
+                encode_command('UNLINK', partition), read_reply)
+        return reply == 1
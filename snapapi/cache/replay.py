@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Cache: Response Replay
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import hashlib
+
+from contextvars import ContextVar
+from typing import Optional, Set, Tuple
+
+# value di cache: prefix, fingerprint request, status code, body response.
+# Value lain (misal b'1' dari `add`) berarti request masih diproses
+PREFIX = b'\x00R1'
+# sudah selesai tetapi response tidak tersimpan: retry tetap `Conflict`
+DONE = b'\x00R0'
+_FINGERPRINT_SIZE = 16
+_HEAD = len(PREFIX) + _FINGERPRINT_SIZE + 3
+# value_size minimal backend 'shared' untuk replay: head dan response
+# SNAP yang umum (error, inquiry tanpa banyak billDetails). Response yang
+# lebih besar tidak tersimpan, retry tetap `Conflict`
+MIN_VALUE_SIZE = 512
+
+# X-External-Id yang berhasil di-`add` selama satu request, diisi oleh
+# `SNAPCache.add`, dibaca oleh `SNAPRoute` setelah endpoint selesai
+claims: ContextVar[Optional[Set[str]]] = ContextVar(
+        'snapapi_replay_claims', default=None)
+
+
+def fingerprint(
+        http_method: str,
+        path: str,
+        partner_id: str,
+        signature: str,
+        body: bytes
+    ) -> bytes:
+    """
+    Identitas request: retry yang sama persis (termasuk X-SIGNATURE yang
+    sudah pernah diverifikasi) menghasilkan fingerprint yang sama
+    """
+    digest = hashlib.blake2b(digest_size=_FINGERPRINT_SIZE)
+    for part in (http_method, path, partner_id, signature):
+        digest.update(part.encode())
+        digest.update(b'\x00')
+    digest.update(body)
+    return digest.digest()
+
+
+def encode(
+        request_fingerprint: bytes,
+        status_code: int,
+        body: bytes
+    ) -> bytes:
+    return b'%s%s%03d%s' % (PREFIX, request_fingerprint, status_code, body)
+
+
+def decode(value: bytes) -> Optional[Tuple[bytes, int, bytes]]:
+    """ (fingerprint, status_code, body), None jika masih diproses """
+    if not value.startswith(PREFIX) or len(value) < _HEAD:
+        return None
+    start = len(PREFIX)
+    return value[start:start + _FINGERPRINT_SIZE], \
+            int(value[_HEAD - 3:_HEAD]), value[_HEAD:]
@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Cache: Consistent Hash Ring
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+import bisect
+import hashlib
+import logging
+import sys
+import time
+_logger = logging.getLogger(__name__)
+_logger.addHandler(logging.StreamHandler(sys.stdout))
+
+from typing import (
+        Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar, Union
+    )
+
+from snapapi.cache.base import CacheBackend, UNAVAILABLE
+
+T = TypeVar("T")
+
+
+def _hash(text: str) -> int:
+    return int.from_bytes(
+            hashlib.blake2b(text.encode(), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """
+    Consistent hash ring: setiap node punya `vnodes` titik di ring,
+    key milik titik pertama searah jarum jam. Menambah satu node ke `n`
+    node hanya memindahkan sekitar 1/(n+1) key, sebarannya merata karena
+    virtual nodes.
+    """
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = 160) -> None:
+        assert vnodes > 0
+        self._vnodes = vnodes
+        self._nodes: List[str] = []
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self._nodes)
+
+    @property
+    def vnodes(self) -> int:
+        return self._vnodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, node: object) -> bool:
+        return node in self._nodes
+
+    def copy(self) -> 'HashRing':
+        ring = HashRing(vnodes=self._vnodes)
+        ring._nodes = list(self._nodes)
+        ring._points = list(self._points)
+        ring._owners = list(self._owners)
+        return ring
+
+    def _build(self) -> None:
+        points = sorted((_hash(f'{node}#{i}'), node)
+                        for node in self._nodes
+                        for i in range(self._vnodes))
+        self._points = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+        return None
+
+    def add(self, node: str) -> None:
+        if node not in self._nodes:
+            self._nodes.append(node)
+            self._build()
+        return None
+
+    def remove(self, node: str) -> None:
+        if node in self._nodes:
+            self._nodes.remove(node)
+            self._build()
+        return None
+
+    def node(self, key: str) -> str:
+        """ Node pemilik `key` """
+        if not self._points:
+            raise LookupError('HashRing kosong')
+        index = bisect.bisect(self._points, _hash(key))
+        return self._owners[index % len(self._owners)]
+
+    def preference(self, key: str, count: int) -> List[str]:
+        """ `count` node berbeda searah jarum jam, pemilik `key` pertama """
+        count = min(count, len(self._nodes))
+        if not count:
+            return []
+        start = bisect.bisect(self._points, _hash(key))
+        owners = self._owners
+        nodes: List[str] = []
+        for i in range(len(owners)):
+            node = owners[(start + i) % len(owners)]
+            if node not in nodes:
+                nodes.append(node)
+                if len(nodes) == count:
+                    break
+        return nodes
+
+
+class ShardedBackend(CacheBackend):
+    """
+    Beberapa node redis/memcached, key dibagi dengan `HashRing`.
+
+    - `add`/`set` ke node pemilik key, dan ke `replicas` - 1 node
+      berikutnya di ring (best effort, concurrent)
+    - node yang timeout/error koneksi ditandai down selama
+      `retry_interval` detik; operasi pindah ke node berikutnya di ring,
+      yaitu replica, sehingga key yang sudah di-replicate tetap terbaca
+    - `add_node`: hanya ~1/(n+1) key yang pindah pemilik. Key tidak
+      disalin, X-External-Id expired paling lambat tengah malam; selama
+      `settle` detik `add` juga mengecek pemilik lama agar duplicate
+      tidak lolos
+
+    Key di-hash tanpa partition, sehingga satu partition tersebar di
+    semua node dan `drop_partition` dijalankan di semua node.
+    """
+    name = 'sharded'
+
+    def __init__(
+            self,
+            backends: Dict[str, CacheBackend],
+            *,
+            vnodes: int = 160,
+            replicas: int = 1,
+            retry_interval: float = 5,
+            settle: float = 86400,
+            clock: Callable[[], float] = time.monotonic
+        ) -> None:
+        assert backends and replicas > 0
+        self._backends = dict(backends)
+        self._ring = HashRing(self._backends, vnodes)
+        self._replicas = replicas
+        self._retry_interval = retry_interval
+        self._settle = settle
+        self._clock = clock
+        self._down: Dict[str, float] = {}
+        self._previous: Union[HashRing, None] = None
+        self._previous_until = 0.0
+        self.failovers = 0
+        self.replica_errors = 0
+        self.previous_hits = 0
+
+    @property
+    def ring(self) -> HashRing:
+        return self._ring
+
+    @property
+    def backends(self) -> Dict[str, CacheBackend]:
+        return dict(self._backends)
+
+    @property
+    def replicas(self) -> int:
+        return self._replicas
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}("\
+               f"nodes={self._ring.nodes}, replicas={self._replicas})"
+
+    def add_node(self, node: str, backend: CacheBackend) -> None:
+        """ Tambah node, pemilik lama dicek selama `settle` detik """
+        if node in self._backends:
+            return None
+        self._previous = self._ring.copy()
+        self._previous_until = self._clock() + self._settle
+        self._backends[node] = backend
+        self._ring.add(node)
+        return None
+
+    def remove_node(self, node: str) -> Union[CacheBackend, None]:
+        """
+        Keluarkan node dari ring, returns backend-nya (tutup sendiri).
+        Key di node tersebut hilang kecuali ada di replica
+        """
+        backend = self._backends.pop(node, None)
+        self._ring.remove(node)
+        self._down.pop(node, None)
+        if self._previous is not None:
+            self._previous.remove(node)
+        return backend
+
+    def _is_down(self, node: str) -> bool:
+        until = self._down.get(node)
+        if until is None:
+            return False
+        if self._clock() >= until:
+            del self._down[node]
+            return False
+        return True
+
+    def _mark_down(self, node: str, exc: BaseException) -> None:
+        _logger.warning(f'Cache node {node} down: {exc!r}')
+        self._down[node] = self._clock() + self._retry_interval
+        return None
+
+    def _first(self, ring: HashRing, key: str) -> Optional[str]:
+        """ Node pertama yang tersedia untuk `key` di `ring` """
+        for node in ring.preference(key, len(ring)):
+            if node in self._backends and not self._is_down(node):
+                return node
+        return None
+
+    def _candidates(self, key: str) -> List[str]:
+        """ Semua node urut ring dari pemilik `key`, yang down di akhir """
+        order = self._ring.preference(key, len(self._ring))
+        return [node for node in order if not self._is_down(node)] \
+            + [node for node in order if node in self._down]
+
+    async def _route(
+            self,
+            key: str,
+            call: Callable[[CacheBackend], Awaitable[T]],
+            replicate: Union[Callable[[CacheBackend], Awaitable[T]],
+                             None] = None
+        ) -> T:
+        """
+        `call` ke node pertama yang tersedia, kemudian `replicate` ke
+        `replicas` - 1 node berikutnya
+        """
+        nodes = self._candidates(key)
+        error: Union[BaseException, None] = None
+        for index, node in enumerate(nodes):
+            try:
+                result = await call(self._backends[node])
+            except UNAVAILABLE as exc:
+                self._mark_down(node, exc)
+                error = exc
+                continue
+            if (index or self._down) and node != self._ring.node(key):
+                self.failovers += 1
+            if replicate is not None and self._replicas > 1:
+                await self._replicate(
+                        nodes[index + 1:index + self._replicas], replicate)
+            return result
+        assert error is not None
+        raise error
+
+    async def _replicate(
+            self,
+            nodes: List[str],
+            call: Callable[[CacheBackend], Awaitable[T]]
+        ) -> None:
+        results = await asyncio.gather(
+                *(call(self._backends[node]) for node in nodes),
+                return_exceptions=True)
+        for node, result in zip(nodes, results):
+            if isinstance(result, UNAVAILABLE):
+                self._mark_down(node, result)
+            if isinstance(result, Exception):
+                self.replica_errors += 1
+        return None
+
+    async def _moved(
+            self,
+            key: str,
+            call: Callable[[CacheBackend], Awaitable[bool]]
+        ) -> bool:
+        """ True jika key ada di pemilik lama setelah `add_node` """
+        previous = self._previous
+        if previous is None:
+            return False
+        if self._clock() >= self._previous_until:
+            self._previous = None
+            return False
+        # node yang dulu menerima `add` key ini, termasuk failover
+        node = self._first(previous, key)
+        if node is None or node == self._first(self._ring, key):
+            return False
+        try:
+            found = await call(self._backends[node])
+        except UNAVAILABLE as exc:
+            self._mark_down(node, exc)
+            return False
+        self.previous_hits += found
+        return found
+
+    async def add(
+            self,
+            key: str,
+            value: bytes = b'1',
+            ttl: Union[int, None] = None
+        ) -> bool:
+        if await self._moved(key, lambda backend: backend.exists(key)):
+            return False
+        return await self._route(
+                key, lambda backend: backend.add(key, value, ttl),
+                lambda backend: backend.add(key, value, ttl))
+
+    async def set(
+            self,
+            key: str,
+            value: bytes,
+            ttl: Union[int, None] = None
+        ) -> None:
+        return await self._route(
+                key, lambda backend: backend.set(key, value, ttl),
+                lambda backend: backend.set(key, value, ttl))
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._route(key, lambda backend: backend.get(key))
+
+    async def exists(self, key: str) -> bool:
+        return await self._route(key, lambda backend: backend.exists(key))
+
+    async def delete(self, key: str) -> bool:
+        # termasuk node hasil failover dan pemilik lama
+        nodes = self._ring.preference(key, self._replicas) \
+            + self._candidates(key)[:self._replicas]
+        if self._previous is not None:
+            nodes.append(self._previous.node(key))
+        results = await asyncio.gather(
+                *(self._backends[node].delete(key)
+                  for node in set(nodes) if node in self._backends),
+                return_exceptions=True)
+        return any(result is True for result in results)
+
+    async def partition_add(
+            self,
+            partition: str,
+            key: str,
+            value: bytes = b'1',
+            ttl: float = 1
+        ) -> bool:
+        if await self._moved(key, lambda backend: backend.partition_exists(
+                partition, key)):
+            return False
+        return await self._route(
+                key,
+                lambda backend: backend.partition_add(
+                    partition, key, value, ttl),
+                lambda backend: backend.partition_add(
+                    partition, key, value, ttl))
+
+    async def partition_set(
+            self,
+            partition: str,
+            key: str,
+            value: bytes,
+            ttl: float = 1
+        ) -> None:
+        return await self._route(
+                key,
+                lambda backend: backend.partition_set(
+                    partition, key, value, ttl),
+                lambda backend: backend.partition_set(
+                    partition, key, value, ttl))
+
+    async def partition_get(
+            self,
+            partition: str,
+            key: str
+        ) -> Optional[bytes]:
+        return await self._route(
+                key, lambda backend: backend.partition_get(partition, key))
+
+    async def partition_exists(self, partition: str, key: str) -> bool:
+        return await self._route(
+                key, lambda backend: backend.partition_exists(partition, key))
+
+    async def partition_delete(self, partition: str, key: str) -> bool:
+        nodes = set(self._ring.preference(key, self._replicas)
+                    + self._candidates(key)[:self._replicas])
+        results = await asyncio.gather(
+                *(self._backends[node].partition_delete(partition, key)
+                  for node in nodes),
+                return_exceptions=True)
+        return any(result is True for result in results)
+
+    async def drop_partition(self, partition: str) -> bool:
+        results = await asyncio.gather(
+                *(backend.drop_partition(partition)
+                  for backend in self._backends.values()),
+                return_exceptions=True)
+        return any(result is True for result in results)
+
+    async def open(self) -> None:
+        """ Node yang belum bisa dibuka ditandai down, tidak raise """
+        nodes = list(self._backends)
+        results = await asyncio.gather(
+                *(self._backends[node].open() for node in nodes),
+                return_exceptions=True)
+        for node, result in zip(nodes, results):
+            if isinstance(result, UNAVAILABLE):
+                self._mark_down(node, result)
+            elif isinstance(result, BaseException):
+                raise result
+        return None
+
+    async def close(self) -> None:
+        await asyncio.gather(*(backend.close()
+                               for backend in self._backends.values()))
+        return None
+
+    def abort(self) -> None:
+        for backend in self._backends.values():
+            backend.abort()
+        return None
+
+    def node_stats(self) -> Dict[str, Dict[str, Union[int, float]]]:
+        """ `stats()` per node """
+        return {node: backend.stats()
+                for node, backend in self._backends.items()}
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        down = [node for node in self._ring.nodes if self._is_down(node)]
+        return dict(
+                nodes=len(self._ring),
+                nodes_down=len(down),
+                replicas=self._replicas,
+                failovers=self.failovers,
+                replica_errors=self.replica_errors,
+                previous_hits=self.previous_hits,
+                requests=sum(int(stats.get('requests', 0))
+                             for stats in self.node_stats().values())
+            )
@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Cache: Shared Memory Backend
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ModuleNotFoundError:
+    HAS_FCNTL = False
+
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from snapapi.cache.base import CacheBackend, CacheError
+
+MAGIC = b'SNAPSHM1'
+# magic, capacity, stripes, value_size, slot_size
+_HEADER = struct.Struct('<8sQIII')
+# jumlah slot terpakai per stripe, sekaligus byte yang di-lock
+_COUNTER = struct.Struct('<Q')
+# digest key, expires (epoch detik), panjang value
+_SLOT = struct.Struct('<16sdH')
+
+EMPTY = 0.0
+TOMBSTONE = -1.0
+FOREVER = float('inf')
+# probing melewati slot mati (tombstone/expired) sebanyak ini, maksimal
+# 1/8 segment: segment di-rebuild agar probing kembali pendek
+REBUILD_DEAD = 64
+
+
+def default_path(namespace: str) -> str:
+    """ /dev/shm jika ada (tmpfs), selain itu temp dir """
+    directory = os.path.isdir('/dev/shm') and '/dev/shm' \
+                    or tempfile.gettempdir()
+    return os.path.join(directory, f'snapapi.{namespace}.cache')
+
+
+class SharedMemoryBackend(CacheBackend):
+    """
+    Idempotency store di shared memory (mmap file), dipakai bersama oleh
+    semua worker (gunicorn) di satu host, tanpa redis/memcached.
+
+    Hash table open addressing (linear probing) yang dibagi menjadi
+    `stripes` segment. Setiap segment punya lock sendiri: `fcntl.lockf`
+    satu range byte di header (antar process) dan `threading.Lock`
+    (antar thread), sehingga worker yang mengakses segment berbeda tidak
+    saling menunggu. Key disimpan sebagai blake2b 16 byte dengan
+    expires, `add` adalah insert-if-absent atomic di dalam lock segment.
+
+    Slot expired yang dilewati probing dijadikan tombstone (tidak
+    dihitung terpakai), tombstone tepat sebelum slot EMPTY dijadikan
+    EMPTY. Jika probing melewati `REBUILD_DEAD` slot mati, segment
+    tersebut di-rebuild (hanya key yang masih hidup) di dalam lock-nya,
+    sehingga X-External-Id hari-hari sebelumnya tidak memperpanjang
+    probing. Slot mati dipakai ulang saat `add`. Jika satu segment penuh,
+    `add` raise `CacheError`: naikkan `capacity` (jumlah X-External-Id
+    per hari dengan cadangan, load factor < 0.7).
+
+    Note:   hanya untuk satu host. File dibuat sekali dengan permission
+            600; `capacity`, `stripes` dan `value_size` harus sama di
+            semua worker, hapus file jika ingin diubah.
+    """
+    name = 'shared'
+
+    def __init__(
+            self,
+            path: str,
+            *,
+            capacity: int = 1 << 18,
+            stripes: int = 64,
+            value_size: int = 16,
+            clock: Callable[[], float] = time.time
+        ) -> None:
+        if not HAS_FCNTL:
+            raise CacheError('SharedMemoryBackend butuh fcntl (POSIX)')
+        assert capacity > 0 and stripes > 0 and 0 <= value_size < 1 << 16
+        self._path = path
+        self._stripes = stripes
+        # dibulatkan ke atas, kelipatan stripes
+        self._segment = -(-capacity // stripes)
+        self._capacity = self._segment * stripes
+        self._value_size = value_size
+        self._slot_size = _SLOT.size + value_size
+        self._rebuild_dead = max(min(REBUILD_DEAD, self._segment // 8), 1)
+        self._clock = clock
+        # lock byte-range fcntl per process, tidak menahan thread lain
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._data_offset = _HEADER.size + _COUNTER.size * stripes
+        self._fd: Union[int, None] = None
+        self._mmap: Union[mmap.mmap, None] = None
+        # per process, untuk stats
+        self._lookups = 0
+        self._probes = 0
+        self._rebuilds = 0
+        self._open()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def stripes(self) -> int:
+        return self._stripes
+
+    @property
+    def value_size(self) -> int:
+        return self._value_size
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}("\
+               f"path='{self._path}', capacity={self._capacity})"
+
+    def _open(self) -> mmap.mmap:
+        size = self._data_offset + self._capacity * self._slot_size
+        fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            # worker lain menunggu sampai file siap
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size == 0:
+                    os.ftruncate(fd, size)
+                    table = mmap.mmap(fd, size)
+                    _HEADER.pack_into(table, 0, MAGIC, self._capacity,
+                                      self._stripes, self._value_size,
+                                      self._slot_size)
+                else:
+                    table = mmap.mmap(fd, 0)
+                    header = _HEADER.unpack_from(table, 0) \
+                                if len(table) >= _HEADER.size else None
+                    expected = (MAGIC, self._capacity, self._stripes,
+                                self._value_size, self._slot_size)
+                    if header != expected or len(table) != size:
+                        table.close()
+                        raise CacheError(
+                                f'{self._path} dibuat dengan setting '
+                                f'berbeda, hapus file tersebut')
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+        self._mmap = table
+        return table
+
+    def _table(self) -> Tuple[int, mmap.mmap]:
+        if self._mmap is None or self._fd is None:
+            self._open()
+        assert self._fd is not None and self._mmap is not None
+        return self._fd, self._mmap
+
+    def _lock(self, fd: int, stripe: int) -> None:
+        self._locks[stripe].acquire()
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX, _COUNTER.size,
+                        _HEADER.size + _COUNTER.size * stripe)
+        except BaseException:
+            self._locks[stripe].release()
+            raise
+        return None
+
+    def _unlock(self, fd: int, stripe: int) -> None:
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_UN, _COUNTER.size,
+                        _HEADER.size + _COUNTER.size * stripe)
+        finally:
+            self._locks[stripe].release()
+        return None
+
+    def _count(self, table: mmap.mmap, stripe: int, delta: int) -> None:
+        offset = _HEADER.size + _COUNTER.size * stripe
+        used, = _COUNTER.unpack_from(table, offset)
+        _COUNTER.pack_into(table, offset, used + delta)
+        return None
+
+    def _home(self, key: str) -> Tuple[bytes, int, int]:
+        """ digest, stripe, index slot pertama di segment """
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        return (digest,) + self._position(digest)
+
+    def _position(self, digest: bytes) -> Tuple[int, int]:
+        home = int.from_bytes(digest[:8], 'little')
+        return home % self._stripes, (home // self._stripes) % self._segment
+
+    def _find(
+            self,
+            table: mmap.mmap,
+            digest: bytes,
+            stripe: int,
+            index: int,
+            now: float,
+            rebuild: bool = True
+        ) -> Tuple[int, int]:
+        """
+        Linear probing di dalam segment, returns offset key yang masih
+        hidup (-1 jika tidak ada) dan offset slot pertama yang bisa
+        dipakai (-1 jika segment penuh). Slot expired yang dilewati
+        dijadikan tombstone
+        """
+        segment = self._segment
+        slot_size = self._slot_size
+        base = self._data_offset + stripe * segment * slot_size
+        free = -1
+        dead = 0
+        found = -1
+        empty = -1
+        previous_dead = False
+        for i in range(segment):
+            offset = base + ((index + i) % segment) * slot_size
+            stored, expires, _ = _SLOT.unpack_from(table, offset)
+            if expires == EMPTY:
+                empty = offset
+                break
+            if expires > now:
+                if stored == digest:
+                    found = offset
+                    break
+                previous_dead = False
+                continue
+            previous_dead = True
+            if expires != TOMBSTONE:
+                _SLOT.pack_into(table, offset, b'', TOMBSTONE, 0)
+                self._count(table, stripe, -1)
+            dead += 1
+            if free < 0:
+                free = offset
+        self._lookups += 1
+        self._probes += i + 1
+        if rebuild and dead >= self._rebuild_dead:
+            self._rebuild(table, stripe, now)
+            return self._find(table, digest, stripe, index, now, False)
+        if empty >= 0 and previous_dead:
+            self._shrink(table, stripe,
+                         base + (empty - base - slot_size) \
+                            % (segment * slot_size))
+        if empty >= 0 and free < 0:
+            free = empty
+        return found, free
+
+    def _rebuild(self, table: mmap.mmap, stripe: int, now: float) -> None:
+        """
+        Segment diisi ulang hanya dengan key yang masih hidup, dari home
+        index masing-masing. Counter menjadi jumlah key hidup
+        """
+        segment = self._segment
+        slot_size = self._slot_size
+        base = self._data_offset + stripe * segment * slot_size
+        end = base + segment * slot_size
+        live: List[Tuple[bytes, float, bytes]] = []
+        for offset in range(base, end, slot_size):
+            stored, expires, length = _SLOT.unpack_from(table, offset)
+            if expires > now:
+                start = offset + _SLOT.size
+                live.append((stored, expires, table[start:start + length]))
+        table[base:end] = bytes(end - base)
+        for stored, expires, value in live:
+            _, index = self._position(stored)
+            for i in range(segment):
+                offset = base + ((index + i) % segment) * slot_size
+                if _SLOT.unpack_from(table, offset)[1] == EMPTY:
+                    break
+            start = offset + _SLOT.size
+            table[start:start + len(value)] = value
+            _SLOT.pack_into(table, offset, stored, expires, len(value))
+        _COUNTER.pack_into(table, _HEADER.size + _COUNTER.size * stripe,
+                           len(live))
+        self._rebuilds += 1
+        return None
+
+    def _store(
+            self,
+            key: str,
+            value: bytes,
+            ttl: Union[int, None],
+            replace: bool
+        ) -> bool:
+        """ Insert, atau timpa jika `replace`; returns False jika ada """
+        if len(value) > self._value_size:
+            raise CacheError(f'Value lebih dari {self._value_size} byte')
+        digest, stripe, index = self._home(key)
+        fd, table = self._table()
+        self._lock(fd, stripe)
+        try:
+            now = self._clock()
+            found, free = self._find(table, digest, stripe, index, now)
+            if found >= 0:
+                if not replace:
+                    return False
+                free = found
+            elif free < 0:
+                raise CacheError('SharedMemoryBackend penuh, '
+                                 'naikkan capacity')
+            else:
+                # EMPTY atau TOMBSTONE, slot expired sudah jadi tombstone
+                self._count(table, stripe, 1)
+            start = free + _SLOT.size
+            table[start:start + len(value)] = value
+            _SLOT.pack_into(table, free, digest,
+                            FOREVER if ttl is None else now + max(ttl, 1),
+                            len(value))
+            return True
+        finally:
+            self._unlock(fd, stripe)
+
+    async def add(
+            self,
+            key: str,
+            value: bytes = b'1',
+            ttl: Union[int, None] = None
+        ) -> bool:
+        return self._store(key, value, ttl, False)
+
+    async def set(
+            self,
+            key: str,
+            value: bytes,
+            ttl: Union[int, None] = None
+        ) -> None:
+        self._store(key, value, ttl, True)
+        return None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        digest, stripe, index = self._home(key)
+        fd, table = self._table()
+        self._lock(fd, stripe)
+        try:
+            found, _ = self._find(table, digest, stripe, index,
+                                  self._clock())
+            if found < 0:
+                return None
+            _, _, length = _SLOT.unpack_from(table, found)
+            start = found + _SLOT.size
+            return table[start:start + length]
+        finally:
+            self._unlock(fd, stripe)
+
+    async def exists(self, key: str) -> bool:
+        digest, stripe, index = self._home(key)
+        fd, table = self._table()
+        self._lock(fd, stripe)
+        try:
+            found, _ = self._find(table, digest, stripe, index,
+                                  self._clock())
+            return found >= 0
+        finally:
+            self._unlock(fd, stripe)
+
+    async def delete(self, key: str) -> bool:
+        digest, stripe, index = self._home(key)
+        fd, table = self._table()
+        self._lock(fd, stripe)
+        try:
+            found, _ = self._find(table, digest, stripe, index,
+                                  self._clock())
+            if found < 0:
+                return False
+            _SLOT.pack_into(table, found, b'', TOMBSTONE, 0)
+            self._count(table, stripe, -1)
+            self._shrink(table, stripe, found)
+            return True
+        finally:
+            self._unlock(fd, stripe)
+
+    def _shrink(self, table: mmap.mmap, stripe: int, offset: int) -> None:
+        """
+        Tombstone yang tepat sebelum slot EMPTY tidak dibutuhkan lagi
+        untuk probing, jadikan EMPTY agar probing tetap pendek
+        """
+        segment_size = self._segment * self._slot_size
+        base = self._data_offset + stripe * segment_size
+
+        def step(offset: int, direction: int) -> int:
+            return base + (offset - base + direction * self._slot_size) \
+                            % segment_size
+
+        if _SLOT.unpack_from(table, step(offset, 1))[1] != EMPTY:
+            return None
+        for _ in range(self._segment):
+            if _SLOT.unpack_from(table, offset)[1] != TOMBSTONE:
+                break
+            _SLOT.pack_into(table, offset, b'', EMPTY, 0)
+            offset = step(offset, -1)
+        return None
+
+    def used(self) -> List[int]:
+        """
+        Jumlah slot terpakai per stripe, termasuk yang expired tapi belum
+        dilewati probing
+        """
+        _, table = self._table()
+        return [_COUNTER.unpack_from(table,
+                                     _HEADER.size + _COUNTER.size * i)[0]
+                for i in range(self._stripes)]
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        used = self.used()
+        return dict(
+                capacity=self._capacity,
+                stripes=self._stripes,
+                used=sum(used),
+                load_factor=round(sum(used) / self._capacity, 4),
+                stripe_load_max=round(max(used) / self._segment, 4),
+                probe_mean=round(self._probes / max(self._lookups, 1), 2),
+                rebuilds=self._rebuilds
+            )
+
+    async def close(self) -> None:
+        """ Lepas mmap, dibuka lagi saat dibutuhkan. File tidak dihapus """
+        return self.abort()
+
+    def abort(self) -> None:
+        table, self._mmap = self._mmap, None
+        fd, self._fd = self._fd, None
+        if table is not None:
+            table.close()
+        if fd is not None:
+            os.close(fd)
+        return None
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Clock
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import time
+
+from datetime import datetime, tzinfo
+from typing import Callable, Optional
+
+
+class SNAPClock:
+    """
+    Waktu untuk X-TIMESTAMP Request/Response dan response time log.
+
+    - `timestamp`:  ISO 8601 dengan milidetik dan offset timezone server,
+                    misal '2025-01-03T14:06:47.798+07:00', sama dengan
+                    `datetime.now(tz).isoformat(timespec='milliseconds')`.
+                    Timezone di-resolve sekali; bagian detik di-format
+                    sekali per detik, string di-cache per milidetik
+    - `monotonic`:  untuk menghitung durasi, tidak terpengaruh perubahan
+                    jam sistem (NTP)
+
+    `refresh` jika timezone server berubah.
+    """
+    def __init__(
+            self,
+            tz: Optional[tzinfo] = None,
+            clock: Callable[[], float] = time.time,
+            monotonic: Callable[[], float] = time.monotonic
+        ) -> None:
+        self._fixed_tz = tz
+        self._clock = clock
+        self.monotonic = monotonic
+        self._second = -1
+        self._prefix = ''
+        self._suffix = ''
+        self._millisecond = -1
+        self._timestamp = ''
+        self.refresh()
+
+    @property
+    def tz(self) -> tzinfo:
+        return self._tz
+
+    def refresh(self) -> None:
+        tz = self._fixed_tz or datetime.now().astimezone().tzinfo
+        assert tz is not None
+        self._tz = tz
+        self._second = -1
+        self._millisecond = -1
+        return None
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self._clock(), self._tz)
+
+    def timestamp(self, now: Optional[float] = None) -> str:
+        """ X-TIMESTAMP saat ini, atau `now` (epoch detik) """
+        millisecond = int((self._clock() if now is None else now) * 1000)
+        if millisecond == self._millisecond:
+            return self._timestamp
+        second, fraction = divmod(millisecond, 1000)
+        if second != self._second:
+            moment = datetime.fromtimestamp(second, self._tz)
+            iso = moment.isoformat(timespec='seconds')
+            # '2025-01-03T14:06:47' dan '+07:00'
+            self._prefix, self._suffix = iso[:19], iso[19:]
+            self._second = second
+        self._timestamp = f'{self._prefix}.{fraction:03d}{self._suffix}'
+        self._millisecond = millisecond
+        return self._timestamp
+
+
+# dipakai bersama oleh SNAPRoute, SNAPResponse dan SNAPLog
+CLOCK = SNAPClock()
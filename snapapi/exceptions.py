@@ -2,9 +2,11 @@
 # SNAP-API Exception
 # Author: S Deta Harvianto <sdetta@gmail.com>
 
-from collections import defaultdict
 from fastapi.exceptions import ValidationException
-from typing import Optional, Dict, Any, Union
+from pydantic import BaseModel
+from typing import (
+        Optional, Dict, Any, Union, List, Type, Iterable, Sequence, Tuple
+    )
 from snapapi import codes
 
 
@@ -260,50 +262,110 @@ class TimeOut(SNAPException):
     message = 'Time Out'
 
 
-async def parse_validation_exception(exc: ValidationException) -> SNAPException:
-    """ Parse Error. SNAP bedakan antara missing field dan format value """
-    status_code = codes.STATUS_CODE_400
-    tmp = defaultdict(list)
-    for e in exc.errors():
-        tmp[e['type']].append(e)
-
-    def _get_location(error: dict) -> str:
-        """ Parse missing location, either di Header or Body """
-        location: str = ''
-        try:
-            location = error['loc'][0] == 'header' \
-                and error['loc'][1].replace('_', '-').title() \
-                or error['loc'][1].replace('_', '-')
-        except:
-            pass
-        return location
-
-    # Cegatan pertama: content-type bukan JSON
-    if list(filter(lambda e: 
-            e['type'] == 'literal_error' \
-            and e['loc'][0] == 'header' \
-            and e['loc'][1] == 'content_type', 
-            exc.errors()
-        )):
-        return BadRequest('Content Type Should Be JSON')
-    # Sisanya
-    else:
-        error_fields = []
-        error_values = []
-        for error_type, errors in tmp.items():
+def exception_classes() -> List[Type[SNAPException]]:
+    """ `SNAPException` dan semua subclass yang sudah didefinisikan """
+    classes: List[Type[SNAPException]] = [SNAPException]
+    for error in classes:
+        classes.extend(subclass for subclass in error.__subclasses__()
+                       if subclass not in classes)
+    return classes
+
+
+class ValidationTranslator:
+    """
+    Pydantic `ValidationException` ke `SNAPException`, di-compile per
+    route: nama field SNAP per location ('header', 'x_external_id') ->
+    'X-External-Id', ('body', 'customerNo') -> 'customerNo' dihitung
+    saat route dibuat, error diterjemahkan dalam satu loop:
+
+    - header Content-Type bukan JSON:   BadRequest
+    - ada field yang tidak ada:         MissingMandatoryField, priority #1
+    - format value salah:               InvalidFieldFormat, dikelompokkan
+                                        per type error
+    - selain itu:                       BadRequest
+
+    Location yang belum dikenal dihitung saat itu dan disimpan, maksimal
+    `max_names`. Field yang dipakai endpoint dan dependency-nya sekaligus
+    (misal X-PARTNER-ID) cukup disebut sekali.
+    """
+    def __init__(
+            self,
+            locations: Iterable[Tuple[Any, ...]] = (),
+            max_names: int = 1024
+        ) -> None:
+        self._max_names = max_names
+        self._names: Dict[Tuple[Any, ...], str] = {}
+        for location in locations:
+            self._names[location[:2]] = self.field_name(location)
+
+    @classmethod
+    def from_dependant(cls, dependant: Any) -> 'ValidationTranslator':
+        """ Location semua header dan body (top level) param endpoint """
+        locations: List[Tuple[Any, ...]] = []
+        for kind, params in (('header', dependant.header_params),
+                             ('body', dependant.body_params)):
+            for param in params:
+                names = {param.name, param.alias}
+                annotation = param.type_
+                if isinstance(annotation, type) \
+                        and issubclass(annotation, BaseModel):
+                    for name, info in annotation.model_fields.items():
+                        names.update((name, info.alias or name))
+                locations.extend((kind, name) for name in names)
+        for sub_dependant in dependant.dependencies:
+            locations.extend(cls.from_dependant(sub_dependant)._names)
+        return cls(locations)
+
+    @staticmethod
+    def field_name(location: Tuple[Any, ...]) -> str:
+        """ Header: 'X-External-Id', body: nama field apa adanya """
+        if len(location) < 2 or not isinstance(location[1], str):
+            return ''
+        name = location[1].replace('_', '-')
+        return location[0] == 'header' and name.title() or name
+
+    def translate(self, errors: Sequence[Any]) -> SNAPException:
+        names = self._names
+        missing: List[str] = []
+        invalid: Dict[str, List[str]] = {}
+        for error in errors:
+            error_type = error['type']
+            location = error['loc'][:2]
+            # Cegatan pertama: content-type bukan JSON
+            if error_type == 'literal_error' \
+                    and location == ('header', 'content_type'):
+                return BadRequest('Content Type Should Be JSON')
+            name = names.get(location)
+            if name is None:
+                name = self.field_name(location)
+                if len(names) < self._max_names:
+                    names[location] = name
             # Mandatory Field(s) is missing
             if error_type == 'missing':
-                error_fields += list(map(_get_location, errors))
+                if name not in missing:
+                    missing.append(name)
             # Format value
             # https://docs.pydantic.dev/latest/errors/validation_errors
-            else:
-                error_values += list(map(_get_location, errors))
+            elif error_type not in invalid:
+                invalid[error_type] = [name]
+            elif name not in invalid[error_type]:
+                invalid[error_type].append(name)
         # field mandatory di Header atau Body ada yang kurang, priority #1
-        if error_fields:
-            return MissingMandatoryField(f"[{', '.join(error_fields)}]")
+        if missing:
+            return MissingMandatoryField(f"[{', '.join(missing)}]")
         # format field value salah
-        elif error_values:
-            return InvalidFieldFormat(f"[{', '.join(error_values)}]")
-        # other
-        else:
-            return BadRequest()
\ No newline at end of file
+        if invalid:
+            fields = [name for names in invalid.values() for name in names]
+            return InvalidFieldFormat(f"[{', '.join(fields)}]")
+        return BadRequest()
+
+
+_TRANSLATOR = ValidationTranslator()
+
+
+async def parse_validation_exception(exc: ValidationException) -> SNAPException:
+    """
+    Parse Error. SNAP bedakan antara missing field dan format value.
+    `SNAPRoute` memakai `ValidationTranslator` per route
+    """
+    return _TRANSLATOR.translate(exc.errors())
@@ -2,81 +2,119 @@
 # SNAP-API Logger
 # Author: S Deta Harvianto <sdetta@gmail.com>
 
-from typing import Union, Dict, Any, Callable, Awaitable
+import asyncio
+import logging
+import sys
+import time
+_logger = logging.getLogger(__name__)
+_logger.addHandler(logging.StreamHandler(sys.stdout))
+
+from typing import (
+        Union, Dict, Any, Callable, Awaitable, List, Optional, Tuple
+    )
 from fastapi import Request
+from starlette.datastructures import Headers
+from starlette.responses import Response as StarletteResponse
 from ulid import monotonic as ulid
 from datetime import datetime
 
 from snapapi.responses import SNAPResponse
+from snapapi.clock import CLOCK
 
+DROP = 'drop'
+DROP_OLDEST = 'drop_oldest'
+BLOCK = 'block'
 
-class SNAPLog:
-    """ 
-    UNTESTED: Logger Request and Response
 
-    Class ini di-instantiate di setiap endpoint yang butuh Logger.
-    Attribute `backend` berupa Callable yang hanya menerima 1 positional 
-    argument type Dict[str, Any]
+class SNAPLogRecord:
     """
-    def __init__(
-            self, 
-            *, 
-            namespace: Union[str, None] = None,
-            service_code: Union[str, None] = None,  
-            backend: Union[Callable[[Any], Awaitable[Any]], None] = None
-        ) -> None:
-        self.namespace = namespace
-        self.service_code = service_code
-        self.backend = backend
+    Bagian Request/Response yang dibutuhkan log, disalin saat request
+    selesai: raw headers, body bytes dan beberapa string, tanpa menahan
+    Request (scope, app, state) dan Response. ULID, decode dan dict
+    dibuat oleh `build`, di background jika lewat `SNAPLogQueue`
+    """
+    __slots__ = ('namespace', 'service_code', 'created', 'finished',
+                 'remote_addr', 'method', 'url', 'request_headers',
+                 'request_body', 'request_datetime', 'request_start',
+                 'response_end', 'status_code', 'response_headers',
+                 'response_body', 'traceback')
 
-    async def send(
+    def __init__(
             self,
             *,
+            namespace: Union[str, None],
+            service_code: Union[str, None],
             request: Request,
-            response: SNAPResponse,
+            request_body: bytes,
+            response: StarletteResponse,
             traceback: str = ''
         ) -> None:
-        """ Build log if request and response are presented """
+        state = request.state
+        self.namespace = namespace
+        self.service_code = service_code
+        self.created = time.time()
+        self.finished = CLOCK.monotonic()
+        self.remote_addr: str = request.client and request.client.host or ''
+        self.method: str = request.method
+        self.url: str = str(request.url)
+        self.request_headers: List[Tuple[bytes, bytes]] = \
+            request.headers.raw
+        self.request_body = request_body
+        self.request_datetime: str = state.x_request_datetime
+        # monotonic dari SNAPRoute
+        self.request_start: Optional[float] = getattr(
+                state, 'x_request_start', None)
+        self.response_end: Optional[float] = getattr(
+                state, 'x_response_end', None)
+        self.status_code: int = response.status_code
+        self.response_headers: List[Tuple[bytes, bytes]] = \
+            list(response.raw_headers)
+        self.response_body: Union[bytes, memoryview] = response.body
+        self.traceback = traceback
 
+    def build(self) -> Dict[str, Any]:
         # ULID is much better for Universal ID, as it shortable by timestamp
-        uid = str(ulid.new())
-        
+        uid = str(ulid.from_timestamp(self.created))
+
         # Request
-        remote_addr: str = ''
-        if request.client:
-            remote_addr = request.client.host
-        user_agent: str = request.headers.get('user-agent', '')
-        request_url: str = str(request.url)
-        request_datetime: str = request.state.x_request_datetime
-        request_headers: dict = dict(request.headers)
-        request_body: str = (await request.body()).decode()
+        request_headers: Dict[str, str] = dict(
+                Headers(raw=self.request_headers))
+        user_agent: str = request_headers.get('user-agent', '')
+        request_body: str = self.request_body.decode()
 
         # Response
-        status_code: int = response.status_code
-        response_datetime: str = response.headers['x-timestamp']
-        response_headers = dict(response.headers)
+        response_headers: Dict[str, str] = dict(
+                Headers(raw=self.response_headers))
+        response_datetime: str = response_headers['x-timestamp']
         response_body: str
-        if isinstance(response.body, memoryview):
-            response_body = response.body.tobytes().decode()
+        if isinstance(self.response_body, memoryview):
+            response_body = self.response_body.tobytes().decode()
         else:
-            response_body = response.body.decode()
+            response_body = self.response_body.decode()
 
-        response_time: float = round((
-                datetime.fromisoformat(response_datetime) \
-                - datetime.fromisoformat(request_datetime)
-            ).total_seconds(), 3)
+        # monotonic dari SNAPRoute, selain itu selisih X-TIMESTAMP
+        if self.request_start is not None:
+            end: float = self.finished if self.response_end is None \
+                            else self.response_end
+            response_time: float = round(end - self.request_start, 3)
+        else:
+            response_time = round((
+                    datetime.fromisoformat(response_datetime) \
+                    - datetime.fromisoformat(self.request_datetime)
+                ).total_seconds(), 3)
 
-        log = dict(
+        return dict(
                 uid=uid,
                 namespace=self.namespace,
                 service_code=self.service_code,
                 response_time=response_time,
-                status_code=status_code,
-                remote_addr=remote_addr,
+                status_code=self.status_code,
+                remote_addr=self.remote_addr,
                 user_agent=user_agent,
                 request=dict(
-                        request_url=request_url,
-                        request_datetime=request_datetime,
+                        request_method=self.method,
+                        request_url=self.url,
+                        request_datetime=self.request_datetime,
                         request_headers=request_headers,
                         request_body=request_body
                     ),
@@ -85,7 +123,223 @@ class SNAPLog:
                         response_headers=response_headers,
                         response_body=response_body
                     ),
+                traceback=self.traceback
+            )
+
+
+class SNAPLogQueue:
+    """
+    Antrian log per worker, dikirim oleh background task per batch:
+    `batch_size` record, atau yang ada setelah `batch_interval` detik.
+
+    `backend` menerima satu argument List[Dict[str, Any]], atau satu
+    Dict per record jika `batch=False`. Error di backend di-log dan
+    dihitung, tidak pernah sampai ke Request.
+
+    Jika antrian penuh (`maxsize`), `policy`:
+
+    - 'drop':        record baru dibuang (default), Request tidak menunggu
+    - 'drop_oldest': record paling lama dibuang
+    - 'block':       Request menunggu tempat kosong (backpressure) hingga
+                     `block_timeout` detik, setelah itu dibuang
+
+    Task dimulai dengan `start` (atau otomatis saat record pertama),
+    `close` mengirim sisa antrian, misal saat shutdown. Metrics di
+    `stats()`.
+    """
+    def __init__(
+            self,
+            backend: Callable[[Any], Awaitable[Any]],
+            *,
+            batch: bool = True,
+            batch_size: int = 100,
+            batch_interval: float = 1,
+            maxsize: int = 10000,
+            policy: str = DROP,
+            block_timeout: float = 1
+        ) -> None:
+        assert policy in (DROP, DROP_OLDEST, BLOCK)
+        assert batch_size > 0 and maxsize > 0
+        self.backend = backend
+        self.batch = batch
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.maxsize = maxsize
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._queue: Union[asyncio.Queue, None] = None
+        self._full: Union[asyncio.Event, None] = None
+        self._task: Union[asyncio.Task, None] = None
+        self._delivery: Union[asyncio.Future, None] = None
+        self.enqueued = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self.batches = 0
+        self.depth_max = 0
+
+    @property
+    def depth(self) -> int:
+        """ Jumlah record di antrian """
+        return 0 if self._queue is None else self._queue.qsize()
+
+    def start(self) -> None:
+        """ Background task di event loop yang sedang berjalan """
+        if self._task is not None and not self._task.done():
+            return None
+        if self._queue is None:
+            self._queue = asyncio.Queue(self.maxsize)
+            self._full = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return None
+
+    async def put(self, record: SNAPLogRecord) -> bool:
+        """ Returns False jika record dibuang """
+        self.start()
+        queue = self._queue
+        assert queue is not None and self._full is not None
+        try:
+            queue.put_nowait(record)
+        except asyncio.QueueFull:
+            if self.policy == DROP_OLDEST:
+                queue.get_nowait()
+                queue.put_nowait(record)
+                self.dropped += 1
+            elif self.policy == BLOCK:
+                try:
+                    await asyncio.wait_for(queue.put(record),
+                                           self.block_timeout)
+                except asyncio.TimeoutError:
+                    self.dropped += 1
+                    return False
+            else:
+                self.dropped += 1
+                return False
+        self.enqueued += 1
+        depth = queue.qsize()
+        if depth > self.depth_max:
+            self.depth_max = depth
+        if depth >= self.batch_size:
+            self._full.set()
+        return True
+
+    def _take(self, records: List[SNAPLogRecord]) -> List[SNAPLogRecord]:
+        """ Tambah `records` dari antrian hingga `batch_size` """
+        assert self._queue is not None
+        while len(records) < self.batch_size and not self._queue.empty():
+            records.append(self._queue.get_nowait())
+        return records
+
+    async def _run(self) -> None:
+        queue = self._queue
+        full = self._full
+        assert queue is not None and full is not None
+        while True:
+            records = [await queue.get()]
+            try:
+                if queue.qsize() + 1 < self.batch_size:
+                    await asyncio.wait_for(full.wait(), self.batch_interval)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                # batch ini tetap dikirim walaupun `close` membatalkan task
+                full.clear()
+                self._delivery = asyncio.ensure_future(
+                        self._deliver(self._take(records)))
+            await asyncio.shield(self._delivery)
+
+    async def _deliver(self, records: List[SNAPLogRecord]) -> None:
+        try:
+            logs = [record.build() for record in records]
+            if self.batch:
+                await self.backend(logs)
+            else:
+                for log in logs:
+                    await self.backend(log)
+        except Exception as exc:
+            self.errors += 1
+            _logger.error(f'SNAPLog backend: {exc!r}')
+        else:
+            self.delivered += len(records)
+        self.batches += 1
+        return None
+
+    async def close(self) -> None:
+        """ Hentikan background task, kirim sisa antrian """
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._delivery is not None:
+            await self._delivery
+        if self._queue is not None:
+            while not self._queue.empty():
+                await self._deliver(self._take([]))
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return dict(
+                depth=self.depth,
+                depth_max=self.depth_max,
+                enqueued=self.enqueued,
+                delivered=self.delivered,
+                dropped=self.dropped,
+                errors=self.errors,
+                batches=self.batches
+            )
+
+
+class SNAPLog:
+    """
+    UNTESTED: Logger Request and Response
+
+    Class ini di-instantiate di setiap endpoint yang butuh Logger.
+    Attribute `backend` berupa Callable yang hanya menerima 1 positional
+    argument type Dict[str, Any]
+
+    Jika `queue` diisi (`SNAPLogQueue`, bisa dipakai bersama beberapa
+    endpoint), `send` hanya memasukkan record ke antrian dan Response
+    tidak menunggu `backend`; `backend` SNAPLog tidak dipakai.
+    """
+    def __init__(
+            self,
+            *,
+            namespace: Union[str, None] = None,
+            service_code: Union[str, None] = None,
+            backend: Union[Callable[[Any], Awaitable[Any]], None] = None,
+            queue: Optional[SNAPLogQueue] = None
+        ) -> None:
+        self.namespace = namespace
+        self.service_code = service_code
+        self.backend = backend
+        self.queue = queue
+
+    async def send(
+            self,
+            *,
+            request: Request,
+            response: Union[SNAPResponse, StarletteResponse],
+            traceback: str = ''
+        ) -> None:
+        """ Build log if request and response are presented """
+        # body sudah dibaca SNAPRoute, selain itu dibaca di sini
+        request_body: Optional[bytes] = getattr(
+                request.state, 'x_body', None)
+        if request_body is None:
+            request_body = await request.body()
+        record = SNAPLogRecord(
+                namespace=self.namespace,
+                service_code=self.service_code,
+                request=request,
+                request_body=request_body,
+                response=response,
                 traceback=traceback
             )
-        if self.backend:
-            await self.backend(log)
\ No newline at end of file
+        if self.queue is not None:
+            await self.queue.put(record)
+        elif self.backend:
+            await self.backend(record.build())
+        return None
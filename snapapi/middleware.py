@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Middleware
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import hashlib
+
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
+
+from snapapi import tools
+
+
+class SNAPBodyDigestMiddleware:
+    """
+    Hitung `Lowercase(HexEncode(SHA-256(minify(RequestBody))))` per chunk,
+    bersamaan dengan body yang diterima, sehingga tidak perlu menunggu
+    body lengkap kemudian minify dan hash ulang.
+
+    Hasilnya disimpan di `request.state.x_body_digest` dan bisa langsung
+    dipakai untuk verifikasi Transactional Signature:
+
+        ```python
+
+        app.add_middleware(SNAPBodyDigestMiddleware)
+
+        await Crypto.verify_signature_transactional_async(
+                ...,
+                request_body_digest=request.state.x_body_digest
+            )
+
+        ```
+    """
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) \
+            -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return None
+
+        state: dict = scope.setdefault('state', {})
+        minifier = tools.JSONMinifier()
+        hashed = hashlib.sha256()
+
+        async def receive_digest() -> Message:
+            message: Message = await receive()
+            if message['type'] == 'http.request' \
+                    and 'x_body_digest' not in state:
+                hashed.update(minifier.feed(message.get('body', b'')))
+                if not message.get('more_body', False):
+                    state['x_body_digest'] = hashed.hexdigest()
+            return message
+
+        await self.app(scope, receive_digest, send)
+        return None
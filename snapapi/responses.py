@@ -9,12 +9,13 @@ except ModuleNotFoundError:
     import json
     has_orjson = False
 
-from datetime import datetime, timezone, tzinfo
 from typing import Optional, Any, Mapping
 
 from starlette.responses import JSONResponse
 from starlette.background import BackgroundTask
 
+from snapapi.clock import CLOCK
+
 
 class SNAPResponse(JSONResponse):
     """ 
@@ -33,13 +34,24 @@ class SNAPResponse(JSONResponse):
         super().__init__(content, status_code, headers, media_type, background)
         if not self.headers:
             headers = dict()
-        tz: Optional[tzinfo] = datetime.now().astimezone().tzinfo
-        timestamp: str = datetime.now(tz).isoformat(timespec="milliseconds")
         self.headers.update({
-                'x-timestamp': timestamp,
+                'x-timestamp': CLOCK.timestamp(),
                 'cache-control': 'no-store'
             })
 
+    @classmethod
+    def from_rendered(cls, rendered: 'SNAPResponse') -> 'SNAPResponse':
+        """
+        Response baru dengan status, body dan headers `rendered`, tanpa
+        render ulang. X-TIMESTAMP di-update oleh `SNAPRoute`
+        """
+        response = cls.__new__(cls)
+        response.status_code = rendered.status_code
+        response.background = None
+        response.body = rendered.body
+        response.raw_headers = list(rendered.raw_headers)
+        return response
+
     def render(self, content: Any) -> bytes:
         return has_orjson \
             and orjson.dumps(content, 
@@ -8,25 +8,168 @@ _logger = logging.getLogger(__name__)
 _logger.addHandler(logging.StreamHandler(sys.stdout))
 
 from traceback import format_exc
-from typing import Callable, Coroutine, Any, Optional, Union
-from datetime import datetime, timezone, tzinfo
+from typing import (
+        Callable, Coroutine, Any, Optional, Union, Set, Tuple, Dict
+    )
 
 from fastapi.routing import APIRoute
 from fastapi.exceptions import ValidationException
-from starlette.requests import Request
+from starlette.requests import Request, ClientDisconnect
 from starlette.responses import Response as StarletteResponse
 
-from snapapi import exceptions, codes
+from snapapi import exceptions, codes, tools
 from snapapi.responses import SNAPResponse
+from snapapi.clock import CLOCK
+from snapapi.cache import SNAPCache, replay
+
+
+class SNAPRequest(Request):
+    """
+    Request yang diterima FastAPI dari `SNAPRoute`: body yang sudah
+    dibaca `parse_body` dipakai ulang oleh `body()`, `stream()` dan
+    `form()` (stream asli sudah habis), `json()` memakai hasil parse di
+    `request.state.x_body_json` tanpa parse ulang
+    """
+    def __init__(self, request: Request) -> None:
+        super().__init__(request.scope, request.receive)
+        body: Optional[bytes] = getattr(request, '_body', None)
+        if body is not None:
+            self._body = body
+
+    async def json(self) -> Any:
+        parsed: Any = getattr(self.state, 'x_body_json', None)
+        if parsed is None:
+            # bukan JSON atau invalid, error dari FastAPI seperti biasa
+            return await super().json()
+        return parsed
 
 
 class SNAPRoute(APIRoute):
-    """ Routing Request/Response """
+    """
+    Routing Request/Response
+
+    `replay_cache`: jika diisi `SNAPCache`, response request yang berhasil
+    `add` X-External-Id disimpan, dan retry yang sama persis (method,
+    path, X-PARTNER-ID, X-SIGNATURE dan body) mendapat response yang sama
+    byte per byte tanpa verifikasi Signature dan tanpa memanggil endpoint.
+    Retry yang datang saat request pertama masih diproses menunggu hingga
+    `replay_wait` detik. Request lain dengan X-External-Id yang sama
+    tetap `Conflict`. Response 5xx tidak disimpan dan key dihapus, agar
+    bisa diulang. Backend yang tidak bisa menyimpan response (misal
+    'shared' dengan `value_size` kecil) ditolak saat diisi.
+
+    Body JSON dibaca dan diparse sekali (`tools.loads_json`, orjson jika
+    ada) sebelum validasi FastAPI, hasilnya dipakai ulang oleh FastAPI
+    lewat `SNAPRequest`:
+
+    - `request.state.x_body`:       raw bytes, untuk Signature
+    - `request.state.x_body_json`:  dict hasil parse, None jika bukan JSON
+    - model hasil validasi:         parameter body endpoint
+    """
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.namespace = None
+        self._errors = {}
         self.service_code = None
         self.logger = None
+        self.replay_cache = None
+        self.replay_wait = 5.0
+        # nama field SNAP per location error validasi, sekali per route
+        self.validation = exceptions.ValidationTranslator.from_dependant(
+                self.dependant)
+
+    @property
+    def replay_cache(self) -> Optional[SNAPCache]:
+        return self._replay_cache
+
+    @replay_cache.setter
+    def replay_cache(self, replay_cache: Optional[SNAPCache]) -> None:
+        if replay_cache is not None:
+            replay_cache.check_replay()
+        self._replay_cache = replay_cache
+
+    @property
+    def service_code(self) -> Optional[str]:
+        return self._service_code
+
+    @service_code.setter
+    def service_code(self, service_code: Optional[str]) -> None:
+        self._service_code = service_code
+        self.initiate_errors()
+
+    def initiate_errors(self) -> Dict[type, SNAPResponse]:
+        """
+        Response semua `SNAPException` dengan message default, di-render
+        sekali per `service_code`. Saat error cukup lookup dan copy
+        """
+        self._errors = {
+                error: self.render_error(
+                    error.status_code,
+                    error.case_code,
+                    error.message,
+                    error.additional_message)
+                for error in exceptions.exception_classes()
+            }
+        return self._errors
+
+    def render_error(
+            self,
+            status_code: int,
+            case_code: str,
+            message: str,
+            additional_message: Optional[str] = None
+        ) -> SNAPResponse:
+        responseCode = f'{status_code}{self.service_code}{case_code}'
+        responseMessage = message
+        if additional_message:
+            responseMessage += ' '
+            responseMessage += additional_message
+        return SNAPResponse(
+                status_code=status_code,
+                content=dict(
+                        responseCode=responseCode,
+                        responseMessage=responseMessage
+                    ))
+
+    def error_response(self, error: exceptions.SNAPException) -> SNAPResponse:
+        """ Response SNAP untuk `error` """
+        rendered = self._errors.get(type(error))
+        # message diubah di instance, misal InvalidFieldFormat
+        if rendered is not None and 'message' not in vars(error) \
+                and 'additional_message' not in vars(error):
+            return SNAPResponse.from_rendered(rendered)
+        return self.render_error(
+                error.status_code,
+                error.case_code,
+                error.message,
+                error.additional_message)
+
+    @staticmethod
+    async def parse_body(request: Request) -> None:
+        """
+        Raw body dan hasil parse JSON di `request.state`, dibaca FastAPI
+        lewat `SNAPRequest.json()` tanpa parse ulang. Body invalid
+        dibiarkan, error tetap dari FastAPI. Body yang terlalu dalam
+        (RecursionError di `json.loads`) raise `BadRequest`
+        """
+        body: bytes = await request.body()
+        request.state.x_body = body
+        request.state.x_body_json = None
+        content_type: str = request.headers.get('content-type', '')
+        media_type: str = content_type.partition(';')[0].strip().lower()
+        if not body or media_type and not (
+                media_type == 'application/json' or
+                media_type.startswith('application/')
+                and media_type.endswith('+json')):
+            return None
+        try:
+            parsed: Any = tools.loads_json(body)
+        except ValueError:
+            return None
+        except RecursionError:
+            raise exceptions.BadRequest()
+        request.state.x_body_json = parsed
+        return None
 
     def get_route_handler(self) -> Callable[
             [Request], 
@@ -37,57 +180,84 @@ class SNAPRoute(APIRoute):
         async def process_route(request: Request) -> StarletteResponse:
             # add x_request_datetime di request.state
             # DI SAAT Request diterima oleh API
-            tz: Optional[tzinfo] = datetime.now().astimezone().tzinfo
-            request_timestamp: str = datetime.now(tz)\
-                                .isoformat(timespec="milliseconds")
-            request.state.x_request_datetime = request_timestamp
+            request.state.x_request_start = CLOCK.monotonic()
+            request.state.x_request_datetime = CLOCK.timestamp()
             response: Optional[Union[SNAPResponse, StarletteResponse]]
             traceback: str = ''
+            cache = self.replay_cache
+            external_id: Optional[str] = None
+            partner: str = request.headers.get('x-partner-id', '')
+            fingerprint: bytes = b''
+            stored: Optional[Tuple[int, bytes]] = None
+            if cache is not None:
+                external_id = request.headers.get('x-external-id')
+            claimed: Set[str] = set()
+            claims_token = replay.claims.set(claimed)
             try:
-                response = await route_handler(request)
+                if self.body_field is not None:
+                    await self.parse_body(request)
+                if cache is not None and external_id:
+                    fingerprint = replay.fingerprint(
+                            request.method,
+                            request.url.path,
+                            partner,
+                            request.headers.get('x-signature', ''),
+                            await request.body()
+                        )
+                    try:
+                        stored = await cache.replay(
+                                external_id, fingerprint, self.replay_wait,
+                                partner)
+                    except Exception as exc:
+                        # cache bermasalah: proses seperti biasa
+                        _logger.warning(f'Replay {external_id}: {exc}')
+                if stored is not None:
+                    response = StarletteResponse(
+                            content=stored[1],
+                            status_code=stored[0],
+                            media_type='application/json'
+                        )
+                else:
+                    response = await route_handler(SNAPRequest(request))
             except Exception as exc:
                 if isinstance(exc, ValidationException):
-                    error = await exceptions.parse_validation_exception(exc)
-                    message = error.message
-                    additional_message = error.additional_message
-                    status_code = error.status_code
-                    case_code = error.case_code
+                    error = self.validation.translate(exc.errors())
+                elif isinstance(exc, exceptions.SNAPException):
+                    error = exc
+                elif isinstance(exc, ClientDisconnect):
+                    # body tidak lengkap, Partner sudah tidak menunggu
+                    error = exceptions.BadRequest()
                 else:
-                    if isinstance(exc, exceptions.SNAPException):
-                        message = exc.message
-                        additional_message = exc.additional_message
-                        status_code = exc.status_code
-                        case_code = exc.case_code
-                    else:
-                        error = exceptions.InternalServerError()
-                        message = error.message
-                        additional_message = error.additional_message
-                        status_code = error.status_code
-                        case_code = error.case_code
+                    error = exceptions.InternalServerError()
 
                 # cuma status_code 5xx yg dilog
-                if status_code >=500:
+                if error.status_code >=500:
                     traceback = format_exc()
                     _logger.error(exc, exc_info=True)
 
-                responseCode = f'{status_code}{self.service_code}{case_code}'
-                responseMessage = message
-                if additional_message:
-                    responseMessage += ' ' 
-                    responseMessage += additional_message
-                
-                response = SNAPResponse(
-                    status_code=status_code,
-                    content=dict(
-                            responseCode=responseCode,
-                            responseMessage=responseMessage
-                        ))
+                response = self.error_response(error)
+            finally:
+                replay.claims.reset(claims_token)
+
+            # request ini pemilik X-External-Id: simpan response untuk retry
+            if cache is not None and claimed:
+                if external_id in claimed and response.status_code < 500:
+                    await cache.store(
+                            external_id,
+                            fingerprint,
+                            response.status_code,
+                            bytes(response.body),
+                            partner
+                        )
+                elif external_id in claimed:
+                    await cache.delete(external_id, partner)
+                for key in claimed:
+                    cache.release(key, partner)
 
             # Add default timestamp, cache-control
-            response_timestamp: str = datetime.now(tz).isoformat(
-                                        timespec="milliseconds")
+            request.state.x_response_end = CLOCK.monotonic()
             response.headers.update({
-                    'x-timestamp': response_timestamp,
+                    'x-timestamp': CLOCK.timestamp(),
                     'cache-control': 'no-store'
                 })
             # Logger
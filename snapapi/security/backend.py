@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Security: Crypto Backend
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+from typing import Any, Dict, Optional, Union, Literal
+
+from Crypto.PublicKey import RSA
+from Crypto.Hash import SHA256
+from Crypto.Signature import pkcs1_15
+
+from snapapi import tools
+
+try:
+    from cryptography import exceptions as cryptography_exceptions
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import padding, rsa
+    has_cryptography = True
+except ModuleNotFoundError:
+    has_cryptography = False
+
+BACKEND = Literal['pycryptodome', 'cryptography']
+
+
+class CryptoBackend:
+    """
+    Base class backend RSA untuk `SNAPCrypto`. Key yang dihasilkan
+    `import_key` bersifat opaque, hanya dipakai oleh backend yang sama.
+
+    - `import_key`: import private key, public key atau X.509 cert
+                    (PEM/DER)
+    - `public_key`: public key dari key hasil `import_key`
+    - `fingerprint`: hex SHA-256 DER SubjectPublicKeyInfo, sama untuk
+                     semua backend
+    - `size_in_bytes`: ukuran modulus
+    - `sign_SHA256withRSA`: returns raw signature (belum base64)
+    - `verify_SHA256withRSA`: returns True jika valid, tidak pernah raise
+                              karena signature invalid
+    """
+    name: str = ''
+
+    def import_key(
+            self,
+            data: Union[bytes, str],
+            passphrase: Optional[str] = None
+        ) -> Any:
+        raise NotImplementedError()
+
+    def public_key(self, key: Any) -> Any:
+        raise NotImplementedError()
+
+    def public_der(self, key: Any) -> bytes:
+        raise NotImplementedError()
+
+    def fingerprint(self, key: Any) -> str:
+        return tools.fingerprint(self.public_der(key))
+
+    def size_in_bytes(self, key: Any) -> int:
+        raise NotImplementedError()
+
+    def sign_SHA256withRSA(self, key: Any, message: bytes) -> bytes:
+        raise NotImplementedError()
+
+    def verify_SHA256withRSA(
+            self,
+            key: Any,
+            message: bytes,
+            signature: bytes
+        ) -> bool:
+        raise NotImplementedError()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+class PycryptodomeBackend(CryptoBackend):
+    """ Default. `pycryptodome` """
+    name = 'pycryptodome'
+
+    def import_key(
+            self,
+            data: Union[bytes, str],
+            passphrase: Optional[str] = None
+        ) -> RSA.RsaKey:
+        return RSA.importKey(data, passphrase)
+
+    def public_key(self, key: RSA.RsaKey) -> RSA.RsaKey:
+        return key.publickey()
+
+    def public_der(self, key: RSA.RsaKey) -> bytes:
+        der: bytes = key.publickey().export_key('DER')
+        return der
+
+    def size_in_bytes(self, key: RSA.RsaKey) -> int:
+        size: int = key.size_in_bytes()
+        return size
+
+    def sign_SHA256withRSA(self, key: RSA.RsaKey, message: bytes) -> bytes:
+        signature: bytes = pkcs1_15.new(key).sign(SHA256.new(message))
+        return signature
+
+    def verify_SHA256withRSA(
+            self,
+            key: RSA.RsaKey,
+            message: bytes,
+            signature: bytes
+        ) -> bool:
+        try:
+            pkcs1_15.new(key).verify(SHA256.new(message), signature)
+        except (ValueError, TypeError):
+            return False
+        return True
+
+
+class CryptographyBackend(CryptoBackend):
+    """
+    `cryptography` (OpenSSL), verifikasi RSA jauh lebih cepat.
+    Optional, install dengan `pip install cryptography`.
+    """
+    name = 'cryptography'
+
+    def __init__(self) -> None:
+        assert has_cryptography, 'pip install cryptography'
+
+    def import_key(
+            self,
+            data: Union[bytes, str],
+            passphrase: Optional[str] = None
+        ) -> Any:
+        if isinstance(data, str):
+            data = data.encode()
+        password = passphrase and passphrase.encode() or None
+        if data.lstrip().startswith(b'-----'):
+            if b'CERTIFICATE-----' in data:
+                return x509.load_pem_x509_certificate(data).public_key()
+            if b'PRIVATE KEY-----' in data:
+                return serialization.load_pem_private_key(data, password)
+            return serialization.load_pem_public_key(data)
+        # DER: private key, public key atau cert
+        loaders = (
+                lambda: serialization.load_der_private_key(data, password),
+                lambda: serialization.load_der_public_key(data),
+                lambda: x509.load_der_x509_certificate(data).public_key()
+            )
+        for loader in loaders:
+            try:
+                return loader()
+            except (ValueError, TypeError):
+                continue
+        raise ValueError('RSA key format is not supported')
+
+    def public_key(self, key: Any) -> Any:
+        if isinstance(key, rsa.RSAPrivateKey):
+            return key.public_key()
+        return key
+
+    def public_der(self, key: Any) -> bytes:
+        der: bytes = self.public_key(key).public_bytes(
+                serialization.Encoding.DER,
+                serialization.PublicFormat.SubjectPublicKeyInfo
+            )
+        return der
+
+    def size_in_bytes(self, key: Any) -> int:
+        size: int = (key.key_size + 7) // 8
+        return size
+
+    def sign_SHA256withRSA(self, key: Any, message: bytes) -> bytes:
+        signature: bytes = key.sign(message, padding.PKCS1v15(),
+                                    hashes.SHA256())
+        return signature
+
+    def verify_SHA256withRSA(
+            self,
+            key: Any,
+            message: bytes,
+            signature: bytes
+        ) -> bool:
+        try:
+            self.public_key(key).verify(signature, message,
+                                        padding.PKCS1v15(), hashes.SHA256())
+        except (cryptography_exceptions.InvalidSignature, ValueError,
+                TypeError):
+            return False
+        return True
+
+
+_BACKENDS: Dict[str, CryptoBackend] = {}
+
+
+def get_backend(backend: Union[CryptoBackend, BACKEND]) -> CryptoBackend:
+    """ Instance backend berdasarkan nama, dipakai bersama """
+    if isinstance(backend, CryptoBackend):
+        return backend
+    if backend not in _BACKENDS:
+        if backend == 'cryptography':
+            _BACKENDS[backend] = CryptographyBackend()
+        elif backend == 'pycryptodome':
+            _BACKENDS[backend] = PycryptodomeBackend()
+        else:
+            raise ValueError(f"Crypto backend '{backend}' tidak dikenal")
+    return _BACKENDS[backend]
+
+
+def available_backends() -> Dict[str, CryptoBackend]:
+    """ Semua backend yang terinstall """
+    names: tuple = ('pycryptodome', 'cryptography')
+    return {
+            name: get_backend(name) for name in names
+            if name != 'cryptography' or has_cryptography
+        }
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Security: Cache
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import hashlib
+import heapq
+import threading
+import time
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple, TypeVar, Union
+
+AppType = TypeVar("AppType", bound="SNAPTokenCache")
+SignatureCacheType = TypeVar("SignatureCacheType", 
+                             bound="SNAPSignatureCache")
+
+
+class SNAPTokenCache:
+    """
+    LRU cache Access Token yang sudah terverifikasi.
+
+    Satu Bank biasanya memakai Access Token yang sama hingga 15 menit untuk
+    ribuan request. Token yang sudah pernah lolos `jwt.decode` disimpan
+    bersama claim `exp`-nya, sehingga verifikasi berikutnya cukup satu
+    lookup dict.
+
+    - Token tidak pernah dianggap valid saat/setelah `exp`; dicek setiap
+      `get`, kemudian dihapus.
+    - Token expired juga dibuang saat `add` (urut `exp`), sehingga tidak
+      memenuhi cache.
+    - Jika penuh, token yang paling lama tidak dipakai dibuang (LRU).
+
+        ```python
+
+        Crypto = SNAPCrypto(..., token_cache=SNAPTokenCache(maxsize=1024))
+
+        ```
+    """
+    def __init__(
+            self: AppType,
+            maxsize: int = 1024,
+            *,
+            clock: Callable[[], float] = time.time
+        ) -> None:
+        assert maxsize > 0, 'maxsize harus > 0'
+        self._maxsize = maxsize
+        self._clock = clock
+        self._tokens: 'OrderedDict[str, float]' = OrderedDict()
+        self._expiry: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.expired: int = 0
+        self.evicted: int = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def __str__(self) -> str:
+        return ', '.join(f'{k}={v}' for k, v in self.stats().items())
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.__str__()})"
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        total = self.hits + self.misses
+        return dict(
+                size=len(self._tokens),
+                maxsize=self._maxsize,
+                hits=self.hits,
+                misses=self.misses,
+                hit_rate=total and round(self.hits / total, 4) or 0.0,
+                expired=self.expired,
+                evicted=self.evicted
+            )
+
+    def get(self, token: str) -> bool:
+        """ True jika token ada di cache dan belum expired """
+        with self._lock:
+            exp = self._tokens.get(token)
+            if exp is None:
+                self.misses += 1
+                return False
+            if self._clock() >= exp:
+                del self._tokens[token]
+                self.expired += 1
+                self.misses += 1
+                return False
+            self._tokens.move_to_end(token)
+            self.hits += 1
+            return True
+
+    def add(self, token: str, exp: float) -> None:
+        """ Simpan token yang sudah terverifikasi, `exp` UNIX timestamp """
+        with self._lock:
+            now = self._clock()
+            self._purge(now)
+            if exp <= now:
+                return None
+            self._tokens[token] = exp
+            self._tokens.move_to_end(token)
+            heapq.heappush(self._expiry, (exp, token))
+            while len(self._tokens) > self._maxsize:
+                self._tokens.popitem(last=False)
+                self.evicted += 1
+            # heap bisa berisi token yang sudah dibuang LRU
+            if len(self._expiry) > self._maxsize * 2:
+                self._expiry = [(e, t) for t, e in self._tokens.items()]
+                heapq.heapify(self._expiry)
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+            self._expiry.clear()
+        return None
+
+    def _purge(self, now: float) -> None:
+        """ Buang token yang sudah expired, urut dari `exp` terkecil """
+        while self._expiry and self._expiry[0][0] <= now:
+            exp, token = heapq.heappop(self._expiry)
+            if self._tokens.get(token) == exp:
+                del self._tokens[token]
+                self.expired += 1
+        return None
+
+
+class SNAPSignatureCache(SNAPTokenCache):
+    """
+    Cache hasil verifikasi OAuth2 Signature (SHA256withRSA) yang valid.
+
+    Saat timeout, Bank biasanya retry `/snap/v1.0/access-token/b2b` dengan
+    (`X-CLIENT-KEY`, `X-TIMESTAMP`, `X-SIGNATURE`) yang sama persis. Hash
+    dari ketiganya disimpan, sehingga retry berikutnya tidak perlu
+    verifikasi RSA ulang.
+
+    - Hanya Signature yang valid yang disimpan.
+    - Umur cache paling lama `ttl` detik, dan tidak pernah melewati
+      `X-TIMESTAMP` + `skew`; timestamp yang tidak bisa diparse tidak
+      disimpan.
+    - Cache per `SNAPCrypto`, dikosongkan setiap key/cert diganti.
+
+        ```python
+
+        Crypto = SNAPCrypto(..., 
+                    signature_cache=SNAPSignatureCache(ttl=60, skew=300))
+
+        Crypto.signature_cache.stats()['hit_rate']
+
+        ```
+    """
+    def __init__(
+            self: SignatureCacheType,
+            maxsize: int = 1024,
+            *,
+            ttl: float = 60,
+            skew: float = 300,
+            clock: Callable[[], float] = time.time
+        ) -> None:
+        assert ttl > 0, 'ttl harus > 0'
+        super().__init__(maxsize, clock=clock)
+        self._ttl = ttl
+        self._skew = skew
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl
+
+    @property
+    def skew(self) -> float:
+        return self._skew
+
+    @staticmethod
+    def digest(message: bytes, signature: bytes) -> str:
+        """ Key cache, `message` sudah berisi client_id dan timestamp """
+        return hashlib.blake2b(message + b'\0' + signature, 
+                               digest_size=16).hexdigest()
+
+    def verified(self, message: bytes, signature: bytes) -> bool:
+        """ True jika Signature pernah lolos verifikasi dan belum expired """
+        return self.get(self.digest(message, signature))
+
+    def remember(
+            self,
+            message: bytes,
+            signature: bytes,
+            timestamp: str
+        ) -> None:
+        """ Simpan Signature yang sudah lolos verifikasi """
+        try:
+            issued = datetime.fromisoformat(timestamp).timestamp()
+        except (ValueError, TypeError):
+            return None
+        exp = min(self._clock() + self._ttl, issued + self._skew)
+        self.add(self.digest(message, signature), exp)
+        return None
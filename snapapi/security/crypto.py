@@ -4,17 +4,19 @@
 
 import hashlib
 import _hashlib
-import jwt
 import hmac
 import json
 import base64
+import binascii
+import functools
+import time
 
-from typing import Union, TypeVar, Optional, Literal, Any
-from datetime import datetime, timedelta, timezone
+from typing import (
+        Union, TypeVar, Optional, Literal, Any, Tuple, Dict, Callable, 
+        List, Sequence, Iterable
+    )
 
-from Crypto.PublicKey import RSA
-from Crypto.Hash import SHA256
-from Crypto.Signature import pkcs1_15
+from anyio import to_thread
 
 from snapapi import tools
 from snapapi.exceptions import (
@@ -25,9 +27,40 @@ from snapapi.exceptions import (
         InvalidTokenB2B,
         InvalidTokenB2C
     )
+from snapapi.security.executor import SNAPCryptoExecutor, ExecutorClosed
+from snapapi.security.backend import CryptoBackend, BACKEND, get_backend
+from snapapi.security.cache import SNAPTokenCache, SNAPSignatureCache
+from snapapi.security.token import (
+        TokenEngine,
+        JWTTokenEngine,
+        CompactTokenEngine
+    )
 
 AppType = TypeVar("AppType", bound="SNAPCrypto")
 ALGORITHM = Literal['SHA256withRSA', 'HMAC-SHA512']
+# 'JWT': verifikasi Access Token, apapun `token_engine`-nya
+OPERATION = Literal['SHA256withRSA', 'HMAC-SHA512', 'JWT']
+EXECUTION = Literal['inline', 'thread', 'process']
+# detik; kira-kira ongkos 1x pindah ke thread pool dan kembali ke event loop.
+# Operasi yang lebih murah dari ini lebih baik jalan inline.
+INLINE_THRESHOLD: float = 0.0001
+# detik; perkiraan biaya sebelum `SNAPCrypto.calibrate`, tanpa mengukur
+DEFAULT_COSTS: Dict[OPERATION, float] = {
+        'HMAC-SHA512': 0.0,
+        'JWT': 0.0,
+        'SHA256withRSA': 1.0
+    }
+# HMAC (RFC 2104), SHA-512 block size 128 bytes
+_HMAC_BLOCK_SIZE: int = 128
+_HMAC_TRANS_36: bytes = bytes(x ^ 0x36 for x in range(256))
+_HMAC_TRANS_5C: bytes = bytes(x ^ 0x5C for x in range(256))
+# Hasil `verify_many`, 1 byte per record
+VERIFY_INVALID: int = 0
+VERIFY_VALID: int = 1
+# record tidak lengkap/format salah, misal X-TIMESTAMP tidak ada
+VERIFY_ERROR: int = 2
+# (path, http_method, access_token, request_headers, request_body)
+RECORD = Tuple[str, str, Union[str, None], dict, Union[dict, bytes, None]]
 
 
 class SNAPCrypto:
@@ -120,7 +153,7 @@ class SNAPCrypto:
                 http_method = 'POST',
                 access_token = access_token,
                 request_headers = request_headers_dict,
-                request_body = request_body_dict
+                request_body = await request.body()
             )
 
         ```
@@ -132,16 +165,35 @@ class SNAPCrypto:
             private_key: Union[bytes, str, None] = None,
             private_key_passphrase: Optional[str] = None,
             public_cert: Union[bytes, str, None] = None,
+            previous_public_certs: Union[Sequence[Union[bytes, str]], None] \
+                = None,
             client_id: Union[str, None] = None,
             client_secret: Union[bytes, str, None] = None,
-            token_passphrase: Union[bytes, str, None] = None
+            token_passphrase: Union[bytes, str, None] = None,
+            execution: Union[Dict[OPERATION, EXECUTION], None] = None,
+            token_cache: Union[SNAPTokenCache, None] = None,
+            signature_cache: Union[SNAPSignatureCache, None] = None,
+            token_engine: Union[TokenEngine, Literal['jwt', 'compact']] = 'jwt',
+            backend: Union[CryptoBackend, BACKEND] = 'pycryptodome'
         ):
         self._client_id = client_id
         self._client_secret = client_secret
+        self.initiate_hmac()
         self._private_key = private_key
         self._private_key_passphrase = private_key_passphrase
         self._public_cert = public_cert
+        self._previous_public_certs = list(previous_public_certs or [])
         self._token_passphrase = token_passphrase
+        self._token_cache = token_cache
+        self._signature_cache = signature_cache
+        self._token_engine = token_engine
+        self._backend: CryptoBackend = get_backend(backend)
+        self._executor: Union[SNAPCryptoExecutor, None] = None
+        self._execution_override: Dict[OPERATION, EXECUTION] = \
+            dict(execution or {})
+        self._execution: Union[Dict[OPERATION, EXECUTION], None] = None
+        # hasil `calibrate`, None = `DEFAULT_COSTS`
+        self._costs: Union[Dict[OPERATION, float], None] = None
         self._key = self.initiate_key()
 
     @property
@@ -157,12 +209,32 @@ class SNAPCrypto:
     @property
     def client_secret(self) -> bytes:
         """ :type: bytes """
-        if not self._client_secret:
-            return b''
-        client_secret = self._client_secret
+        return self._client_secret_bytes
+
+    @client_secret.setter
+    def client_secret(self, client_secret: Union[bytes, str, None]) -> None:
+        self._client_secret = client_secret
+        self.initiate_hmac()
+
+    def initiate_hmac(self) -> None:
+        """ 
+        Precompute state HMAC-SHA512 untuk client_secret: inner dan outer
+        pad sudah di-hash, sehingga setiap Signature cukup clone 
+        (`copy()`) kemudian update message, lihat `_digest_HMAC_SHA512`.
+        """
+        client_secret = self._client_secret or b''
         if not isinstance(client_secret, bytes):
             client_secret = client_secret.encode()
-        return client_secret
+        self._client_secret_bytes: bytes = client_secret
+        key: bytes = client_secret
+        if len(key) > _HMAC_BLOCK_SIZE:
+            key = hashlib.sha512(key).digest()
+        key = key.ljust(_HMAC_BLOCK_SIZE, b'\0')
+        self._hmac_inner: _hashlib.HASH = \
+            hashlib.sha512(key.translate(_HMAC_TRANS_36))
+        self._hmac_outer: _hashlib.HASH = \
+            hashlib.sha512(key.translate(_HMAC_TRANS_5C))
+        return None
 
     @property
     def token_passphrase(self) -> bytes:
@@ -174,6 +246,30 @@ class SNAPCrypto:
             token_passphrase = token_passphrase.encode()
         return token_passphrase
 
+    @property
+    def token_engine(self) -> TokenEngine:
+        """ 
+        Engine Access Token, default JWT (HS512). 'compact' untuk token 
+        biner yang lebih pendek, lihat `CompactTokenEngine`.
+        """
+        if isinstance(self._token_engine, str):
+            assert self.token_passphrase, 'token_passphrase mandatory'
+            if self._token_engine == 'compact':
+                self._token_engine = CompactTokenEngine(self.token_passphrase)
+            else:
+                self._token_engine = JWTTokenEngine(self.token_passphrase)
+        return self._token_engine
+
+    @property
+    def token_cache(self) -> Union[SNAPTokenCache, None]:
+        """ Readonly. Cache Access Token yang sudah terverifikasi """
+        return self._token_cache
+
+    @property
+    def signature_cache(self) -> Union[SNAPSignatureCache, None]:
+        """ Readonly. Cache OAuth2 Signature yang sudah terverifikasi """
+        return self._signature_cache
+
     @property
     def private_key(self) -> bytes:
         """ :type: bytes """
@@ -201,25 +297,195 @@ class SNAPCrypto:
         self.initiate_key()
 
     @property
-    def key(self) -> Union[RSA.RsaKey, None]:
+    def backend(self) -> CryptoBackend:
+        """ Readonly. Backend RSA, lihat `snapapi.security.backend` """
+        return self._backend
+
+    @property
+    def key(self) -> Any:
         """ 
-        Readonly. Hanya berubah jika _private_key / _public_cert berubah
+        Readonly. Hanya berubah jika _private_key / _public_cert berubah.
+        Object key milik `backend`.
         """
         return self._key
 
-    def initiate_key(self) -> Union[RSA.RsaKey, None]:
+    def initiate_key(self) -> Any:
         if self._private_key != None:
-            key = RSA.importKey(
+            key = self._backend.import_key(
                     self._private_key, 
                     self._private_key_passphrase
                 )
         elif self._public_cert:
-            key = RSA.importKey(self._public_cert)
+            key = self._backend.import_key(self._public_cert)
         else:
             key = None
         self._key = key
+        # key untuk verifikasi SHA256withRSA; selama masa rotasi cert,
+        # Signature dari cert lama (`previous_public_certs`) tetap valid
+        keys: List[Any] = key and [key] or []
+        keys += [self._backend.import_key(cert) 
+                 for cert in self._previous_public_certs]
+        self._verify_keys: List[Tuple[str, Any]] = [
+                (self._backend.fingerprint(k), self._backend.public_key(k))
+                for k in keys
+            ]
+        # biaya SHA256withRSA tergantung key, kalibrasi ulang
+        self._costs = None
+        self._execution = None
+        if self._signature_cache is not None:
+            # Signature yang valid untuk key lama belum tentu valid lagi
+            self._signature_cache.clear()
+        if self._executor is not None:
+            self._executor.reload(
+                    private_key=self._private_key,
+                    private_key_passphrase=self._private_key_passphrase,
+                    public_cert=self._public_cert,
+                    previous_public_certs=self._previous_public_certs,
+                    backend=self._backend
+                )
         return key
 
+    @property
+    def fingerprints(self) -> List[str]:
+        """ 
+        Readonly. Fingerprint (SHA-256 DER public key) key verifikasi,
+        sesuai urutan dicoba. Key yang terakhir cocok selalu di depan.
+        """
+        return [fingerprint for fingerprint, _ in self._verify_keys]
+
+    @property
+    def executor(self) -> Union[SNAPCryptoExecutor, None]:
+        """ Readonly. Lihat `create_executor` """
+        return self._executor
+
+    def create_executor(
+            self,
+            *,
+            max_workers: Union[int, None] = None,
+            max_queue: Union[int, None] = None
+        ) -> SNAPCryptoExecutor:
+        """
+        Process pool untuk operasi SHA256withRSA di method `*_async`.
+        Tanpa executor, operasi RSA jalan di thread pool.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = SNAPCryptoExecutor(
+                private_key=self._private_key,
+                private_key_passphrase=self._private_key_passphrase,
+                public_cert=self._public_cert,
+                previous_public_certs=self._previous_public_certs,
+                backend=self._backend,
+                max_workers=max_workers,
+                max_queue=max_queue
+            )
+        self._execution = None
+        return self._executor
+
+    @property
+    def execution(self) -> Dict[OPERATION, EXECUTION]:
+        """ 
+        Strategi eksekusi per operasi untuk method `*_async`, ditimpa oleh
+        param `execution`. Dari hasil `calibrate`, sebelum itu dari
+        `DEFAULT_COSTS`: tidak pernah mengukur di event loop.
+        """
+        if self._execution is None:
+            execution: Dict[OPERATION, EXECUTION] = {}
+            operation: OPERATION
+            for operation, cost in (self._costs or DEFAULT_COSTS).items():
+                if cost < INLINE_THRESHOLD:
+                    execution[operation] = 'inline'
+                elif operation == 'SHA256withRSA' \
+                        and self._executor is not None:
+                    execution[operation] = 'process'
+                else:
+                    execution[operation] = 'thread'
+            execution.update(self._execution_override)
+            self._execution = execution
+        return self._execution
+
+    @execution.setter
+    def execution(
+            self, 
+            execution: Union[Dict[OPERATION, EXECUTION], None]
+        ) -> None:
+        self._execution_override = dict(execution or {})
+        self._execution = None
+
+    def calibrate(self, rounds: int = 32) -> Dict[OPERATION, EXECUTION]:
+        """ 
+        Ukur biaya HMAC-SHA512, JWT dan SHA256withRSA. Operasi yang lebih 
+        murah dari `INLINE_THRESHOLD` jalan inline di event loop, sisanya 
+        di executor (SHA256withRSA, jika ada) atau thread pool.
+
+        Blocking, dari event loop pakai `calibrate_async` (misal saat
+        startup, lihat `SNAPKeyRegistry.warm_up`). Tidak mengukur apapun
+        jika semua operasi sudah diisi param `execution`.
+        """
+        if len(self._execution_override) == len(DEFAULT_COSTS):
+            return self.execution
+
+        def _cost(fn: Callable[[], Any], rounds: int) -> float:
+            """ median, detik """
+            costs = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                try:
+                    fn()
+                except Exception:
+                    pass
+                costs.append(time.perf_counter() - start)
+            costs.sort()
+            return costs[len(costs) // 2]
+
+        # string_to_sign transactional pada umumnya
+        message: bytes = b'POST:/snap/v1.0/transfer-va/inquiry:' \
+                         + b'x' * 180 + b':' + b'0' * 64 \
+                         + b':2025-01-03T14:06:47.798+07:00'
+        signature = self._create_signature_HMAC_SHA512(message)
+        engine: TokenEngine = JWTTokenEngine(b'calibrate')
+        if self.token_passphrase \
+                or isinstance(self._token_engine, TokenEngine):
+            engine = self.token_engine
+        iat: int = int(time.time())
+        token: str = engine.encode(iat=iat, exp=iat + 60)
+        costs: Dict[OPERATION, float] = {
+                'HMAC-SHA512': _cost(lambda: 
+                    self._verify_signature_HMAC_SHA512(message, signature),
+                    rounds),
+                'JWT': _cost(lambda: engine.decode(token), rounds),
+                # tanpa key, anggap mahal
+                'SHA256withRSA': 1.0
+            }
+        if self.key:
+            rsa_signature = base64.b64encode(
+                    b'\1' * self._backend.size_in_bytes(self.key))
+            costs['SHA256withRSA'] = _cost(lambda: 
+                    self._verify_signature_SHA256withRSA(
+                        message, rsa_signature),
+                    max(rounds // 8, 1)
+                )
+        self._costs = costs
+        self._execution = None
+        return self.execution
+
+    async def calibrate_async(
+            self,
+            rounds: int = 32
+        ) -> Dict[OPERATION, EXECUTION]:
+        """ `calibrate` di thread pool """
+        return await to_thread.run_sync(self.calibrate, rounds)
+
+    async def _execute(
+            self,
+            operation: OPERATION,
+            fn: Callable[[], Any]
+        ) -> Any:
+        """ Jalankan `fn` sesuai strategi `execution` operasi tsb """
+        if self.execution[operation] == 'inline':
+            return fn()
+        return await to_thread.run_sync(fn)
+
     def __str__(self)->str:
         return f"client_id='{self._client_id}', "\
             f"key='{self.key}'"
@@ -232,9 +498,10 @@ class SNAPCrypto:
             *,
             path: str,
             timestamp: str,
-            request_body: dict,
+            request_body: Union[dict, bytes, None] = None,
             http_method: str,
-            access_token: Union[str, None] = None
+            access_token: Union[str, None] = None,
+            request_body_digest: Union[str, None] = None
         ) -> bytes:
         """ 
         Format string_to_sign untuk Transactional Signature:
@@ -259,22 +526,42 @@ class SNAPCrypto:
                 + ":“ 
                 + TimeStamp
 
+        `request_body` bisa berupa dict (diminify dengan `json.dumps`) atau
+        raw bytes body yang diterima, yang diminify apa adanya dengan
+        `tools.minify_json`. Untuk verifikasi Signature dari Partner, 
+        gunakan raw bytes: lebih cepat, dan escape non-ASCII maupun format 
+        angka tetap sama dengan yang di-sign oleh Partner.
+
+        Tanpa body (misal GET): None atau b''. Raw bytes selalu di-hash
+        sesuai yang dikirim, termasuk body b'{}' (hash dari '{}'). dict
+        kosong `{}` tetap berarti tanpa body seperti sebelumnya (hash dari
+        ''), sehingga Request dengan body `{}` harus diverifikasi dengan
+        raw bytes.
+
+        Jika `request_body_digest` (hex SHA-256 body yang sudah diminify,
+        lihat `SNAPBodyDigestMiddleware`) diisi, `request_body` diabaikan.
         """
-        request_body_mini: str = ''
+        request_body_mini: bytes = b''
         request_body_hashed: _hashlib.HASH
-        request_body_digest: str
         digest_message: bytes
 
         assert http_method, 'http_method mandatory'
-        if not isinstance(request_body, dict):
-            raise TypeError('headers harus dict')
-        if request_body:
-            request_body_mini = json.dumps(request_body, separators=(',',':'))
-        
+        if not request_body_digest:
+            if isinstance(request_body, (bytes, bytearray, memoryview)):
+                request_body_mini = tools.minify_json(request_body)
+            elif request_body is None:
+                pass
+            elif isinstance(request_body, dict):
+                if request_body:
+                    request_body_mini = json.dumps(request_body, 
+                        separators=(',',':')).encode()
+            else:
+                raise TypeError('request_body harus dict, bytes atau None')
+            request_body_hashed = hashlib.sha256(request_body_mini)
+            request_body_digest = request_body_hashed.hexdigest().lower()
+
         http_method = http_method.upper()
         timestamp = tools.datetime_string(timestamp)
-        request_body_hashed = hashlib.sha256(request_body_mini.encode())
-        request_body_digest = request_body_hashed.hexdigest().lower()
         if access_token:
             digest_message = f"{http_method}:{path}:{access_token}:"\
                              f"{request_body_digest}:{timestamp}".encode()
@@ -313,20 +600,24 @@ class SNAPCrypto:
     def _create_signature_SHA256withRSA(self, string_to_sign: bytes) -> bytes:
         """ Signature untuk OAuth2 """
         assert self.key, 'private_key is required'
-        sha256_hash: SHA256.SHA256Hash = SHA256.new(string_to_sign)
-        scheme: pkcs1_15.PKCS115_SigScheme = pkcs1_15.new(self.key)
-        signature: bytes = scheme.sign(sha256_hash)
+        signature: bytes = self._backend.sign_SHA256withRSA(
+                self.key, string_to_sign)
         return base64.b64encode(signature)
 
     def _create_signature_HMAC_SHA512(self, string_to_sign: bytes) -> bytes:
         """ Signature untuk Transactional """
-        hmac_digest: bytes = hmac.digest(
-                                    self.client_secret,
-                                    string_to_sign,
-                                    hashlib.sha512
-                                )
-        return base64.b64encode(hmac_digest)
+        return base64.b64encode(self._digest_HMAC_SHA512(string_to_sign))
 
+    def _digest_HMAC_SHA512(self, message: bytes) -> bytes:
+        """ 
+        Raw digest HMAC-SHA512, sama dengan
+        `hmac.digest(client_secret, message, hashlib.sha512)`
+        """
+        inner: _hashlib.HASH = self._hmac_inner.copy()
+        inner.update(message)
+        outer: _hashlib.HASH = self._hmac_outer.copy()
+        outer.update(inner.digest())
+        return outer.digest()
 
     def create_signature_oauth2(
             self, 
@@ -342,7 +633,7 @@ class SNAPCrypto:
             *,
             path: str,
             timestamp: str,
-            request_body: dict,
+            request_body: Union[dict, bytes],
             http_method: str,
             algorithm: ALGORITHM = 'HMAC-SHA512',
             access_token: Union[str, None] = None
@@ -369,10 +660,11 @@ class SNAPCrypto:
             path: str,
             access_token: str,
             request_headers: dict,
-            request_body: dict,
+            request_body: Union[dict, bytes, None] = None,
             algorithm: ALGORITHM = 'HMAC-SHA512',
             http_method: str = 'POST',
-            payload_key: Union[str, None] = None
+            payload_key: Union[str, None] = None,
+            request_body_digest: Union[str, None] = None
         ) -> None:
         """ 
         Verifikasi Transactional Signature
@@ -393,44 +685,220 @@ class SNAPCrypto:
         Nah, param 'payload_key' digunakan untuk workaround ini, diisi
         dengan key headers yang berisi string-to-sign oleh requestor.
         """
-        assert path, 'path mandatory'
-        assert request_headers, 'request_headers mandatory'
-        assert isinstance(request_headers, dict), 'request_headers harus dict'
-        assert request_body, 'request_body mandatory'
-        assert isinstance(request_body, dict), 'request_body harus dict'
-        assert access_token, 'access_token mandatory'
-
-        # note: pydantic convert 'x-signature' jadi 'x_signature'
-        request_headers = tools.parse_headers(request_headers)
-        digest_string = self.encode_string_to_sign(
+        digest_string, signature, payload = self._parse_transactional(
                 path=path,
-                timestamp=request_headers['x-timestamp'],
+                access_token=access_token,
+                request_headers=request_headers,
                 request_body=request_body,
                 http_method=http_method,
-                access_token=access_token
+                payload_key=payload_key,
+                request_body_digest=request_body_digest
             )
         try:
             return self.verify_signature(
                     message=digest_string,
-                    signature=request_headers['x-signature'].encode(),
+                    signature=signature,
                     algorithm=algorithm
                 )
         except Exception as exc:
-            if not payload_key:
+            if not payload:
                 # nothing to do .. move along ..
                 raise exc
             # workaround
             try:
-                digest_string = request_headers['payload_key'].encode()
                 return self.verify_signature(
-                        message=digest_string,
-                        signature=request_headers['x-signature'].encode(),
+                        message=payload,
+                        signature=signature,
                         algorithm=algorithm
                     )
             except:
                 # re-raise original Exception
                 raise exc
 
+    async def verify_signature_transactional_async(
+            self,
+            *,
+            path: str,
+            access_token: str,
+            request_headers: dict,
+            request_body: Union[dict, bytes, None] = None,
+            algorithm: ALGORITHM = 'HMAC-SHA512',
+            http_method: str = 'POST',
+            payload_key: Union[str, None] = None,
+            request_body_digest: Union[str, None] = None
+        ) -> None:
+        """ 
+        Async `verify_signature_transactional`, 
+        lihat `verify_signature_async` 
+        """
+        digest_string, signature, payload = self._parse_transactional(
+                path=path,
+                access_token=access_token,
+                request_headers=request_headers,
+                request_body=request_body,
+                http_method=http_method,
+                payload_key=payload_key,
+                request_body_digest=request_body_digest
+            )
+        try:
+            return await self.verify_signature_async(
+                    message=digest_string,
+                    signature=signature,
+                    algorithm=algorithm
+                )
+        except Exception as exc:
+            if not payload:
+                raise exc
+            try:
+                return await self.verify_signature_async(
+                        message=payload,
+                        signature=signature,
+                        algorithm=algorithm
+                    )
+            except:
+                raise exc
+
+    def verify_many(
+            self,
+            records: Iterable[RECORD],
+            *,
+            algorithm: ALGORITHM = 'HMAC-SHA512',
+            payload_key: Union[str, None] = None,
+            chunksize: int = 64
+        ) -> bytearray:
+        """
+        Verifikasi Transactional Signature banyak record sekaligus, misal
+        untuk audit log transaksi. Tidak raise per record, returns 
+        `bytearray` 1 byte per record sesuai urutan: 
+        `VERIFY_VALID`, `VERIFY_INVALID` atau `VERIFY_ERROR`.
+
+        - HMAC-SHA512: inline, memakai state inner/outer pad yang sama
+        - SHA256withRSA: dibagi per `chunksize` ke semua process jika ada
+          executor (lihat `create_executor`)
+
+            ```python
+
+            records = (
+                    (row.path, 'POST', row.token, row.headers, row.body)
+                    for row in rows
+                )
+            results = Crypto.verify_many(records)
+            invalid = [i for i, r in enumerate(results) 
+                       if r != VERIFY_VALID]
+
+            ```
+        """
+        if algorithm == 'SHA256withRSA':
+            assert self.key, 'public_cert is required'
+        else:
+            assert self.client_secret, 'client_secret mandatory'
+        if payload_key:
+            payload_key = payload_key.lower().replace('_', '-')
+
+        results = bytearray()
+        # record RSA yang belum diverifikasi: (index, item)
+        pending: List[Tuple[int, Tuple[bytes, bytes, bytes]]] = []
+        digest = self._digest_HMAC_SHA512
+        for path, http_method, access_token, request_headers, request_body \
+                in records:
+            try:
+                headers = tools.parse_headers(request_headers)
+                message = self.encode_string_to_sign(
+                        path=path,
+                        timestamp=headers['x-timestamp'],
+                        request_body=request_body or b'',
+                        http_method=http_method,
+                        access_token=access_token
+                    )
+                signature: bytes = headers['x-signature'].encode()
+                payload: bytes = payload_key \
+                        and headers.get(payload_key, '').encode() or b''
+            except (KeyError, TypeError, ValueError, AttributeError,
+                    AssertionError):
+                results.append(VERIFY_ERROR)
+                continue
+            if algorithm == 'SHA256withRSA':
+                pending.append((len(results), (message, signature, payload)))
+                results.append(VERIFY_INVALID)
+                continue
+            try:
+                signature_digest = base64.b64decode(signature)
+            except (binascii.Error, ValueError):
+                results.append(VERIFY_INVALID)
+                continue
+            valid = hmac.compare_digest(digest(message), signature_digest)\
+                or bool(payload) \
+                    and hmac.compare_digest(digest(payload), signature_digest)
+            results.append(valid and VERIFY_VALID or VERIFY_INVALID)
+
+        if pending:
+            items = [item for _, item in pending]
+            if self._executor is not None and not self._executor.closed:
+                verified = self._executor.verify_many_SHA256withRSA(
+                        items, chunksize=chunksize)
+            else:
+                verified = bytes(
+                        self._verify_SHA256withRSA_quiet(message, signature)
+                        or bool(payload) 
+                            and self._verify_SHA256withRSA_quiet(
+                                payload, signature)
+                        for message, signature, payload in items
+                    )
+            for (index, _), verified_item in zip(pending, verified):
+                results[index] = verified_item \
+                    and VERIFY_VALID or VERIFY_INVALID
+        return results
+
+    def _verify_SHA256withRSA_quiet(
+            self,
+            message: bytes,
+            signature: bytes
+        ) -> bool:
+        try:
+            self._verify_signature_SHA256withRSA(message, signature)
+        except InvalidSignature:
+            return False
+        return True
+
+    def _parse_transactional(
+            self,
+            *,
+            path: str,
+            access_token: str,
+            request_headers: dict,
+            request_body: Union[dict, bytes, None],
+            http_method: str,
+            payload_key: Union[str, None],
+            request_body_digest: Union[str, None]
+        ) -> Tuple[bytes, bytes, bytes]:
+        """ 
+        Returns (string_to_sign, signature, string_to_sign dari header)
+        """
+        assert path, 'path mandatory'
+        assert request_headers, 'request_headers mandatory'
+        assert isinstance(request_headers, dict), 'request_headers harus dict'
+        assert request_body or request_body_digest, \
+            'request_body atau request_body_digest mandatory'
+        assert request_body_digest or isinstance(request_body, (dict, bytes)),\
+            'request_body harus dict atau bytes'
+        assert access_token, 'access_token mandatory'
+
+        # note: pydantic convert 'x-signature' jadi 'x_signature'
+        request_headers = tools.parse_headers(request_headers)
+        digest_string = self.encode_string_to_sign(
+                path=path,
+                timestamp=request_headers['x-timestamp'],
+                request_body=request_body,
+                http_method=http_method,
+                access_token=access_token,
+                request_body_digest=request_body_digest
+            )
+        payload: bytes = b''
+        if payload_key:
+            payload_key = payload_key.lower().replace('_', '-')
+            payload = request_headers.get(payload_key, '').encode()
+        return digest_string, request_headers['x-signature'].encode(), payload
+
     def verify_signature(
             self,
             *,
@@ -454,39 +922,88 @@ class SNAPCrypto:
             self._verify_signature_HMAC_SHA512(message, signature)
         return None
 
+    async def verify_signature_async(
+            self,
+            *,
+            message: bytes,
+            signature: bytes,
+            algorithm: ALGORITHM
+        ) -> None:
+        """
+        Async `verify_signature`, dijalankan sesuai strategi `execution`:
+        - 'inline':  langsung di event loop
+        - 'thread':  di thread pool
+        - 'process': di executor (lihat `create_executor`)
+        """
+        assert message and signature, 'message and signature are mandatory'
+        strategy: EXECUTION = self.execution[algorithm]
+        if strategy == 'process' and self._executor is not None:
+            assert self.key, 'public_cert is required'
+            try:
+                valid = await self._executor.verify_SHA256withRSA(
+                        message, signature)
+            except ExecutorClosed:
+                # SNAPCrypto ini sudah dilepas (rotasi cert) saat request
+                # berjalan, selesaikan di thread pool
+                pass
+            else:
+                if not valid:
+                    raise InvalidSignature()
+                return None
+        await self._execute(algorithm, functools.partial(
+                self.verify_signature,
+                message=message,
+                signature=signature,
+                algorithm=algorithm
+            ))
+        return None
+
     def _verify_signature_SHA256withRSA(
             self,
             message: bytes, 
             signature: bytes
         ) -> None:
-        """ Private verifikasi signature algo SHA256withRSA """
+        """ 
+        Private verifikasi signature algo SHA256withRSA.
+        Dicoba ke semua key sesuai urutan `fingerprints`.
+        """
         assert self.key, 'public_cert is required'
         try:
-            sha256_hash: SHA256.SHA256Hash = SHA256.new(message)
-            scheme: pkcs1_15.PKCS115_SigScheme = pkcs1_15.new(self.key)
-            scheme.verify(sha256_hash, base64.b64decode(signature))
-            return None
-        except ValueError as exc:
+            signature_bytes: bytes = base64.b64decode(signature)
+        except ValueError:
             raise InvalidSignature()
+        verify = self._backend.verify_SHA256withRSA
+        verify_keys = self._verify_keys
+        for index, (_, key) in enumerate(verify_keys):
+            if not verify(key, message, signature_bytes):
+                continue
+            if index:
+                # Partner sudah pakai key ini, coba pertama kali berikutnya
+                verify_keys = list(verify_keys)
+                verify_keys.insert(0, verify_keys.pop(index))
+                self._verify_keys = verify_keys
+            return None
+        raise InvalidSignature()
 
     def _verify_signature_HMAC_SHA512(
             self,
             message: bytes, 
             signature: bytes
         ) -> None:
-        """ Private verifikasi signature algo HMAC-SHA512 """
-        valid_signature: bytes
-        valid_signature_digest: bytes
+        """ 
+        Private verifikasi signature algo HMAC-SHA512.
+        Yang dibandingkan raw digest, signature dari Partner cukup
+        di-decode sekali.
+        """
         signature_digest: bytes
-        valid_signature = self._create_signature_HMAC_SHA512(message)
-        valid_signature_digest = base64.b64decode(valid_signature)
         try:
             signature_digest = base64.b64decode(signature)
-            assert hmac.compare_digest(
-                    valid_signature_digest, 
-                    signature_digest
-                )
-        except:
+        except ValueError:
+            raise InvalidSignature()
+        if not hmac.compare_digest(
+                self._digest_HMAC_SHA512(message),
+                signature_digest
+            ):
             raise InvalidSignature()
         return None
 
@@ -498,7 +1015,7 @@ class SNAPCrypto:
             expires_in: int = 899
         ) -> str:
         """ 
-        Create Access Token dengan menggunakan JWT.
+        Create Access Token dengan menggunakan `token_engine`, default JWT.
         
         Note: 
         token_passphrase yang digunakan HARUS BERBEDA dengan client_secret
@@ -517,6 +1034,51 @@ class SNAPCrypto:
         - AccessDenied: Client ID != X-Partner-ID
         - InvalidSignature: X-Signature Invalid -> CASE_CODE_00
         """
+        message, signature, timestamp = self._parse_oauth2_headers(
+                request_headers=request_headers,
+                signature_algorithm=signature_algorithm
+            )
+        cache = self._signature_cache
+        if cache is None or not cache.verified(message, signature):
+            self.verify_signature(
+                    message=message,
+                    signature=signature,
+                    algorithm=signature_algorithm
+                )
+            if cache is not None:
+                cache.remember(message, signature, timestamp)
+        return self._encode_access_token(expires_in)
+
+    async def create_access_token_async(
+            self,
+            *,
+            request_headers: dict,
+            signature_algorithm: ALGORITHM = 'SHA256withRSA',
+            expires_in: int = 899
+        ) -> str:
+        """ Async `create_access_token`, lihat `verify_signature_async` """
+        message, signature, timestamp = self._parse_oauth2_headers(
+                request_headers=request_headers,
+                signature_algorithm=signature_algorithm
+            )
+        cache = self._signature_cache
+        if cache is None or not cache.verified(message, signature):
+            await self.verify_signature_async(
+                    message=message,
+                    signature=signature,
+                    algorithm=signature_algorithm
+                )
+            if cache is not None:
+                cache.remember(message, signature, timestamp)
+        return self._encode_access_token(expires_in)
+
+    def _parse_oauth2_headers(
+            self,
+            *,
+            request_headers: dict,
+            signature_algorithm: ALGORITHM
+        ) -> Tuple[bytes, bytes, str]:
+        """ Returns (string_to_sign, signature, timestamp) OAuth2 """
         assert signature_algorithm, 'signature_algorithm mandatory'
         assert request_headers, 'request_headers mandatory'
         assert self.token_passphrase, 'token_passphrase mandatory'
@@ -532,19 +1094,17 @@ class SNAPCrypto:
         if not self.client_id == request_headers['x-client-key']:
             raise AccessDenied()
 
-        message=f"{self.client_id}|{request_headers['x-timestamp']}"
-        self.verify_signature(
-                message=message.encode(),
-                signature=request_headers['x-signature'].encode(),
-                algorithm=signature_algorithm
+        timestamp: str = request_headers['x-timestamp']
+        message = f"{self.client_id}|{timestamp}"
+        return (
+                message.encode(),
+                request_headers['x-signature'].encode(),
+                timestamp
             )
-        iat: datetime = datetime.now(timezone.utc)
-        exp: datetime = iat + timedelta(seconds=expires_in)
-        payload = {
-                'iat': iat,
-                'exp': exp
-            }
-        return jwt.encode(payload, self.token_passphrase, algorithm='HS512')
+
+    def _encode_access_token(self, expires_in: int) -> str:
+        iat: int = int(time.time())
+        return self.token_engine.encode(iat=iat, exp=iat + expires_in)
 
     def verify_access_token(
             self,
@@ -552,7 +1112,9 @@ class SNAPCrypto:
             service_class: Optional[Literal['b2b', 'b2c']] = 'b2b'
         ) -> None:
         """ 
-        Verify JWT access_token
+        Verify access_token dengan `token_engine`.
+        Jika ada `token_cache`, token yang sudah
+        pernah terverifikasi dan belum expired tidak di-decode ulang.
 
         Raises:
         - InvalidTokenB2B: Access Token Invalid (B2B)
@@ -562,8 +1124,12 @@ class SNAPCrypto:
         """
         try:
             assert access_token
-            _ = jwt.decode(access_token, self.token_passphrase, 
-                algorithms=['HS512'])
+            if self._token_cache is not None \
+                    and self._token_cache.get(access_token):
+                return None
+            payload = self.token_engine.decode(access_token)
+            if self._token_cache is not None and 'exp' in payload:
+                self._token_cache.add(access_token, payload['exp'])
         except AssertionError:
             if service_class == 'b2b':
                 raise TokenNotFoundB2B()
@@ -574,4 +1140,17 @@ class SNAPCrypto:
                 raise InvalidTokenB2B()
             else:
                 raise InvalidTokenB2C()
-        return None
\ No newline at end of file
+        return None
+
+    async def verify_access_token_async(
+            self,
+            access_token: str,
+            service_class: Optional[Literal['b2b', 'b2c']] = 'b2b'
+        ) -> None:
+        """ Async `verify_access_token`, lihat `execution` """
+        await self._execute('JWT', functools.partial(
+                self.verify_access_token,
+                access_token,
+                service_class
+            ))
+        return None
@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Security: Crypto Executor
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+import base64
+import multiprocessing
+import os
+import threading
+import weakref
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+        Union, Optional, TypeVar, Callable, Any, List, Sequence, Tuple
+    )
+
+from snapapi.security.backend import CryptoBackend, BACKEND, get_backend
+
+AppType = TypeVar("AppType", bound="SNAPCryptoExecutor")
+
+# Backend dan key RSA milik worker process, diimport sekali oleh
+# `_initializer`
+_WORKER_BACKEND: Union[CryptoBackend, None] = None
+_WORKER_KEY: Any = None
+# Key untuk verifikasi, termasuk cert lama selama masa rotasi
+_WORKER_VERIFY_KEYS: List[Any] = []
+
+
+class ExecutorClosed(RuntimeError):
+    """ Executor sudah `shutdown`, process pool tidak dibuat lagi """
+
+
+def _initializer(
+        private_key: Union[bytes, str, None],
+        private_key_passphrase: Optional[str],
+        public_cert: Union[bytes, str, None],
+        previous_public_certs: Sequence[Union[bytes, str]] = (),
+        backend: Union[CryptoBackend, BACKEND] = 'pycryptodome'
+    ) -> None:
+    """ Dijalankan sekali di setiap worker process """
+    global _WORKER_BACKEND, _WORKER_KEY, _WORKER_VERIFY_KEYS
+    _WORKER_BACKEND = get_backend(backend)
+    if private_key:
+        _WORKER_KEY = _WORKER_BACKEND.import_key(
+                private_key, private_key_passphrase)
+    elif public_cert:
+        _WORKER_KEY = _WORKER_BACKEND.import_key(public_cert)
+    else:
+        _WORKER_KEY = None
+    keys: List[Any] = _WORKER_KEY and [_WORKER_KEY] or []
+    keys += [_WORKER_BACKEND.import_key(cert) 
+             for cert in previous_public_certs]
+    _WORKER_VERIFY_KEYS = [_WORKER_BACKEND.public_key(k) for k in keys]
+
+
+def _ping() -> int:
+    """ Warm-up, memastikan worker sudah jalan """
+    return os.getpid()
+
+
+def _sign_SHA256withRSA(message: bytes) -> bytes:
+    assert _WORKER_BACKEND and _WORKER_KEY, 'private_key is required'
+    return base64.b64encode(
+            _WORKER_BACKEND.sign_SHA256withRSA(_WORKER_KEY, message))
+
+
+def _verify_SHA256withRSA(message: bytes, signature: bytes) -> bool:
+    """ Lihat `SNAPCrypto._verify_signature_SHA256withRSA` """
+    assert _WORKER_BACKEND and _WORKER_KEY, 'public_cert is required'
+    try:
+        signature_bytes: bytes = base64.b64decode(signature)
+    except (ValueError, TypeError):
+        return False
+    verify = _WORKER_BACKEND.verify_SHA256withRSA
+    for index, key in enumerate(_WORKER_VERIFY_KEYS):
+        if not verify(key, message, signature_bytes):
+            continue
+        if index:
+            _WORKER_VERIFY_KEYS.insert(0, _WORKER_VERIFY_KEYS.pop(index))
+        return True
+    return False
+
+
+def _verify_many_SHA256withRSA(
+        items: Sequence[Tuple[bytes, bytes, bytes]]
+    ) -> bytes:
+    """ 
+    Batch (string_to_sign, signature, string_to_sign dari header),
+    returns 1 byte per item: 1 valid, 0 invalid
+    """
+    return bytes(
+            _verify_SHA256withRSA(message, signature)
+            or bool(payload) and _verify_SHA256withRSA(payload, signature)
+            for message, signature, payload in items
+        )
+
+
+class SNAPCryptoExecutor:
+    """
+    Process pool untuk operasi RSA (SHA256withRSA) yang CPU-bound.
+
+    Operasi RSA via `asyncify` jalan di thread pool yang tetap terkunci
+    GIL, sehingga tidak scale lebih dari 1 core per worker gunicorn.
+    Di sini setiap worker process sudah memegang key RSA hasil import
+    (lihat `_initializer`), jadi yang dikirim antar process hanya
+    message dan signature.
+
+    - `max_workers`: jumlah process, default `os.cpu_count()`
+    - `max_queue`:   maksimal operasi yang antri/jalan bersamaan. Jika
+                     penuh, caller akan menunggu (backpressure).
+                     Default `max_workers * 4`
+
+    Biasanya tidak di-instantiate langsung, tapi lewat
+    `SNAPCrypto.create_executor()`:
+
+        ```python
+
+        Crypto = SNAPCrypto(public_cert=PUBLIC_CERT, ...)
+        Crypto.create_executor(max_workers=2)
+        await Crypto.create_access_token_async(request_headers=headers)
+
+        ```
+
+    Spawn process dan warm-up worker butuh waktu, jangan di event loop:
+    panggil `await start_async()` saat startup (lihat
+    `SNAPKeyRegistry.start`). Jika belum, `submit` pertama yang
+    menjalankannya, tetap di luar event loop.
+
+    Setelah `shutdown` (misal `SNAPCrypto` lama dilepas saat rotasi cert)
+    executor tertutup: `submit` raise `ExecutorClosed` dan pool tidak
+    pernah dibuat lagi, `SNAPCrypto` lalu memakai thread pool.
+    """
+    def __init__(
+            self: AppType,
+            *,
+            private_key: Union[bytes, str, None] = None,
+            private_key_passphrase: Optional[str] = None,
+            public_cert: Union[bytes, str, None] = None,
+            previous_public_certs: Sequence[Union[bytes, str]] = (),
+            backend: Union[CryptoBackend, BACKEND] = 'pycryptodome',
+            max_workers: Union[int, None] = None,
+            max_queue: Union[int, None] = None,
+            mp_context: Union[str, None] = 'spawn'
+        ) -> None:
+        self._private_key = private_key
+        self._private_key_passphrase = private_key_passphrase
+        self._public_cert = public_cert
+        self._previous_public_certs = list(previous_public_certs)
+        self._backend = backend
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._max_queue = max_queue or self._max_workers * 4
+        self._mp_context = mp_context
+        self._pool: Union[ProcessPoolExecutor, None] = None
+        self._closed = False
+        # `start` jalan di thread lain, pasang pool bersamaan dengan
+        # `shutdown`/`reload` di event loop
+        self._guard = threading.Lock()
+        self._generation = 0
+        # Semaphore dan Lock dibuat per event loop, lihat `_get_semaphore`.
+        # Weak key: hilang bersama loop-nya, tidak terpakai oleh loop baru
+        self._semaphores: weakref.WeakKeyDictionary[
+                asyncio.AbstractEventLoop, asyncio.Semaphore
+            ] = weakref.WeakKeyDictionary()
+        self._locks: weakref.WeakKeyDictionary[
+                asyncio.AbstractEventLoop, asyncio.Lock
+            ] = weakref.WeakKeyDictionary()
+        self._pending = 0
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    @property
+    def max_queue(self) -> int:
+        return self._max_queue
+
+    @property
+    def pending(self) -> int:
+        """ Jumlah operasi yang sedang antri atau jalan """
+        return self._pending
+
+    @property
+    def closed(self) -> bool:
+        """ Readonly. True setelah `shutdown` """
+        return self._closed
+
+    @property
+    def pool(self) -> Union[ProcessPoolExecutor, None]:
+        """ Readonly. None sebelum `start` atau setelah `shutdown` """
+        return self._pool
+
+    def __str__(self) -> str:
+        return f"max_workers={self._max_workers}, "\
+            f"max_queue={self._max_queue}, pending={self._pending}"
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.__str__()})"
+
+    def start(self) -> None:
+        """
+        Start process pool dan warm-up semua worker. Blocking, dari
+        event loop pakai `start_async`
+        """
+        if self._closed:
+            raise ExecutorClosed()
+        if self._pool is not None:
+            return None
+        generation = self._generation
+        context = self._mp_context \
+            and multiprocessing.get_context(self._mp_context) or None
+        pool = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=context,
+                initializer=_initializer,
+                initargs=(
+                        self._private_key,
+                        self._private_key_passphrase,
+                        self._public_cert,
+                        self._previous_public_certs,
+                        self._backend
+                    )
+            )
+        futures = [pool.submit(_ping) for _ in range(self._max_workers)]
+        for future in futures:
+            future.result()
+        with self._guard:
+            # key diganti (`reload`) atau ditutup selama warm-up, pool
+            # ini sudah basi
+            stale = self._closed or self._generation != generation \
+                or self._pool is not None
+            if not stale:
+                self._pool = pool
+        if stale:
+            pool.shutdown(wait=False)
+            if self._closed:
+                raise ExecutorClosed()
+        return None
+
+    async def start_async(self) -> None:
+        """ `start` di thread pool, satu kali walau dipanggil bersamaan """
+        if self._pool is not None:
+            return None
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            lock = self._locks[loop] = asyncio.Lock()
+        async with lock:
+            if self._pool is None:
+                await loop.run_in_executor(None, self.start)
+        return None
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Tutup executor. Operasi yang sudah masuk pool tetap diselesaikan,
+        `submit` berikutnya raise `ExecutorClosed`
+        """
+        self._closed = True
+        self._stop(wait)
+        return None
+
+    def _stop(self, wait: bool) -> None:
+        with self._guard:
+            pool, self._pool = self._pool, None
+            self._generation += 1
+        if pool is not None:
+            pool.shutdown(wait=wait)
+        return None
+
+    def reload(
+            self,
+            *,
+            private_key: Union[bytes, str, None] = None,
+            private_key_passphrase: Optional[str] = None,
+            public_cert: Union[bytes, str, None] = None,
+            previous_public_certs: Sequence[Union[bytes, str]] = (),
+            backend: Union[CryptoBackend, BACKEND, None] = None
+        ) -> None:
+        """
+        Ganti key. Pool baru dibuat oleh `start_async` atau `submit`
+        berikutnya, operasi yang sedang jalan di pool lama tetap
+        diselesaikan.
+        """
+        self._private_key = private_key
+        self._private_key_passphrase = private_key_passphrase
+        self._public_cert = public_cert
+        self._previous_public_certs = list(previous_public_certs)
+        if backend is not None:
+            self._backend = backend
+        self._stop(wait=False)
+        return None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._max_queue)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Jalankan `fn(*args)` di process pool. Raise `ExecutorClosed`
+        setelah `shutdown`
+        """
+        self._pending += 1
+        try:
+            async with self._get_semaphore():
+                pool = self._pool
+                while pool is None:
+                    if self._closed:
+                        raise ExecutorClosed()
+                    await self.start_async()
+                    pool = self._pool
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(pool, fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def sign_SHA256withRSA(self, message: bytes) -> bytes:
+        """ Returns base64 signature """
+        signature: bytes = await self.submit(_sign_SHA256withRSA, message)
+        return signature
+
+    async def verify_SHA256withRSA(
+            self,
+            message: bytes,
+            signature: bytes
+        ) -> bool:
+        valid: bool = await self.submit(
+                _verify_SHA256withRSA, 
+                message, 
+                signature
+            )
+        return valid
+
+    def verify_many_SHA256withRSA(
+            self,
+            items: Sequence[Tuple[bytes, bytes, bytes]],
+            chunksize: int = 64
+        ) -> bytes:
+        """
+        Sync, untuk verifikasi offline (lihat `SNAPCrypto.verify_many`).
+        `items` dibagi per `chunksize` ke semua worker, returns 1 byte
+        per item: 1 valid, 0 invalid.
+        """
+        chunks = [items[i:i + chunksize] 
+                  for i in range(0, len(items), chunksize)]
+        self.start()
+        assert self._pool
+        return b''.join(self._pool.map(_verify_many_SHA256withRSA, chunks))
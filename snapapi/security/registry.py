@@ -0,0 +1,380 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Security: Key Registry
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+import logging
+import sys
+_logger = logging.getLogger(__name__)
+_logger.addHandler(logging.StreamHandler(sys.stdout))
+
+from configparser import ConfigParser
+from pathlib import Path
+from typing import (
+        Union, Dict, List, Tuple, Any, Optional, Iterator, TypeVar, Literal
+    )
+
+from anyio import to_thread
+
+from snapapi import tools
+from snapapi.exceptions import AccessDenied
+from snapapi.security.crypto import SNAPCrypto
+from snapapi.security.cache import SNAPTokenCache, SNAPSignatureCache
+from snapapi.security.backend import CryptoBackend, BACKEND
+
+AppType = TypeVar("AppType", bound="SNAPKeyRegistry")
+
+# (namespace, client_id, isi section config, public cert, previous certs)
+_Source = Tuple[
+        str, str, Tuple[Tuple[str, str], ...], bytes, Tuple[bytes, ...]
+    ]
+
+
+def _read_secure(path: Path) -> bytes:
+    """ File key/cert/config wajib permission 600 """
+    if oct(path.stat().st_mode)[-3:] != '600':
+        raise SystemError(f"{path} permission harus diset 600")
+    return path.read_bytes()
+
+
+class SNAPKeyRegistry:
+    """
+    Index `SNAPCrypto` per Partner (Bank), untuk satu API yang melayani
+    banyak Partner sekaligus.
+
+    Lookup berdasarkan `X-CLIENT-KEY` (OAuth2, `lookup_oauth2`) atau
+    `X-PARTNER-ID` (Transactional, `lookup_transactional`) cukup satu
+    akses dict, key RSA, HMAC dan token engine setiap Partner sudah
+    disiapkan saat `load`.
+
+    Konfigurasi dibaca dari `snapapi.conf`, setiap section (selain
+    `[snapapi]`) yang punya `client_id` adalah satu Partner:
+
+        ```
+
+        [bank_a]
+        namespace = bank_a
+        client_id = XJAPE8888
+        client_secret = ...
+        token_passphrase = ...
+        token_engine = compact
+
+        ```
+
+    dengan Public Cert di `{namespace}.cert.pem`. Saat rotasi cert, simpan
+    cert lama sebagai `{namespace}.cert.{apapun}.pem`; Signature dari cert
+    lama tetap valid sampai file tersebut dihapus.
+
+    `load` bisa dipanggil ulang kapan saja (hot reload): semua `SNAPCrypto`
+    dibuat dulu, baru index diganti sekaligus, sehingga request yang
+    sedang berjalan tidak pernah melihat index setengah jadi. Partner yang
+    konfigurasi dan cert-nya tidak berubah memakai instance yang sama.
+
+        ```python
+
+        Registry = SNAPKeyRegistry(execution=CRYPTO_EXECUTION)
+        Registry.load(CONFIG_PATH)
+
+        Crypto = Registry.lookup_transactional(request_headers)
+
+        ```
+    """
+    def __init__(
+            self: AppType,
+            *,
+            execution: Union[Dict[Any, Any], None] = None,
+            token_cache_size: int = 1024,
+            signature_cache_ttl: float = 0,
+            timestamp_skew: float = 300,
+            crypto_workers: int = 0,
+            backend: Union[CryptoBackend, BACKEND] = 'pycryptodome'
+        ) -> None:
+        self._execution = execution
+        self._token_cache_size = token_cache_size
+        # 0 berarti tanpa SNAPSignatureCache
+        self._signature_cache_ttl = signature_cache_ttl
+        self._timestamp_skew = timestamp_skew
+        self._crypto_workers = crypto_workers
+        self._backend = backend
+        # (namespace -> SNAPCrypto, client_id -> SNAPCrypto), diganti
+        # sekaligus dalam satu assignment
+        self._index: Tuple[Dict[str, SNAPCrypto], Dict[str, SNAPCrypto]] \
+                = ({}, {})
+        self._sources: Dict[str, _Source] = {}
+        self._config_path: Union[Path, None] = None
+        self._config_file: str = 'snapapi.conf'
+        self._mtimes: Dict[str, float] = {}
+        self._watcher: Optional['asyncio.Task[None]'] = None
+
+    def __len__(self) -> int:
+        return len(self._index[0])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index[0])
+
+    def __contains__(self, client_id: object) -> bool:
+        return client_id in self._index[1]
+
+    def __getitem__(self, client_id: str) -> SNAPCrypto:
+        return self._index[1][client_id]
+
+    def __str__(self) -> str:
+        return ', '.join(f'{ns}={crypto.client_id}'
+                         for ns, crypto in self._index[0].items())
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.__str__()})"
+
+    @property
+    def namespaces(self) -> List[str]:
+        return list(self._index[0])
+
+    def get(self, client_id: str) -> Union[SNAPCrypto, None]:
+        """ `SNAPCrypto` berdasarkan client_id, None jika tidak terdaftar """
+        return self._index[1].get(client_id)
+
+    def namespace(self, namespace: str) -> Union[SNAPCrypto, None]:
+        """ `SNAPCrypto` berdasarkan namespace """
+        return self._index[0].get(namespace)
+
+    def lookup_oauth2(self, request_headers: Dict[str, str]) -> SNAPCrypto:
+        """
+        `SNAPCrypto` dari Header `X-CLIENT-KEY` request Access Token.
+        Raise `AccessDenied` jika Partner tidak dikenal.
+        """
+        return self._lookup(request_headers, 'x-client-key')
+
+    def lookup_transactional(
+            self,
+            request_headers: Dict[str, str]
+        ) -> SNAPCrypto:
+        """
+        `SNAPCrypto` dari Header `X-PARTNER-ID` request Transactional,
+        `X-CLIENT-KEY` tidak dipakai. Raise `AccessDenied` jika Partner
+        tidak dikenal.
+        """
+        return self._lookup(request_headers, 'x-partner-id')
+
+    def _lookup(self, request_headers: Dict[str, str], name: str) \
+            -> SNAPCrypto:
+        client_id = tools.parse_headers(request_headers).get(name)
+        crypto = client_id and self._index[1].get(client_id) or None
+        if crypto is None:
+            raise AccessDenied()
+        return crypto
+
+    def register(self, namespace: str, crypto: SNAPCrypto) -> SNAPCrypto:
+        """ Daftarkan `SNAPCrypto` secara manual """
+        assert crypto.client_id, 'client_id mandatory'
+        namespaces, partners = self._index
+        replaced = namespaces.get(namespace)
+        namespaces = dict(namespaces, **{namespace: crypto})
+        partners = {c.client_id: c for c in namespaces.values()}
+        self._index = (namespaces, partners)
+        self._sources.pop(namespace, None)
+        if replaced is not None and replaced is not crypto:
+            self._release(replaced)
+        return crypto
+
+    def unregister(self, namespace: str) -> None:
+        namespaces = dict(self._index[0])
+        crypto = namespaces.pop(namespace, None)
+        self._index = (
+                namespaces,
+                {c.client_id: c for c in namespaces.values()}
+            )
+        self._sources.pop(namespace, None)
+        if crypto is not None:
+            self._release(crypto)
+        return None
+
+    def load(
+            self: AppType,
+            config_path: Union[Path, str],
+            config_file: str = 'snapapi.conf'
+        ) -> AppType:
+        """
+        Load (atau reload) semua Partner dari `config_path / config_file`.
+        Jika ada yang gagal (cert tidak ada, permission salah, dsb),
+        raise dan index lama tetap dipakai.
+        """
+        config_path = Path(config_path)
+        sources = self._read_sources(config_path, config_file)
+        old_namespaces = self._index[0]
+        namespaces: Dict[str, SNAPCrypto] = {}
+        for namespace, source in sources.items():
+            crypto = old_namespaces.get(namespace)
+            if crypto is None or self._sources.get(namespace) != source:
+                crypto = self._build(source, crypto)
+            namespaces[namespace] = crypto
+        partners = {c.client_id: c for c in namespaces.values()}
+        assert len(partners) == len(namespaces), 'client_id harus unik'
+        # swap index sekaligus
+        self._index = (namespaces, partners)
+        self._sources = sources
+        self._config_path = config_path
+        self._config_file = config_file
+        self._mtimes = self._stat()
+        for namespace, crypto in old_namespaces.items():
+            if namespaces.get(namespace) is not crypto:
+                self._release(crypto)
+        return self
+
+    def reload(self) -> bool:
+        """ Reload jika config atau cert berubah, returns True jika reload """
+        if self._config_path is None or self._stat() == self._mtimes:
+            return False
+        self.load(self._config_path, self._config_file)
+        _logger.info(f"SNAPKeyRegistry reloaded: {self}")
+        return True
+
+    async def watch(self, interval: float = 5.0) -> None:
+        """
+        Cek perubahan config dan cert setiap `interval` detik. `reload`
+        (baca file, import key RSA) jalan di thread pool agar event loop
+        tidak terhenti. Jalankan sebagai task saat startup:
+
+            ```python
+
+            @app.on_event('startup')
+            async def startup() -> None:
+                Registry.start(interval=5)
+                await Registry.warm_up()
+
+            ```
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if await to_thread.run_sync(self.reload):
+                    await self.warm_up()
+            except Exception as exc:
+                # config/cert baru salah, tetap pakai yang lama
+                _logger.error(f"SNAPKeyRegistry reload gagal: {exc}")
+
+    async def warm_up(self) -> None:
+        """
+        `start_executors` dan `SNAPCrypto.calibrate_async` semua Partner,
+        panggil saat startup. Kalibrasi satu per satu agar pengukuran
+        tidak saling mengganggu
+        """
+        await self.start_executors()
+        for crypto in list(self._index[0].values()):
+            await crypto.calibrate_async()
+        return None
+
+    async def start_executors(self) -> None:
+        """
+        Start process pool (`crypto_workers`) semua Partner di luar event
+        loop, panggil saat startup agar request pertama tidak menunggu
+        """
+        await asyncio.gather(*(
+                crypto.executor.start_async()
+                for crypto in self._index[0].values()
+                if crypto.executor is not None
+            ))
+        return None
+
+    def start(self, interval: float = 5.0) -> 'asyncio.Task[None]':
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.ensure_future(self.watch(interval))
+        return self._watcher
+
+    def shutdown(self) -> None:
+        """ Stop watcher dan executor semua Partner """
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+        for crypto in self._index[0].values():
+            self._release(crypto)
+        return None
+
+    def _release(self, crypto: SNAPCrypto) -> None:
+        if crypto.executor is not None:
+            # request yang sudah di pool dibiarkan selesai, yang masih
+            # antri pindah ke thread pool (lihat `ExecutorClosed`)
+            crypto.executor.shutdown(wait=False)
+        return None
+
+    def _build(
+            self,
+            source: _Source,
+            previous: Union[SNAPCrypto, None]
+        ) -> SNAPCrypto:
+        _, _, items, public_cert, previous_public_certs = source
+        section = dict(items)
+        token_engine: Literal['jwt', 'compact'] = \
+            section.get('token_engine') == 'compact' and 'compact' or 'jwt'
+        # Access Token yang sudah diverifikasi tetap valid jika
+        # hanya cert yang dirotasi
+        token_cache: Union[SNAPTokenCache, None] = None
+        if previous is not None \
+                and previous.token_passphrase \
+                    == section['token_passphrase'].encode() \
+                and previous.token_engine.name == token_engine:
+            token_cache = previous.token_cache
+        if token_cache is None:
+            token_cache = SNAPTokenCache(maxsize=self._token_cache_size)
+        crypto = SNAPCrypto(
+                client_id=section['client_id'],
+                client_secret=section['client_secret'],
+                public_cert=public_cert,
+                previous_public_certs=previous_public_certs,
+                token_passphrase=section['token_passphrase'],
+                execution=self._execution,
+                token_cache=token_cache,
+                signature_cache=self._signature_cache_ttl and \
+                    SNAPSignatureCache(
+                        maxsize=self._token_cache_size,
+                        ttl=self._signature_cache_ttl,
+                        skew=self._timestamp_skew
+                    ) or None,
+                token_engine=token_engine,
+                backend=self._backend
+            )
+        if self._crypto_workers:
+            crypto.create_executor(max_workers=self._crypto_workers)
+        return crypto
+
+    def _read_sources(
+            self,
+            config_path: Path,
+            config_file: str
+        ) -> Dict[str, _Source]:
+        config = ConfigParser()
+        config.read_string(_read_secure(config_path / config_file).decode())
+        sources: Dict[str, _Source] = {}
+        for name in config.sections():
+            section = config[name]
+            if name == 'snapapi' or not section.get('client_id'):
+                continue
+            namespace = section.get('namespace', name)
+            public_cert = _read_secure(config_path / f'{namespace}.cert.pem')
+            # cert lama, terbaru dulu
+            previous = sorted(
+                    config_path.glob(f'{namespace}.cert.*.pem'),
+                    key=lambda path: path.stat().st_mtime,
+                    reverse=True
+                )
+            sources[namespace] = (
+                    namespace,
+                    section['client_id'],
+                    tuple(sorted(section.items())),
+                    public_cert,
+                    tuple(_read_secure(path) for path in previous)
+                )
+        return sources
+
+    def _stat(self) -> Dict[str, float]:
+        """ mtime config dan semua cert """
+        if self._config_path is None:
+            return {}
+        paths = [self._config_path / self._config_file]
+        paths += self._config_path.glob('*.cert*.pem')
+        mtimes: Dict[str, float] = {}
+        for path in paths:
+            try:
+                mtimes[str(path)] = path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+        return mtimes
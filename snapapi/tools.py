@@ -2,8 +2,35 @@
 # SNAP-API: Tools
 # Author: S Deta Harvianto <sdetta@gmail.com>
 
-from typing import Dict
-from datetime import datetime, timedelta
+import re
+import time
+import hashlib
+import json
+try:
+    import orjson
+    has_orjson = True
+except ModuleNotFoundError:
+    has_orjson = False
+
+from typing import Any, Dict, List, Union, Pattern, Callable, Tuple
+from datetime import datetime, timedelta, timezone, tzinfo
+
+# JSON minify: whitespace di luar string dibuang, selain itu byte apa adanya
+_JSON_OUTSIDE = re.compile(rb'[^"\x20\t\n\r]*')
+_JSON_WHITESPACE = re.compile(rb'[\x20\t\n\r]*')
+_JSON_STRING = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+# body utuh (bukan streaming): token string utuh atau selain whitespace,
+# whitespace di antaranya otomatis terlewati oleh `findall`
+_JSON_TOKEN = re.compile(
+        rb'"[^"\\]*(?:\\.[^"\\]*)*(?:"|\\?\Z)|[^"\x20\t\n\r]+', re.DOTALL)
+_JSON_HAS_WHITESPACE = re.compile(rb'[\x20\t\n\r]')
+# integer 19 digit atau lebih, bisa melebihi 64 bit: orjson mengubahnya
+# jadi float. Cek cepat dulu (semua digit jadi '0', cari 19 digit berurut)
+# karena regex per posisi lebih lambat dari parse-nya sendiri
+_DIGITS_TO_ZERO = bytes.maketrans(b'123456789', b'000000000')
+_JSON_DIGITS_19 = b'0' * 19
+_JSON_BIG_INTEGER = re.compile(
+        rb'(?:\A|[:,\[])[\x20\t\n\r]*-?\d{19,}(?![\d.eE])')
 
 def parse_headers(headers: Dict[str, str]) -> Dict[str, str]:
     """ pydantic convert 'x-signature' jadi 'x_signature' """
@@ -13,6 +40,11 @@ def parse_headers(headers: Dict[str, str]) -> Dict[str, str]:
         }
 
 
+def fingerprint(der: bytes) -> str:
+    """ Fingerprint key/cert, hex SHA-256 dari DER """
+    return hashlib.sha256(der).hexdigest()
+
+
 def datetime_string(value: str) -> str:
     try:
         datetime.fromisoformat(value)
@@ -23,15 +55,158 @@ def datetime_string(value: str) -> str:
     return value
 
 
+# SNAP: waktu Indonesia Barat (Asia/Jakarta), tanpa DST
+WIB = timezone(timedelta(hours=7), 'WIB')
+
+
+class DayPartition:
+    """
+    Hari ini di timezone `tz` (default WIB): label 'YYYYMMDD' dan detik
+    yang tersisa hingga tengah malam. Batas tengah malam dihitung sekali
+    per hari, bukan per request, dan tidak tergantung timezone server.
+    """
+    def __init__(
+            self,
+            tz: tzinfo = WIB,
+            clock: Callable[[], float] = time.time
+        ) -> None:
+        self._tz = tz
+        self._clock = clock
+        self._label = ''
+        self._start = 0.0
+        self._end = 0.0
+
+    @property
+    def tz(self) -> tzinfo:
+        return self._tz
+
+    def _roll(self, now: float) -> None:
+        start = datetime.fromtimestamp(now, self._tz).replace(
+                    hour=0, minute=0, second=0, microsecond=0)
+        self._label = start.strftime('%Y%m%d')
+        self._start = start.timestamp()
+        self._end = (start + timedelta(days=1)).timestamp()
+        return None
+
+    def current(self) -> Tuple[str, float]:
+        """ Label hari ini dan detik tersisa hingga tengah malam """
+        now = self._clock()
+        if not self._start <= now < self._end:
+            self._roll(now)
+        return self._label, self._end - now
+
+    def label(self, days: int = 0) -> str:
+        """ Label hari ini, `days` = -1 untuk kemarin """
+        label, _ = self.current()
+        if not days:
+            return label
+        day = datetime.strptime(label, '%Y%m%d') + timedelta(days=days)
+        return day.strftime('%Y%m%d')
+
+    def seconds_left(self) -> int:
+        return int(self.current()[1])
+
+
+_TODAY = DayPartition()
+
+
 async def count_second_left()->int:
     """ 
-    Hitung detik yang tersisa hari ini, sesuai dengan timezone local
+    Hitung detik yang tersisa hari ini, sesuai dengan timezone WIB
+    """
+    return _TODAY.seconds_left()
+
+
+def _match_end(pattern: Pattern[bytes], chunk: bytes, position: int) -> int:
+    """ Semua pattern JSON di atas pasti match (minimal string kosong) """
+    match = pattern.match(chunk, position)
+    return match and match.end() or position
+
+
+class JSONMinifier:
+    """ 
+    Minify JSON bytes dalam satu pass, bisa diumpan per chunk (streaming).
+
+    Berbeda dengan `json.dumps(json.loads(body))`, isi string, escape 
+    non-ASCII dan format angka tetap sama persis dengan yang dikirim 
+    oleh requestor; yang dibuang hanya whitespace di luar string.
+    
+        ```python
+
+        minifier = JSONMinifier()
+        for chunk in chunks:
+            hashed.update(minifier.feed(chunk))
+
+        ```
+    """
+    __slots__ = ('_in_string', '_escape')
+
+    def __init__(self) -> None:
+        self._in_string: bool = False
+        self._escape: bool = False
+
+    def feed(self, chunk: Union[bytes, bytearray, memoryview]) -> bytes:
+        chunk = bytes(chunk)
+        length: int = len(chunk)
+        output: List[bytes] = []
+        position: int = 0
+        # chunk sebelumnya berakhir dengan backslash di dalam string
+        if self._escape and length:
+            output.append(chunk[:1])
+            position = 1
+            self._escape = False
+        while position < length:
+            if self._in_string:
+                end: int = _match_end(_JSON_STRING, chunk, position)
+                output.append(chunk[position:end])
+                position = end
+                if position >= length:
+                    break
+                if chunk[position] == 0x5c: # backslash di akhir chunk
+                    self._escape = True
+                else:
+                    self._in_string = False
+                output.append(chunk[position:position + 1])
+                position += 1
+            else:
+                end = _match_end(_JSON_OUTSIDE, chunk, position)
+                output.append(chunk[position:end])
+                position = end
+                if position >= length:
+                    break
+                if chunk[position] == 0x22: # '"'
+                    self._in_string = True
+                    output.append(b'"')
+                    position += 1
+                else:
+                    position = _match_end(_JSON_WHITESPACE, chunk, position)
+        return b''.join(output)
+
+
+def minify_json(body: Union[bytes, bytearray, memoryview]) -> bytes:
+    """ 
+    Minify raw JSON body, hasilnya sama dengan `JSONMinifier`, tapi 
+    dalam satu `re.findall`. Body yang sudah minify dikembalikan apa adanya.
+    """
+    body = bytes(body)
+    if not _JSON_HAS_WHITESPACE.search(body):
+        return body
+    return b''.join(_JSON_TOKEN.findall(body))
+
+
+def loads_json(body: Union[bytes, bytearray, memoryview]) -> Any:
+    """
+    Parse JSON body dengan orjson jika terinstall, selain itu `json.loads`.
+    Yang ditolak orjson tapi valid untuk `json.loads` (NaN, Infinity,
+    surrogate) dan integer lebih dari 64 bit diparse `json.loads`, sehingga
+    hasilnya selalu sama. Body invalid: `json.JSONDecodeError`
     """
-    now: datetime = datetime.now()
-    midnight: datetime = (now + timedelta(days=1)).replace(
-                                hour=0, 
-                                minute=0, 
-                                second=0, 
-                                microsecond=0
-                            )
-    return (midnight - now).seconds
\ No newline at end of file
+    body = bytes(body)
+    if has_orjson and not (
+            _JSON_DIGITS_19 in body.translate(_DIGITS_TO_ZERO)
+            and _JSON_BIG_INTEGER.search(body)):
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(body)
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Benchmark: Request Body
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+"""
+CPU per request VA Inquiry (header, body `InquiryRequest`, verifikasi
+Transactional Signature HMAC-SHA512, response `InquiryResponseData`):
+
+- before:   body diparse FastAPI dengan `json.loads` (Starlette),
+            `SNAPRoute.parse_body` dimatikan
+- stdlib:   `SNAPRoute.parse_body`, tanpa orjson
+- orjson:   `SNAPRoute.parse_body` dengan orjson
+
+Request dipanggil langsung ke ASGI app (tanpa server, tanpa HTTP client)
+satu per satu, yang diukur `time.process_time`. Response ketiganya dicek
+sama. `--items` menambah `additionalInfo` agar body lebih besar.
+
+Parse body hanya sebagian kecil CPU per request, selisih end-to-end bisa
+tertutup noise mesin; kolom `json.loads` dan `loads_json` mengukur parse
+saja, selisihnya CPU yang dihemat per request.
+
+    snapapi/tests$ python bench_body.py -n 5000 --items 0 --items 50
+
+"""
+
+import argparse
+import asyncio
+import json
+import secrets
+import sys
+import time
+sys.path.insert(1, '..')
+
+from datetime import datetime, timezone
+from timeit import repeat
+from typing import Any, Dict, List, Tuple
+from typing_extensions import Annotated
+
+from fastapi import APIRouter, Body, Header, Request
+from starlette.requests import Request as StarletteRequest
+from starlette.types import Message
+
+from snapapi import SNAPAPI, SNAPRoute, SNAPCrypto, tools
+from snapapi.model.virtual_account.inquiry import (
+        InquiryAmount,
+        InquiryHeader,
+        InquiryRequest,
+        InquiryResponseBill,
+        InquiryResponseData
+    )
+
+CLIENT_ID = 'BENCHMARK'
+PATH = '/snap/v1.0/transfer-va/inquiry'
+ACCESS_TOKEN = secrets.token_urlsafe(32)
+MODES = ('before', 'stdlib', 'orjson')
+
+
+class BeforeRoute(SNAPRoute):
+    """ Sebelum single-parse: FastAPI yang parse body """
+    @staticmethod
+    async def parse_body(request: StarletteRequest) -> None:
+        return None
+
+
+def build_app(mode: str, crypto: SNAPCrypto) -> SNAPAPI:
+    router = APIRouter(
+            route_class=BeforeRoute if mode == 'before' else SNAPRoute)
+
+    @router.post(PATH,
+            response_model=InquiryResponseData,
+            response_model_exclude_none=True)
+    async def inquiry(
+            headers: Annotated[InquiryHeader, Header()],
+            body: Annotated[InquiryRequest, Body()],
+            request: Request
+        ) -> InquiryResponseData:
+        request_headers: dict = headers.model_dump()
+        await crypto.verify_signature_transactional_async(
+                path=PATH,
+                http_method='POST',
+                access_token=ACCESS_TOKEN,
+                request_headers=request_headers,
+                request_body=await request.body()
+            )
+        return InquiryResponseData(
+                virtualAccountData=InquiryResponseBill(
+                    partnerServiceId=body.partnerServiceId,
+                    customerNo=body.customerNo,
+                    virtualAccountNo=body.virtualAccountNo,
+                    virtualAccountName='Matt Murdock',
+                    inquiryRequestId=body.inquiryRequestId,
+                    totalAmount=InquiryAmount(
+                        value='103500.00', currency='IDR')
+                ))
+
+    app = SNAPAPI()
+    app.include_router(router)
+    return app
+
+
+def build_request(crypto: SNAPCrypto, items: int) \
+        -> Tuple[List[Tuple[bytes, bytes]], bytes]:
+    """ Raw headers ASGI dan body JSON (format bebas, seperti dari Bank) """
+    account = '1234506000009587'
+    body: Dict[str, Any] = dict(
+            partnerServiceId=account[:5].rjust(8),
+            customerNo=account[5:],
+            virtualAccountNo=account.rjust(28),
+            inquiryRequestId=secrets.token_hex(16),
+            trxDateInit='2025-01-03T14:06:47+07:00',
+            channelCode=6011,
+            additionalInfo={
+                f'info{i}': f'Keterangan tambahan ke-{i}, Café'
+                for i in range(items)
+            }
+        )
+    raw = json.dumps(body, indent=2).encode()
+    timestamp = datetime.now(timezone.utc).astimezone()\
+                .isoformat(timespec='milliseconds')
+    signature = crypto.create_signature_transactional(
+            path=PATH,
+            http_method='POST',
+            timestamp=timestamp,
+            request_body=raw,
+            access_token=ACCESS_TOKEN
+        )
+    headers = {
+            'content-type': 'application/json',
+            'content-length': str(len(raw)),
+            'x-timestamp': timestamp,
+            'x-signature': signature,
+            'x-partner-id': CLIENT_ID,
+            'x-external-id': secrets.token_hex(16),
+            'channel-id': '95231'
+        }
+    return [(k.encode(), v.encode()) for k, v in headers.items()], raw
+
+
+async def call(app: SNAPAPI, headers: List[Tuple[bytes, bytes]],
+               raw: bytes) -> Tuple[int, bytes]:
+    scope = {
+            'type': 'http', 'asgi': {'version': '3.0'},
+            'http_version': '1.1', 'method': 'POST', 'scheme': 'http',
+            'path': PATH, 'raw_path': PATH.encode(), 'query_string': b'',
+            'root_path': '', 'headers': headers,
+            'client': ('127.0.0.1', 50000), 'server': ('bench', 80)
+        }
+    sent: List[Message] = []
+
+    async def receive() -> Message:
+        return {'type': 'http.request', 'body': raw, 'more_body': False}
+
+    async def send(message: Message) -> None:
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent[0]['status'], b''.join(
+            message.get('body', b'') for message in sent[1:])
+
+
+async def measure(apps: Dict[str, SNAPAPI],
+                  headers: List[Tuple[bytes, bytes]], raw: bytes,
+                  number: int, repeat: int) -> List[float]:
+    """
+    Mikrodetik CPU per request per mode, terbaik dari `repeat`. Mode
+    bergantian per putaran agar noise mesin terbagi rata
+    """
+    has_orjson = tools.has_orjson
+    timings: Dict[str, List[float]] = {mode: [] for mode in apps}
+    for _ in range(repeat):
+        for mode, app in apps.items():
+            tools.has_orjson = has_orjson and mode == 'orjson'
+            start = time.process_time()
+            for _ in range(number):
+                await call(app, headers, raw)
+            timings[mode].append(
+                    (time.process_time() - start) / number * 1e6)
+    tools.has_orjson = has_orjson
+    return [min(timings[mode]) for mode in apps]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--number', type=int, default=2000)
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    parser.add_argument('--items', type=int, action='append',
+                        help='jumlah additionalInfo, default 0 dan 50')
+    args = parser.parse_args()
+
+    crypto = SNAPCrypto(
+            client_id=CLIENT_ID,
+            client_secret=secrets.token_urlsafe(32)
+        )
+    apps = {mode: build_app(mode, crypto) for mode in MODES}
+    has_orjson = tools.has_orjson
+    print(f'{args.number} request, terbaik dari {args.repeat}, mikrodetik '
+          f'CPU per request{"" if has_orjson else " (orjson tidak ada)"}\n')
+    print(f'{"body":>8}{"before":>10}{"stdlib":>10}{"orjson":>10}'
+          f'{"json.loads":>12}{"loads_json":>12}{"hemat":>10}')
+    for items in args.items or [0, 50]:
+        headers, raw = build_request(crypto, items)
+        responses = set()
+        for mode in MODES:
+            tools.has_orjson = has_orjson and mode == 'orjson'
+            status, response = asyncio.run(call(apps[mode], headers, raw))
+            assert status == 200, response
+            responses.add(response)
+        tools.has_orjson = has_orjson
+        assert len(responses) == 1, responses
+        timings = asyncio.run(measure(
+                apps, headers, raw, args.number, args.repeat))
+        for parse in (json.loads, tools.loads_json):
+            timings.append(min(repeat(
+                    lambda: parse(raw),
+                    number=args.number,
+                    repeat=args.repeat)) / args.number * 1e6)
+        print(f'{len(raw):>7}B{timings[0]:>10.1f}{timings[1]:>10.1f}'
+              f'{timings[2]:>10.1f}{timings[3]:>12.1f}{timings[4]:>12.1f}'
+              f'{timings[3] - timings[4]:>8.1f}us')
+    return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Benchmark: Crypto Backend
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+"""
+Ops/detik operasi crypto SNAP untuk memilih backend tercepat:
+
+- SHA256withRSA sign/verify, 2048 dan 4096 bit, per backend yang
+  terinstall (`pycryptodome`, `cryptography`)
+- HMAC-SHA512 sign/verify (Transactional Signature)
+- Access Token encode/decode, engine 'jwt' dan 'compact'
+
+    snapapi/tests$ python bench_crypto.py -d 1.0
+    snapapi/tests$ python bench_crypto.py --bits 2048
+
+"""
+
+import argparse
+import sys
+import time
+sys.path.insert(1, '..')
+
+from typing import Callable, List, Tuple
+
+from Crypto.PublicKey import RSA
+
+from snapapi import SNAPCrypto
+from snapapi.security.backend import available_backends
+
+# string_to_sign OAuth2 dan Transactional pada umumnya
+MESSAGE_OAUTH2 = b'XJAPE8888|2025-01-03T14:06:47.798+07:00'
+MESSAGE_TRANSACTIONAL = b'POST:/snap/v1.0/transfer-va/inquiry:' \
+                        + b'x' * 180 + b':' + b'0' * 64 \
+                        + b':2025-01-03T14:06:47.798+07:00'
+
+
+def ops_per_second(fn: Callable[[], object], duration: float) -> float:
+    """ Jalankan `fn` selama kurang lebih `duration` detik """
+    fn()
+    count = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < duration:
+        for _ in range(8):
+            fn()
+        count += 8
+        elapsed = time.perf_counter() - start
+    return count / elapsed
+
+
+def bench_rsa(bits: int, duration: float) -> List[Tuple[str, float]]:
+    key = RSA.generate(bits)
+    private_key = key.export_key()
+    public_cert = key.publickey().export_key()
+    results: List[Tuple[str, float]] = []
+    for name in available_backends():
+        signer = SNAPCrypto(private_key=private_key, backend=name)
+        verifier = SNAPCrypto(public_cert=public_cert, backend=name)
+        signature = signer._create_signature_SHA256withRSA(MESSAGE_OAUTH2)
+        results.append((f'RSA-{bits} sign   [{name}]', ops_per_second(
+                lambda: signer._create_signature_SHA256withRSA(
+                    MESSAGE_OAUTH2),
+                duration)))
+        results.append((f'RSA-{bits} verify [{name}]', ops_per_second(
+                lambda: verifier._verify_signature_SHA256withRSA(
+                    MESSAGE_OAUTH2, signature),
+                duration)))
+    return results
+
+
+def bench_hmac(duration: float) -> List[Tuple[str, float]]:
+    crypto = SNAPCrypto(client_secret=b'secretsecretsecretsecret')
+    signature = crypto._create_signature_HMAC_SHA512(MESSAGE_TRANSACTIONAL)
+    return [
+            ('HMAC-SHA512 sign', ops_per_second(
+                lambda: crypto._create_signature_HMAC_SHA512(
+                    MESSAGE_TRANSACTIONAL),
+                duration)),
+            ('HMAC-SHA512 verify', ops_per_second(
+                lambda: crypto._verify_signature_HMAC_SHA512(
+                    MESSAGE_TRANSACTIONAL, signature),
+                duration)),
+        ]
+
+
+def bench_token(duration: float) -> List[Tuple[str, float]]:
+    results: List[Tuple[str, float]] = []
+    for engine in ('jwt', 'compact'):
+        crypto = SNAPCrypto(token_passphrase=b'passphrasepassphrase',
+                            token_engine=engine)
+        iat = int(time.time())
+        token = crypto.token_engine.encode(iat=iat, exp=iat + 900)
+        results.append((f'Token encode [{engine}]', ops_per_second(
+                lambda: crypto.token_engine.encode(iat=iat, exp=iat + 900),
+                duration)))
+        results.append((f'Token decode [{engine}]', ops_per_second(
+                lambda: crypto.token_engine.decode(token),
+                duration)))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--duration", type=float, default=1.0,
+            help="Detik per operasi")
+    parser.add_argument("--bits", type=int, nargs='+', default=[2048, 4096],
+            help="Ukuran key RSA")
+    args = parser.parse_args()
+
+    print(f"backend: {', '.join(available_backends())}")
+    results: List[Tuple[str, float]] = []
+    for bits in args.bits:
+        results += bench_rsa(bits, args.duration)
+    results += bench_hmac(args.duration)
+    results += bench_token(args.duration)
+    for name, ops in results:
+        print(f"{name:<34}: {ops:>12,.0f} ops/s {1e6 / ops:>10.2f} us/op")
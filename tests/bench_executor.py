@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Benchmark: Crypto Executor
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+"""
+Bandingkan verifikasi SHA256withRSA di endpoint
+`/snap/v1.0/access-token/b2b` dengan 3 mode:
+
+- inline:   `Crypto.create_access_token` langsung di event loop
+- thread:   `asyncify(Crypto.create_access_token)`, thread pool
+- process:  `Crypto.create_access_token_async` dengan `SNAPCryptoExecutor`
+
+Request dikirim bersamaan (concurrent) via ASGI transport, tanpa server
+dan tanpa file konfigurasi.
+
+    snapapi/tests$ python bench_executor.py -n 2000 -c 64 -w 4
+
+"""
+
+import argparse
+import asyncio
+import secrets
+import sys
+sys.path.insert(1, '..')
+
+from datetime import datetime, timezone
+from timeit import default_timer as timer
+from typing_extensions import Annotated
+
+import httpx
+from asyncer import asyncify
+from Crypto.PublicKey import RSA
+from fastapi import APIRouter, Header
+
+from snapapi import SNAPAPI, SNAPRoute, SNAPCrypto
+from snapapi.model.oauth2 import (
+        Oauth2Request,
+        Oauth2Response,
+        Oauth2HeaderRequest
+    )
+
+CLIENT_ID = 'BENCHMARK'
+MODES = ('inline', 'thread', 'process')
+
+
+def build_app(mode: str, crypto: SNAPCrypto) -> SNAPAPI:
+    router = APIRouter(route_class=SNAPRoute)
+
+    @router.post('/snap/v1.0/access-token/b2b',
+            response_model=Oauth2Response)
+    async def access_token_b2b(
+            headers: Annotated[Oauth2HeaderRequest, Header()],
+            body: Oauth2Request
+        ) -> Oauth2Response:
+        request_headers = dict(headers)
+        if mode == 'inline':
+            access_token = crypto.create_access_token(
+                    request_headers=request_headers)
+        elif mode == 'thread':
+            access_token = await asyncify(crypto.create_access_token)(
+                    request_headers=request_headers)
+        else:
+            access_token = await crypto.create_access_token_async(
+                    request_headers=request_headers)
+        return Oauth2Response(accessToken=access_token)
+
+    app = SNAPAPI()
+    app.include_router(router)
+    return app
+
+
+async def run(
+        app: SNAPAPI,
+        signer: SNAPCrypto,
+        requests: int,
+        concurrency: int
+    ) -> float:
+    """ Returns request per second """
+    timestamp = datetime.now(timezone.utc).astimezone()\
+                .isoformat(timespec='milliseconds')
+    signature = signer.create_signature_oauth2(
+            f'{CLIENT_ID}|{timestamp}'.encode())
+    request_headers = {
+            'X-CLIENT-KEY': CLIENT_ID,
+            'X-TIMESTAMP': timestamp,
+            'X-SIGNATURE': signature
+        }
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport,
+            base_url='http://bench') as client:
+        async def one() -> None:
+            async with semaphore:
+                response = await client.post(
+                        '/snap/v1.0/access-token/b2b',
+                        headers=request_headers,
+                        json={'grantType': 'client_credentials'}
+                    )
+                assert response.status_code == 200, response.text
+        # warm-up
+        await asyncio.gather(*[one() for _ in range(concurrency)])
+        start = timer()
+        await asyncio.gather(*[one() for _ in range(requests)])
+        return requests / (timer() - start)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--requests", type=int, default=1000,
+            help="Jumlah request per mode")
+    parser.add_argument("-c", "--concurrency", type=int, default=32,
+            help="Jumlah request bersamaan")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+            help="Jumlah process executor, default cpu_count")
+    parser.add_argument("-b", "--bits", type=int, default=2048,
+            help="RSA key size")
+    parser.add_argument("-m", "--mode", action='append', choices=MODES,
+            help="Mode yang dites, default semua")
+    args = parser.parse_args()
+
+    key = RSA.generate(args.bits)
+    signer = SNAPCrypto(private_key=key.exportKey())
+    for mode in args.mode or MODES:
+        crypto = SNAPCrypto(
+                client_id=CLIENT_ID,
+                client_secret=secrets.token_urlsafe(32),
+                public_cert=key.publickey().exportKey(),
+                token_passphrase=secrets.token_urlsafe(32)
+            )
+        if mode == 'process':
+            crypto.create_executor(max_workers=args.workers)
+        rps = asyncio.run(run(
+                build_app(mode, crypto),
+                signer,
+                args.requests,
+                args.concurrency
+            ))
+        print(f"{mode:<8}: {rps:>9.1f} req/s")
+        if crypto.executor:
+            crypto.executor.shutdown()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Benchmark: HMAC-SHA512
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+"""
+Bandingkan Transactional Signature HMAC-SHA512:
+
+- before:   `hmac.digest(client_secret, ...)` setiap request, verifikasi
+            dengan base64 encode/decode ulang signature yang valid
+- after:    `SNAPCrypto`, state inner/outer pad sudah di-precompute,
+            verifikasi membandingkan raw digest
+
+    snapapi/tests$ python bench_hmac.py -n 200000 -r 10000
+
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import secrets
+import sys
+sys.path.insert(1, '..')
+
+from timeit import repeat
+from typing import Callable
+
+from snapapi import SNAPCrypto
+
+CLIENT_SECRET = secrets.token_urlsafe(32).encode()
+# string_to_sign VA Inquiry pada umumnya
+MESSAGE = b'POST:/snap/v1.0/transfer-va/inquiry:' + b'x' * 180 + b':' \
+          + hashlib.sha256(b'{}').hexdigest().encode() \
+          + b':2025-01-03T14:06:47.798+07:00'
+
+
+def sign_before(message: bytes) -> bytes:
+    return base64.b64encode(
+            hmac.digest(CLIENT_SECRET, message, hashlib.sha512))
+
+
+def verify_before(message: bytes, signature: bytes) -> None:
+    valid_signature_digest = base64.b64decode(sign_before(message))
+    assert hmac.compare_digest(
+            valid_signature_digest,
+            base64.b64decode(signature)
+        )
+
+
+def per_call(fn: Callable[[], object], number: int) -> float:
+    """ Returns detik per call, best of 5 """
+    return min(repeat(fn, number=number, repeat=5)) / number
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=100000,
+            help="Jumlah call per putaran")
+    parser.add_argument("-r", "--rate", type=int, default=10000,
+            help="Target signature per detik untuk estimasi CPU")
+    args = parser.parse_args()
+
+    crypto = SNAPCrypto(client_secret=CLIENT_SECRET)
+    signature = sign_before(MESSAGE)
+    assert crypto._create_signature_HMAC_SHA512(MESSAGE) == signature
+
+    results = (
+            ('sign',
+                lambda: sign_before(MESSAGE),
+                lambda: crypto._create_signature_HMAC_SHA512(MESSAGE)),
+            ('verify',
+                lambda: verify_before(MESSAGE, signature),
+                lambda: crypto._verify_signature_HMAC_SHA512(
+                    MESSAGE, signature)),
+        )
+    for name, before, after in results:
+        t_before = per_call(before, args.number)
+        t_after = per_call(after, args.number)
+        saved = (t_before - t_after) * args.rate
+        print(f"{name:<7}: before {t_before * 1e6:6.2f} us, "
+              f"after {t_after * 1e6:6.2f} us, "
+              f"x{t_before / t_after:4.2f}; "
+              f"@{args.rate}/s hemat {saved * 1e3:6.2f} ms CPU per detik")
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Benchmark: Compact Cache Key
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+"""
+Memory per X-External-Id:
+
+- before:   `namespace + X-External-Id` (UUID 36 karakter)
+- after:    `KeyEncoder`, prefix 4 + digest 16 karakter
+
+Diukur di `MemoryBackend` (tracemalloc), diestimasi untuk redis (dict
+entry, expires, sds jemalloc) dan memcached (item header, slab class),
+dan diukur langsung jika `--redis` (INFO memory) atau `--memcached`
+(stats bytes) diisi. Key yang dibuat dihapus lagi setelah diukur.
+
+    snapapi/tests$ python bench_keys.py -n 200000 --namespace bank_va_inbound
+    snapapi/tests$ python bench_keys.py --redis localhost:6379 --db 15
+
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+import uuid
+sys.path.insert(1, '..')
+
+from typing import Callable, List
+
+from snapapi.cache import (
+        KeyEncoder, MemcachedBackend, MemoryBackend, RedisBackend
+    )
+from snapapi.cache.redis import encode_command, read_reply
+
+# jemalloc size class sampai 256 byte
+JEMALLOC = [8, 16, 32, 48, 64, 80, 96, 112, 128, 160, 192, 224, 256]
+
+
+def jemalloc(size: int) -> int:
+    return next(size_class for size_class in JEMALLOC if size_class >= size)
+
+
+def redis_estimate(key: bytes) -> int:
+    """
+    Redis 7, key dengan TTL dan value "1" (shared integer): dict entry
+    dan expires entry 24 byte, sds key (header 3 + null 1), bucket 2x8
+    """
+    return 24 + 24 + jemalloc(len(key) + 4) + 16
+
+
+def memcached_estimate(key: bytes) -> int:
+    """ Item header 48 + CAS 8 + key + 1 + value "1\\r\\n", slab 1.25 """
+    size = 48 + 8 + len(key) + 1 + 3
+    chunk = 96
+    while chunk < size:
+        chunk = (int(chunk * 1.25) + 7) // 8 * 8
+    return chunk
+
+
+def memory_backend(encode: Callable[[str], str], ids: List[str]) -> float:
+    """ Byte per key di MemoryBackend (string key, dict, timing wheel) """
+    async def fill() -> float:
+        cache = MemoryBackend()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for external_id in ids:
+            await cache.add(encode(external_id), b'1', 3600)
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return (after - before) / len(ids)
+    return asyncio.run(fill())
+
+
+async def redis_memory(host: str, port: int, db: int,
+                       keys: List[str]) -> float:
+    cache = RedisBackend(host, port, db=db)
+
+    async def used() -> int:
+        info = await cache._request(encode_command('INFO', 'memory'),
+                                    read_reply)
+        assert isinstance(info, bytes)
+        for line in info.splitlines():
+            if line.startswith(b'used_memory:'):
+                return int(line.split(b':')[1])
+        raise ValueError('used_memory tidak ada')
+
+    before = await used()
+    for key in keys:
+        await cache.add(key, b'1', 3600)
+    after = await used()
+    for key in keys:
+        await cache.delete(key)
+    await cache.close()
+    return (after - before) / len(keys)
+
+
+async def memcached_memory(host: str, port: int, keys: List[str]) -> float:
+    cache = MemcachedBackend(host, port)
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def used() -> int:
+        writer.write(b'stats\r\n')
+        await writer.drain()
+        while True:
+            line = await reader.readuntil(b'\r\n')
+            if line.startswith(b'STAT bytes '):
+                value = int(line.split()[2])
+            elif line == b'END\r\n':
+                return value
+
+    before = await used()
+    for key in keys:
+        await cache.add(key, b'1', 3600)
+    after = await used()
+    for key in keys:
+        await cache.delete(key)
+    writer.close()
+    await cache.close()
+    return (after - before) / len(keys)
+
+
+def speed(encode: Callable[[str], str], ids: List[str]) -> float:
+    """ Mikrodetik per key """
+    start = time.perf_counter()
+    for external_id in ids:
+        encode(external_id)
+    return (time.perf_counter() - start) / len(ids) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--number', type=int, default=100000,
+                        help='jumlah X-External-Id')
+    parser.add_argument('--namespace', default='demo')
+    parser.add_argument('--partner', default='PARTNER0001')
+    parser.add_argument('--digest-size', type=int, default=12)
+    parser.add_argument('--redis', help='host:port')
+    parser.add_argument('--db', type=int, default=15)
+    parser.add_argument('--memcached', help='host:port')
+    args = parser.parse_args()
+
+    encoder = KeyEncoder(args.namespace, args.digest_size)
+    ids = [str(uuid.uuid4()) for _ in range(args.number)]
+    variants = (
+            ('before', lambda external_id: f'{args.namespace}{external_id}'),
+            ('after', lambda external_id: encoder.encode(external_id,
+                                                         args.partner)),
+        )
+
+    print(f'{args.number} X-External-Id, namespace {args.namespace!r}, '
+          f'digest {args.digest_size} byte\n')
+    print(f'{"":8}{"key":>6}{"encode":>10}{"memory":>10}'
+          f'{"redis*":>9}{"memcached*":>12}{"redis":>9}{"memcached":>11}')
+    for name, encode in variants:
+        keys = [encode(external_id) for external_id in ids]
+        size = len(keys[0].encode())
+        measured_redis = measured_memcached = '-'
+        if args.redis:
+            host, _, port = args.redis.rpartition(':')
+            measured_redis = '%.0f' % asyncio.run(
+                    redis_memory(host, int(port), args.db, keys))
+        if args.memcached:
+            host, _, port = args.memcached.rpartition(':')
+            measured_memcached = '%.0f' % asyncio.run(
+                    memcached_memory(host, int(port), keys))
+        print(f'{name:8}{size:>6}{speed(encode, ids):>8.2f}us'
+              f'{memory_backend(encode, ids):>10.0f}'
+              f'{redis_estimate(keys[0].encode()):>9}'
+              f'{memcached_estimate(keys[0].encode()):>12}'
+              f'{measured_redis:>9}{measured_memcached:>11}')
+    print('\nbyte per key; * estimasi, tanpa overhead allocator lain')
+    return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Benchmark: Consistent Hash Sharding
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+"""
+Throughput `add` X-External-Id dengan `ShardedBackend` 1, 2, 4 node.
+
+Tanpa redis-server, setiap node adalah stand-in server RESP (SET NX EX,
+GET, DEL) di process sendiri yang memproses satu command dalam
+`--service` mikrodetik secara serial, seperti redis yang single thread
+dan sudah jenuh. Dengan redis-server sungguhan gunakan `--ports`.
+
+Juga menampilkan sebaran key per node dan jumlah key yang pindah
+pemilik saat satu node ditambahkan.
+
+    snapapi/tests$ python bench_ring.py -n 20000 -c 64 --service 200
+    snapapi/tests$ python bench_ring.py --ports 6379 6380 6381 6382
+
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import sys
+import time
+import uuid
+sys.path.insert(1, '..')
+
+from typing import Dict, List
+
+from snapapi.cache import CacheBackend, HashRing, RedisBackend, ShardedBackend
+
+
+def serve(service: float, ready: 'multiprocessing.Queue[int]') -> None:
+    """ Stand-in redis: satu command `service` detik, serial """
+    store: Dict[bytes, bytes] = {}
+
+    async def handler(
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter
+        ) -> None:
+        while True:
+            try:
+                line = await reader.readuntil(b'\r\n')
+                args = []
+                for _ in range(int(line[1:-2])):
+                    size = int((await reader.readuntil(b'\r\n'))[1:-2])
+                    args.append((await reader.readexactly(size + 2))[:-2])
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return None
+            # blocking: command berikutnya (koneksi lain) ikut menunggu
+            time.sleep(service)
+            command = args[0].upper()
+            if command == b'SET':
+                if b'NX' in args[3:] and args[1] in store:
+                    writer.write(b'$-1\r\n')
+                else:
+                    store[args[1]] = args[2]
+                    writer.write(b'+OK\r\n')
+            elif command == b'GET':
+                value = store.get(args[1])
+                writer.write(b'$-1\r\n' if value is None else
+                             b'$%d\r\n%s\r\n' % (len(value), value))
+            elif command == b'DEL':
+                writer.write(b':%d\r\n' % (store.pop(args[1], None)
+                                           is not None))
+            elif command in (b'SELECT', b'PING'):
+                writer.write(b'+OK\r\n')
+            else:
+                writer.write(b'-ERR unknown command\r\n')
+            await writer.drain()
+
+    async def main() -> None:
+        server = await asyncio.start_server(handler, '127.0.0.1', 0)
+        ready.put(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
+
+    asyncio.run(main())
+
+
+async def run(
+        ports: List[int],
+        number: int,
+        concurrency: int,
+        replicas: int
+    ) -> float:
+    backends: Dict[str, CacheBackend] = {
+            f'127.0.0.1:{port}': RedisBackend(
+                '127.0.0.1', port, db=0, pool_size=concurrency)
+            for port in ports
+        }
+    cache = ShardedBackend(backends, replicas=min(replicas, len(ports)))
+    await cache.open()
+    keys = [f'bench:{uuid.uuid4().hex}' for _ in range(number)]
+
+    async def worker(offset: int) -> None:
+        for key in keys[offset::concurrency]:
+            await cache.add(key, ttl=60)
+        return None
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await cache.close()
+    return number / elapsed
+
+
+def distribution(nodes: int, keys: int, vnodes: int) -> None:
+    names = [f'10.0.0.{i}:6379' for i in range(1, nodes + 1)]
+    ring = HashRing(names, vnodes)
+    sample = [f'{uuid.uuid4()}' for _ in range(keys)]
+    before = [ring.node(key) for key in sample]
+    counts = [before.count(name) for name in names]
+    ring.add(f'10.0.0.{nodes + 1}:6379')
+    moved = sum(ring.node(key) != owner
+                for key, owner in zip(sample, before))
+    print(f'  {nodes} node, vnodes {vnodes}: key per node '
+          f'min {min(counts)} max {max(counts)} '
+          f'stdev {statistics.pstdev(counts) / (keys / nodes):.1%}; '
+          f'tambah 1 node: {moved / keys:.1%} key pindah '
+          f'(ideal {1 / (nodes + 1):.1%})')
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--number', type=int, default=20000,
+                        help='jumlah add per putaran')
+    parser.add_argument('-c', '--concurrency', type=int, default=64,
+                        help='jumlah request concurrent')
+    parser.add_argument('--service', type=int, default=200,
+                        help='mikrodetik per command di stand-in server')
+    parser.add_argument('--nodes', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--replicas', type=int, default=1)
+    parser.add_argument('--ports', type=int, nargs='+',
+                        help='redis-server sungguhan di localhost')
+    args = parser.parse_args()
+
+    print('Sebaran key (100000 key):')
+    for nodes in (3, 4, 8):
+        distribution(nodes, 100000, 160)
+
+    processes = []
+    ports = args.ports
+    if not ports:
+        ready: 'multiprocessing.Queue[int]' = multiprocessing.Queue()
+        for _ in range(max(args.nodes)):
+            process = multiprocessing.Process(
+                    target=serve, args=(args.service / 1e6, ready),
+                    daemon=True)
+            process.start()
+            processes.append(process)
+        ports = [ready.get(timeout=10) for _ in processes]
+
+    print(f'\nadd, {args.number} key, concurrency {args.concurrency}, '
+          f'replicas {args.replicas}:')
+    base = 0.0
+    try:
+        for nodes in args.nodes:
+            if nodes > len(ports):
+                break
+            rate = asyncio.run(run(ports[:nodes], args.number,
+                                   args.concurrency, args.replicas))
+            base = base or rate
+            print(f'  {nodes} node: {rate:10,.0f} add/s  '
+                  f'({rate / base:.2f}x)')
+    finally:
+        for process in processes:
+            process.terminate()
+    return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Benchmark: Validation Error
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+"""
+Bandingkan terjemahan error validasi pydantic ke response 400 SNAP:
+
+- before:   `parse_validation_exception` versi lama, group per type
+            dengan defaultdict, filter Content-Type, nama field
+            di-`replace().title()` per error
+- after:    `ValidationTranslator` per route, nama field sudah dihitung,
+            satu loop
+
+Error diambil dari request VA Inquiry yang salah (header kurang, body
+salah format), hasil keduanya dicek sama.
+
+    snapapi/tests$ python bench_validation.py -n 100000
+
+"""
+
+import argparse
+import sys
+sys.path.insert(1, '..')
+
+from collections import defaultdict
+from timeit import repeat
+from typing import Any, Callable, Dict, List
+
+from snapapi.exceptions import (
+        BadRequest, InvalidFieldFormat, MissingMandatoryField,
+        SNAPException, ValidationTranslator
+    )
+from snapapi.model.virtual_account.inquiry import (
+        InquiryHeader, InquiryRequest
+    )
+
+CASES: Dict[str, List[Dict[str, Any]]] = {
+        'missing': [
+            dict(type='value_error', loc=('header', 'x_timestamp')),
+            dict(type='missing', loc=('header', 'x_signature')),
+            dict(type='missing', loc=('header', 'x_external_id')),
+            dict(type='missing', loc=('header', 'channel_id')),
+            dict(type='string_type', loc=('body', 'partnerServiceId')),
+            dict(type='missing', loc=('body', 'customerNo')),
+            dict(type='missing', loc=('body', 'virtualAccountNo')),
+        ],
+        'invalid': [
+            dict(type='string_type', loc=('body', 'partnerServiceId')),
+            dict(type='string_too_long', loc=('body', 'customerNo')),
+            dict(type='string_type', loc=('body', 'inquiryRequestId')),
+            dict(type='value_error', loc=('header', 'x_timestamp')),
+        ],
+        'content_type': [
+            dict(type='missing', loc=('header', 'x_signature')),
+            dict(type='literal_error', loc=('header', 'content_type')),
+        ],
+    }
+
+
+def before(errors: List[Dict[str, Any]]) -> SNAPException:
+    """ parse_validation_exception sebelumnya, tanpa async """
+    tmp = defaultdict(list)
+    for e in errors:
+        tmp[e['type']].append(e)
+
+    def _get_location(error: dict) -> str:
+        location: str = ''
+        try:
+            location = error['loc'][0] == 'header' \
+                and error['loc'][1].replace('_', '-').title() \
+                or error['loc'][1].replace('_', '-')
+        except:
+            pass
+        return location
+
+    if list(filter(lambda e:
+            e['type'] == 'literal_error' \
+            and e['loc'][0] == 'header' \
+            and e['loc'][1] == 'content_type',
+            errors
+        )):
+        return BadRequest('Content Type Should Be JSON')
+    else:
+        error_fields = []
+        error_values = []
+        for error_type, errors_ in tmp.items():
+            if error_type == 'missing':
+                error_fields += list(map(_get_location, errors_))
+            else:
+                error_values += list(map(_get_location, errors_))
+        if error_fields:
+            return MissingMandatoryField(f"[{', '.join(error_fields)}]")
+        elif error_values:
+            return InvalidFieldFormat(f"[{', '.join(error_values)}]")
+        else:
+            return BadRequest()
+
+
+def result(error: SNAPException) -> tuple:
+    return type(error), error.message
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--number', type=int, default=100000)
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    translator = ValidationTranslator(
+            [('header', name) for name in InquiryHeader.model_fields]
+            + [('body', name) for name in InquiryRequest.model_fields])
+    print(f'{args.number} x, terbaik dari {args.repeat}, mikrodetik per '
+          f'request\n')
+    print(f'{"":14}{"before":>10}{"after":>10}{"speedup":>10}')
+    for name, errors in CASES.items():
+        assert result(before(errors)) == result(translator.translate(errors))
+        timings = []
+        call: Callable[[List[Dict[str, Any]]], SNAPException]
+        for call in (before, translator.translate):
+            timings.append(min(repeat(
+                    lambda: call(errors),
+                    number=args.number,
+                    repeat=args.repeat)) / args.number * 1e6)
+        print(f'{name:14}{timings[0]:>10.2f}{timings[1]:>10.2f}'
+              f'{timings[0] / timings[1]:>9.1f}x')
+    return None
+
+
+if __name__ == '__main__':
+    main()
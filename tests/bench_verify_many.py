@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Benchmark: Batch Signature Verification
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+"""
+Bandingkan verifikasi log transaksi:
+
+- loop:         `verify_signature_transactional` per record, try/except
+- verify_many:  `SNAPCrypto.verify_many`, SHA256withRSA dibagi ke
+                `-w` process jika diisi
+
+Sebagian kecil record sengaja dibuat invalid.
+
+    snapapi/tests$ python bench_verify_many.py -n 100000 --rsa 2000 -w 4
+
+"""
+
+import argparse
+import json
+import secrets
+import sys
+import time
+sys.path.insert(1, '..')
+
+from typing import Callable, List, Tuple
+
+from Crypto.PublicKey import RSA
+
+from snapapi import SNAPCrypto
+from snapapi.exceptions import InvalidSignature
+from snapapi.security.crypto import RECORD, ALGORITHM, VERIFY_VALID
+
+PATH = '/snap/v1.0/transfer-va/inquiry'
+TIMESTAMP = '2025-01-03T14:06:47.798+07:00'
+
+
+def build_records(
+        signer: SNAPCrypto,
+        number: int,
+        algorithm: ALGORITHM
+    ) -> List[RECORD]:
+    access_token = secrets.token_urlsafe(32)
+    records: List[RECORD] = []
+    for i in range(number):
+        body = json.dumps({
+                'partnerServiceId': '   12345',
+                'virtualAccountNo': f'   12345{i:020d}',
+                'inquiryRequestId': secrets.token_hex(8)
+            }).encode()
+        signature = signer.create_signature_transactional(
+                http_method='POST',
+                path=PATH,
+                timestamp=TIMESTAMP,
+                request_body=body,
+                access_token=access_token,
+                algorithm=algorithm
+            )
+        if i % 100 == 0:
+            signature = signature[::-1]
+        headers = {'X-TIMESTAMP': TIMESTAMP, 'X-SIGNATURE': signature}
+        records.append((PATH, 'POST', access_token, headers, body))
+    return records
+
+
+def loop(
+        crypto: SNAPCrypto,
+        records: List[RECORD],
+        algorithm: ALGORITHM
+    ) -> int:
+    valid = 0
+    for path, http_method, access_token, headers, body in records:
+        try:
+            crypto.verify_signature_transactional(
+                    path=path,
+                    http_method=http_method,
+                    access_token=access_token or '',
+                    request_headers=headers,
+                    request_body=body,
+                    algorithm=algorithm
+                )
+            valid += 1
+        except InvalidSignature:
+            continue
+    return valid
+
+
+def timed(fn: Callable[[], int]) -> Tuple[float, int]:
+    start = time.perf_counter()
+    valid = fn()
+    return time.perf_counter() - start, valid
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=100000,
+            help="Jumlah record HMAC-SHA512")
+    parser.add_argument("--rsa", type=int, default=2000,
+            help="Jumlah record SHA256withRSA")
+    parser.add_argument("-w", "--workers", type=int, default=0,
+            help="Jumlah process untuk SHA256withRSA, 0 = tanpa executor")
+    parser.add_argument("-b", "--backend", default='pycryptodome',
+            help="Backend RSA: pycryptodome atau cryptography")
+    args = parser.parse_args()
+
+    key = RSA.generate(2048)
+    client_secret = secrets.token_urlsafe(32)
+    signer = SNAPCrypto(private_key=key.export_key(),
+                        client_secret=client_secret,
+                        backend=args.backend)
+    crypto = SNAPCrypto(public_cert=key.publickey().export_key(),
+                        client_secret=client_secret,
+                        backend=args.backend)
+    if args.workers:
+        crypto.create_executor(max_workers=args.workers).start()
+
+    algorithm: ALGORITHM
+    for algorithm, number in (('HMAC-SHA512', args.number),
+                              ('SHA256withRSA', args.rsa)):
+        if not number:
+            continue
+        records = build_records(signer, number, algorithm)
+        t_loop, valid_loop = timed(lambda: loop(crypto, records, algorithm))
+        t_many, valid_many = timed(lambda: crypto.verify_many(
+                records, algorithm=algorithm).count(VERIFY_VALID))
+        assert valid_loop == valid_many, (valid_loop, valid_many)
+        print(f"{algorithm:<13} {number:>8} record: "
+              f"loop {t_loop:7.3f} s ({number / t_loop:>9,.0f}/s), "
+              f"verify_many {t_many:7.3f} s ({number / t_many:>9,.0f}/s), "
+              f"valid {valid_many}")
+    if crypto.executor:
+        crypto.executor.shutdown()
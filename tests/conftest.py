@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: pytest
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+"""
+Test backend dan komponen snapapi tanpa server redis/memcached: protocol
+diuji dengan server tiruan di event loop yang sama, waktu dengan clock
+tiruan (`Clock`). Coroutine dijalankan dengan `asyncio.run`, tanpa plugin.
+
+    snapapi$ python -m pytest -q tests
+
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+
+sys.path.insert(1, str(Path(__file__).resolve().parent.parent))
+
+
+class Clock:
+    """ Waktu tiruan, `advance` detik """
+    def __init__(self, now: float = 1_700_000_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
+
+
+class FakeServer:
+    """
+    Server TCP tiruan di event loop yang sama. `stall = True`: perintah
+    dibaca tapi tidak dijawab (timeout), `disconnect()` menutup semua
+    koneksi dari sisi server. Expiry menurut `clock`.
+    """
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self.clock = clock
+        self.data: Dict[bytes, Any] = {}
+        self.deadlines: Dict[bytes, float] = {}
+        self.commands: List[List[bytes]] = []
+        self.connections = 0
+        self.stall = False
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._writers: List[asyncio.StreamWriter] = []
+
+    async def start(self) -> int:
+        """ Returns port """
+        self.server = await asyncio.start_server(
+                self._serve, '127.0.0.1', 0)
+        port: int = self.server.sockets[0].getsockname()[1]
+        return port
+
+    async def stop(self) -> None:
+        self.disconnect()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def disconnect(self) -> None:
+        while self._writers:
+            self._writers.pop().close()
+
+    def ttl(self, key: bytes) -> Optional[float]:
+        deadline = self.deadlines.get(key)
+        return None if deadline is None else deadline - self.clock()
+
+    def expire(self, key: bytes, seconds: float) -> None:
+        self.deadlines[key] = self.clock() + seconds
+
+    def evict(self, key: bytes) -> None:
+        """ Seperti maxmemory eviction atau FLUSHALL """
+        self.data.pop(key, None)
+        self.deadlines.pop(key, None)
+
+    def _alive(self, key: bytes) -> bool:
+        deadline = self.deadlines.get(key)
+        if deadline is not None and deadline <= self.clock():
+            self.evict(key)
+        return key in self.data
+
+    async def _serve(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self._writers.append(writer)
+        try:
+            while True:
+                args = await self._read(reader)
+                self.commands.append(args)
+                if self.stall:
+                    continue
+                writer.write(self._reply(args))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError,
+                asyncio.CancelledError):
+            # ditutup client, atau event loop `asyncio.run` selesai
+            pass
+        finally:
+            writer.close()
+
+    async def _read(self, reader: asyncio.StreamReader) -> List[bytes]:
+        raise NotImplementedError()
+
+    def _reply(self, args: List[bytes]) -> bytes:
+        raise NotImplementedError()
+
+
+class FakeRedis(FakeServer):
+    """
+    Redis (RESP2), cukup untuk perintah `RedisBackend`. `nx=False`
+    meniru Redis < 7 yang menolak `EXPIRE ... NX`.
+    """
+    def __init__(self, clock: Callable[[], float] = time.time,
+                 nx: bool = True) -> None:
+        super().__init__(clock)
+        self.nx = nx
+
+    async def _read(self, reader: asyncio.StreamReader) -> List[bytes]:
+        line = await reader.readuntil(b'\r\n')
+        args = []
+        for _ in range(int(line[1:-2])):
+            size = int((await reader.readuntil(b'\r\n'))[1:-2])
+            args.append((await reader.readexactly(size + 2))[:-2])
+        return args
+
+    def _reply(self, args: List[bytes]) -> bytes:
+        command = args[0].upper()
+        key = len(args) > 1 and args[1] or b''
+        if command == b'PING':
+            return b'+PONG\r\n'
+        if command in (b'AUTH', b'SELECT'):
+            return b'+OK\r\n'
+        if command == b'SET':
+            options = [arg.upper() for arg in args[3:]]
+            if b'NX' in options and self._alive(key):
+                return b'$-1\r\n'
+            self.data[key] = args[2]
+            self.deadlines.pop(key, None)
+            if b'EX' in options:
+                self.expire(key, int(options[options.index(b'EX') + 1]))
+            return b'+OK\r\n'
+        if command == b'GET':
+            value = self._alive(key) and self.data[key] or None
+            if not isinstance(value, bytes):
+                return b'$-1\r\n'
+            return b'$%d\r\n%s\r\n' % (len(value), value)
+        if command == b'EXISTS':
+            return b':%d\r\n' % self._alive(key)
+        if command in (b'DEL', b'UNLINK'):
+            alive = self._alive(key)
+            self.evict(key)
+            return b':%d\r\n' % alive
+        if command == b'EXPIRE':
+            if len(args) > 3 and not self.nx:
+                return b'-ERR wrong number of arguments\r\n'
+            if not self._alive(key) or len(args) > 3 \
+                    and key in self.deadlines:
+                return b':0\r\n'
+            self.expire(key, int(args[2]))
+            return b':1\r\n'
+        if command in (b'HSETNX', b'HSET'):
+            if not self._alive(key):
+                self.data[key] = {}
+            if command == b'HSETNX' and args[2] in self.data[key]:
+                return b':0\r\n'
+            self.data[key][args[2]] = args[3]
+            return b':1\r\n'
+        fields = self._alive(key) and self.data[key] or {}
+        if command == b'HGET':
+            value = fields.get(args[2])
+            if value is None:
+                return b'$-1\r\n'
+            return b'$%d\r\n%s\r\n' % (len(value), value)
+        if command == b'HEXISTS':
+            return b':%d\r\n' % (args[2] in fields)
+        if command == b'HDEL':
+            return b':%d\r\n' % (fields.pop(args[2], None) is not None)
+        return b'-ERR unknown command\r\n'
+
+
+class FakeMemcached(FakeServer):
+    """ Memcached text protocol, cukup untuk `MemcachedBackend` """
+    async def _read(self, reader: asyncio.StreamReader) -> List[bytes]:
+        args = (await reader.readuntil(b'\r\n'))[:-2].split(b' ')
+        if args[0] in (b'add', b'set'):
+            args.append((await reader.readexactly(int(args[4]) + 2))[:-2])
+        return args
+
+    def _reply(self, args: List[bytes]) -> bytes:
+        command = args[0]
+        if command == b'version':
+            return b'VERSION 1.6.0\r\n'
+        if len(args) < 2 or len(args[1]) > 250:
+            return b'CLIENT_ERROR bad command line format\r\n'
+        key = args[1]
+        if command in (b'add', b'set'):
+            if command == b'add' and self._alive(key):
+                return b'NOT_STORED\r\n'
+            exptime = int(args[3])
+            if exptime > 60 * 60 * 24 * 30:
+                return b'SERVER_ERROR exptime dianggap unix timestamp\r\n'
+            self.data[key] = args[5]
+            self.deadlines.pop(key, None)
+            if exptime:
+                self.expire(key, exptime)
+            return b'STORED\r\n'
+        if command == b'get':
+            if not self._alive(key):
+                return b'END\r\n'
+            value = self.data[key]
+            return b'VALUE %s 0 %d\r\n%s\r\nEND\r\n' % (
+                    key, len(value), value)
+        if command == b'delete':
+            alive = self._alive(key)
+            self.evict(key)
+            return alive and b'DELETED\r\n' or b'NOT_FOUND\r\n'
+        return b'ERROR\r\n'
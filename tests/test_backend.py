@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Crypto Backend
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import base64
+import datetime
+from typing import Dict
+
+import pytest
+from Crypto.PublicKey import RSA
+
+from snapapi import SNAPCrypto, tools
+from snapapi.exceptions import InvalidSignature
+from snapapi.security.backend import available_backends, has_cryptography
+
+BACKENDS = list(available_backends())
+PAIRS = [(signer, verifier) for signer in BACKENDS for verifier in BACKENDS]
+MESSAGE = b'XJAPE8888|2025-01-03T14:06:47.798+07:00'
+PASSPHRASE = 'rahasia'
+
+
+def certificate(key: RSA.RsaKey) -> bytes:
+    """ Self-signed X.509 cert dari `key` """
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
+
+    private_key = serialization.load_der_private_key(
+            key.export_key('DER'), None)
+    assert isinstance(private_key, rsa.RSAPrivateKey)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'BANKA')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = x509.CertificateBuilder() \
+        .subject_name(name) \
+        .issuer_name(name) \
+        .public_key(private_key.public_key()) \
+        .serial_number(1) \
+        .not_valid_before(now) \
+        .not_valid_after(now + datetime.timedelta(days=1)) \
+        .sign(private_key, hashes.SHA256())
+    pem: bytes = cert.public_bytes(serialization.Encoding.PEM)
+    return pem
+
+
+@pytest.fixture(scope='module')
+def key():
+    return RSA.generate(2048)
+
+
+@pytest.fixture(scope='module')
+def private_keys(key) -> Dict[str, bytes]:
+    return {
+            'pkcs1': key.export_key(),
+            'pkcs8': key.export_key(pkcs=8),
+            'der': key.export_key('DER'),
+        }
+
+
+@pytest.fixture(scope='module')
+def public_certs(key) -> Dict[str, bytes]:
+    certs = {
+            'pem': key.publickey().export_key(),
+            'der': key.publickey().export_key('DER'),
+        }
+    if has_cryptography:
+        certs['x509'] = certificate(key)
+    return certs
+
+
+@pytest.mark.parametrize('signer,verifier', PAIRS)
+def test_signature(signer, verifier, private_keys, public_certs):
+    # PKCS#1 v1.5 deterministik: signature kedua backend identik
+    signature = SNAPCrypto(private_key=private_keys['pkcs1'],
+                           backend=signer).create_signature(
+            MESSAGE, algorithm='SHA256withRSA')
+    for private_key in private_keys.values():
+        assert SNAPCrypto(private_key=private_key,
+                          backend=verifier).create_signature(
+                MESSAGE, algorithm='SHA256withRSA') == signature
+
+    for public_cert in public_certs.values():
+        crypto = SNAPCrypto(public_cert=public_cert, backend=verifier)
+        crypto.verify_signature(message=MESSAGE,
+                                signature=signature.encode(),
+                                algorithm='SHA256withRSA')
+        with pytest.raises(InvalidSignature):
+            crypto.verify_signature(message=MESSAGE + b'.',
+                                    signature=signature.encode(),
+                                    algorithm='SHA256withRSA')
+        tampered = bytearray(base64.b64decode(signature))
+        tampered[0] ^= 1
+        with pytest.raises(InvalidSignature):
+            crypto.verify_signature(message=MESSAGE,
+                                    signature=base64.b64encode(tampered),
+                                    algorithm='SHA256withRSA')
+
+
+@pytest.mark.parametrize('signer,verifier', PAIRS)
+def test_passphrase(signer, verifier, key):
+    private_key = key.export_key(passphrase=PASSPHRASE, pkcs=8,
+                                 protection='scryptAndAES128-CBC')
+    signature = SNAPCrypto(private_key=private_key,
+                           private_key_passphrase=PASSPHRASE,
+                           backend=signer).create_signature(
+            MESSAGE, algorithm='SHA256withRSA')
+    SNAPCrypto(public_cert=key.publickey().export_key(),
+               backend=verifier).verify_signature(
+            message=MESSAGE, signature=signature.encode(),
+            algorithm='SHA256withRSA')
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+def test_fingerprint(name, key, private_keys, public_certs):
+    # sama untuk semua backend dan semua format key
+    expected = tools.fingerprint(key.publickey().export_key('DER'))
+    backend = available_backends()[name]
+    for data in (*private_keys.values(), *public_certs.values()):
+        imported = backend.import_key(data)
+        assert backend.fingerprint(imported) == expected
+        assert backend.size_in_bytes(imported) == 256
+    crypto = SNAPCrypto(public_cert=public_certs['pem'],
+                        previous_public_certs=[private_keys['der']],
+                        backend=name)
+    assert crypto.fingerprints == [expected, expected]
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Cache Backend
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+"""
+Kontrak yang sama untuk semua backend `SNAPCache`: add atomic, get, set,
+delete, expiry dan partition. redis/memcached lewat server tiruan.
+"""
+
+import asyncio
+import uuid
+from typing import Optional
+
+import pytest
+
+from snapapi.cache import SNAPCache
+from snapapi.cache.base import CacheBackend
+from snapapi.cache.memcached import MemcachedBackend
+from snapapi.cache.memory import MemoryBackend
+from snapapi.cache.redis import RedisBackend
+from snapapi.cache.shared import SharedMemoryBackend
+from snapapi.exceptions import TimeOut
+
+from conftest import FakeMemcached, FakeRedis, FakeServer
+
+BACKENDS = ['memory', 'shared', 'redis', 'memcached']
+
+
+def run(name: str, clock, tmp_path, test) -> None:
+    """ `test(backend)` dengan backend `name` """
+    async def main() -> None:
+        server: Optional[FakeServer] = None
+        backend: CacheBackend
+        if name == 'redis':
+            server = FakeRedis(clock)
+            backend = RedisBackend('127.0.0.1', await server.start(),
+                                   timeout=2)
+        elif name == 'memcached':
+            server = FakeMemcached(clock)
+            backend = MemcachedBackend('127.0.0.1', await server.start(),
+                                       timeout=2)
+        elif name == 'shared':
+            backend = SharedMemoryBackend(
+                    str(tmp_path / f'{uuid.uuid4().hex}.cache'),
+                    capacity=1024, stripes=4, clock=clock)
+        else:
+            backend = MemoryBackend(clock=clock)
+        try:
+            await test(backend)
+        finally:
+            if server is None:
+                backend.abort()
+            else:
+                await backend.close()
+                await server.stop()
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+def test_add_get_delete(name, clock, tmp_path):
+    async def test(backend):
+        assert await backend.add('X1', b'1', 60)
+        assert not await backend.add('X1', b'2', 60)
+        assert await backend.get('X1') == b'1'
+        assert await backend.exists('X1')
+        await backend.set('X1', b'done', 60)
+        assert await backend.get('X1') == b'done'
+        assert await backend.delete('X1')
+        assert not await backend.delete('X1')
+        assert await backend.get('X1') is None
+        assert not await backend.exists('X1')
+        assert await backend.add('X1', b'1', 60)
+    run(name, clock, tmp_path, test)
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+def test_expiry(name, clock, tmp_path):
+    async def test(backend):
+        assert await backend.add('X1', b'1', 60)
+        assert await backend.add('X2', b'1', 600)
+        clock.advance(61)
+        assert await backend.get('X1') is None
+        assert await backend.get('X2') == b'1'
+        assert await backend.add('X1', b'2', 60)
+        assert not await backend.add('X2', b'2', 60)
+    run(name, clock, tmp_path, test)
+
+
+@pytest.mark.parametrize('name', ['memory', 'redis', 'memcached'])
+def test_without_ttl(name, clock, tmp_path):
+    async def test(backend):
+        assert await backend.add('X1', b'1', None)
+        clock.advance(86400 * 365)
+        assert await backend.get('X1') == b'1'
+    run(name, clock, tmp_path, test)
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+def test_partition(name, clock, tmp_path):
+    async def test(backend):
+        assert await backend.partition_add('NS:1', 'X1', b'1', 600)
+        assert not await backend.partition_add('NS:1', 'X1', b'2', 600)
+        assert await backend.partition_add('NS:2', 'X1', b'1', 1200)
+        await backend.partition_set('NS:1', 'X1', b'done', 600)
+        assert await backend.partition_get('NS:1', 'X1') == b'done'
+        assert await backend.partition_exists('NS:1', 'X1')
+        assert await backend.partition_delete('NS:1', 'X1')
+        assert await backend.partition_get('NS:1', 'X1') is None
+        assert await backend.partition_add('NS:1', 'X1', b'1', 600)
+        clock.advance(601)
+        assert await backend.partition_get('NS:1', 'X1') is None
+        assert await backend.partition_get('NS:2', 'X1') == b'1'
+        # per key (memcached, shared): partition expired sendiri
+        if await backend.drop_partition('NS:2'):
+            assert await backend.partition_get('NS:2', 'X1') is None
+        else:
+            assert name in ('memcached', 'shared')
+    run(name, clock, tmp_path, test)
+
+
+@pytest.mark.parametrize('name', ['redis', 'memcached'])
+def test_snapcache_errors(name, clock):
+    """ Duplicate: ValueError, backend lambat: TimeOut (504) """
+    server = name == 'redis' and FakeRedis(clock) or FakeMemcached(clock)
+
+    async def main():
+        cache = SNAPCache('NS', host='127.0.0.1', port=await server.start(),
+                          backend=name, timeout=0.2)
+        try:
+            await cache.add('X1', ttl=60, partner='P1')
+            with pytest.raises(ValueError):
+                await cache.add('X1', ttl=60, partner='P1')
+            assert await cache.exists('X1', partner='P1')
+            server.stall = True
+            with pytest.raises(TimeOut):
+                await cache.add('X2', ttl=60, partner='P1')
+        finally:
+            await cache.close()
+            await server.stop()
+
+    asyncio.run(main())
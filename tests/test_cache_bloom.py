@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Bloom Filter
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+
+import pytest
+
+from snapapi.cache import SNAPCache
+from snapapi.cache.bloom import BloomFilter
+from snapapi.cache.memory import MemoryBackend
+from snapapi.tools import DayPartition
+
+
+def bloom_cache(**kwargs) -> SNAPCache:
+    cache = SNAPCache('test', bloom_capacity=1000, **kwargs)
+    cache._cache = MemoryBackend()
+    return cache
+
+
+@pytest.mark.parametrize('partition', [False, True])
+def test_same_key_other_partner(partition):
+    """
+    X-External-ID yang sama dari Partner lain bukan duplicate di backend
+    (compact_keys), filter juga tidak boleh menganggapnya "mungkin sudah"
+    """
+    cache = bloom_cache(compact_keys=True, partition=partition)
+
+    async def main():
+        await cache.add('EXT-1', ttl=60, partner='BANKA')
+        await cache.add('EXT-1', ttl=60, partner='BANKB')
+        with pytest.raises(ValueError):
+            await cache.add('EXT-1', ttl=60, partner='BANKB')
+
+    asyncio.run(main())
+    stats = cache.bloom_stats()
+    assert stats['negatives'] == 2
+    assert stats['positives'] == 1
+    assert stats['false_positives'] == 0
+
+
+def test_sizing():
+    bloom = BloomFilter(1000, 0.001)
+    # m = -n ln(p) / ln(2)^2, k = m/n ln(2)
+    assert (bloom.size, bloom.hashes) == (14378, 10)
+    assert len(bloom._bits) == 1798
+
+
+def test_no_false_negatives():
+    bloom = BloomFilter(2000, 0.01)
+    keys = [f'NS:P1:EXT-{i}' for i in range(2000)]
+    assert bloom.add(keys[0])
+    for key in keys[1:]:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    assert not bloom.add(keys[0])
+    assert len(bloom) == 2001
+    assert 1 not in bloom
+    # capacity penuh: fill ratio ~50%, estimasi mendekati error_rate
+    assert 0.45 < bloom.fill_ratio < 0.55
+    assert 0.005 < bloom.false_positive_rate < 0.02
+    others = sum(f'NS:P2:EXT-{i}' in bloom for i in range(10000))
+    assert others < 300
+
+    bloom.clear()
+    assert not any(key in bloom for key in keys)
+    assert bloom.stats()['count'] == 0
+    assert bloom.fill_ratio == 0
+
+
+def test_daily_reset(clock):
+    cache = bloom_cache()
+    cache._cache = MemoryBackend(clock=clock)
+    cache._today = DayPartition(clock=clock)
+    cache.initiate_bloom()
+
+    async def main():
+        await cache.add('EXT-1', ttl=86400 * 2)
+        with pytest.raises(ValueError):
+            await cache.add('EXT-1', ttl=86400 * 2)
+        assert cache.bloom_stats()['count'] == 1
+        clock.advance(86400)
+        # filter kosong lagi, backend tetap menolak duplicate
+        with pytest.raises(ValueError):
+            await cache.add('EXT-1', ttl=86400 * 2)
+        assert cache.bloom_stats()['count'] == 0
+        await cache.add('EXT-2', ttl=60)
+
+    asyncio.run(main())
+    stats = cache.bloom_stats()
+    assert (stats['negatives'], stats['positives']) == (3, 1)
+    assert stats['count'] == 1
+    assert cache.build_key('EXT-2') in cache.bloom
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Circuit Breaker dan Local Fallback
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+import os
+import subprocess
+import sys
+
+from snapapi.cache.breaker import (
+        CircuitBreaker, FallbackBackend, CLOSED, OPEN, HALF_OPEN
+    )
+from snapapi.cache.redis import RedisBackend
+
+from conftest import FakeRedis
+
+
+def test_breaker(clock):
+    breaker = CircuitBreaker(minimum_calls=4, open_timeout=10, clock=clock)
+    for success in (False, False, True):
+        assert breaker.allow()
+        breaker.record(success, 0.001)
+    # belum `minimum_calls`
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+    breaker.record(True, 0.001)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()['rejected'] == 1
+
+    clock.advance(10)
+    assert breaker.state == HALF_OPEN
+    # satu call percobaan
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record(False, 0.001)
+    assert breaker.state == OPEN
+
+    clock.advance(10)
+    assert breaker.allow()
+    breaker.record(True, 0.001)
+    assert breaker.state == CLOSED
+    assert breaker.failure_rate == 0
+    assert [(h['source'], h['target']) for h in breaker.history] == [
+            (CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, OPEN),
+            (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)
+        ]
+    stats = breaker.stats()
+    assert (stats['calls'], stats['failures'], stats['opened']) == (6, 3, 2)
+
+
+def test_slow_calls(clock):
+    breaker = CircuitBreaker(minimum_calls=2, slow_call=0.5, clock=clock)
+    breaker.record(True, 0.6)
+    breaker.record(True, 0.1)
+    assert breaker.state == OPEN
+    stats = breaker.stats()
+    assert (stats['failures'], stats['slow_calls']) == (0, 1)
+    assert stats['latency_max'] == 0.6
+
+
+def fallback(port: int, clock, journal: str) -> FallbackBackend:
+    return FallbackBackend(
+            RedisBackend('127.0.0.1', port, timeout=2),
+            breaker=CircuitBreaker(minimum_calls=2, open_timeout=10,
+                                   clock=clock),
+            call_timeout=0.1,
+            journal=journal,
+            name='NS'
+        )
+
+
+def test_degraded_and_reconcile(clock, tmp_path):
+    server = FakeRedis()
+    journal = str(tmp_path)
+    path = os.path.join(journal, f'snapapi.NS.{os.getpid()}.wal')
+
+    async def main():
+        backend = fallback(await server.start(), clock, journal)
+        try:
+            await backend.open()
+            assert await backend.add('A', b'1', 60)
+            server.stall = True
+            # timeout lalu open: tidak ada call ke redis lagi
+            assert await backend.add('X1', b'1', 60)
+            assert backend.breaker.state == OPEN
+            assert await backend.add('X2', b'1', 60)
+            assert await backend.partition_add('NS:1', 'X3', b'1', 60)
+            assert not await backend.add('X1', b'1', 60)
+            assert not await backend.partition_add('NS:1', 'X3', b'1', 60)
+            assert await backend.get('X2') == b'1'
+            assert backend.pending == 3
+            with open(path) as file:
+                assert len(file.readlines()) == 3
+
+            # X2 diambil worker lain selama degraded
+            server.data[b'X2'] = b'1'
+            server.stall = False
+            clock.advance(10)
+            assert await backend.add('B', b'1', 60)
+            assert backend.breaker.state == CLOSED
+            for _ in range(100):
+                if not backend.pending:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await backend.close()
+            await server.stop()
+        return backend.stats()
+
+    stats = asyncio.run(main())
+    assert (stats['reconciled'], stats['reconcile_existing']) == (3, 1)
+    assert stats['fallbacks'] == 3
+    assert b'X1' in server.data and server.data[b'NS:1'] == {b'X3': b'1'}
+    assert 59 <= (server.ttl(b'X1') or 0) <= 60
+    assert not os.path.exists(path)
+
+
+def test_recover_journal(clock, tmp_path):
+    """ Journal worker yang sudah mati dikirim ulang saat `open` """
+    server = FakeRedis()
+    journal = str(tmp_path)
+    process = subprocess.Popen([sys.executable, '-c', ''])
+    process.wait()
+
+    async def main():
+        port = await server.start()
+        try:
+            backend = fallback(port, clock, journal)
+            server.stall = True
+            assert await backend.add('Y1', b'1', 60)
+            await backend.set('Y2', b'done', 60)
+            await backend.close()
+            os.rename(os.path.join(journal, f'snapapi.NS.{os.getpid()}.wal'),
+                      os.path.join(journal, f'snapapi.NS.{process.pid}.wal'))
+
+            server.stall = False
+            backend = fallback(port, clock, journal)
+            await backend.open()
+            assert backend.pending == 0
+            await backend.close()
+        finally:
+            await server.stop()
+        return backend.stats()
+
+    stats = asyncio.run(main())
+    assert stats['reconciled'] == 2
+    assert (server.data[b'Y1'], server.data[b'Y2']) == (b'1', b'done')
+    assert os.listdir(journal) == []
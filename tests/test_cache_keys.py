@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Compact Key
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+import re
+
+import pytest
+
+from snapapi.cache import SNAPCache
+from snapapi.cache.keys import KeyEncoder, short_prefix
+from snapapi.cache.memcached import MemcachedBackend, encode_key
+
+from conftest import FakeMemcached
+
+
+def test_fixed_size():
+    keys = KeyEncoder('snapapi-demo')
+    assert keys.prefix == short_prefix('snapapi-demo')
+    assert len(keys.prefix) == 4 and keys.size == 20
+    for key, partner in (('', ''), ('EXT-1', 'BANKA'),
+                         ('X' * 1000, 'P' * 100), ('ñ \n', '\x00')):
+        encoded = keys.encode(key, partner)
+        assert len(encoded) == 20
+        assert re.fullmatch('[A-Za-z0-9_-]+', encoded)
+        # valid untuk memcached tanpa di-hash lagi
+        assert encode_key(encoded) == encoded.encode()
+        assert encoded == keys.prefix + keys.field(key, partner)
+    assert KeyEncoder('snapapi-demo', 16).size == 26
+    with pytest.raises(AssertionError):
+        KeyEncoder('snapapi-demo', 8)
+
+
+def test_distinct():
+    keys = KeyEncoder('snapapi-demo')
+    encoded = {keys.encode(key, partner) for key, partner in (
+            ('EXT-1', 'BANKA'), ('EXT-1', 'BANKB'), ('BANKAEXT-1', ''),
+            ('EXT-1', ''), ('BANKA', 'EXT-1'))}
+    assert len(encoded) == 5
+    assert KeyEncoder('snapapi-demo').encode('EXT-1', 'BANKA') \
+        == keys.encode('EXT-1', 'BANKA')
+    # namespace lain, termasuk yang lebih dari 64 byte
+    others = [KeyEncoder(namespace).field('EXT-1', 'BANKA')
+              for namespace in ('snapapi-prod', 'N' * 65, 'N' * 66)]
+    assert len(set(others + [keys.field('EXT-1', 'BANKA')])) == 4
+
+
+@pytest.mark.parametrize('partition', [False, True])
+def test_snapcache(clock, partition):
+    server = FakeMemcached(clock)
+    cache = SNAPCache('snapapi-demo', compact_keys=True, partition=partition)
+
+    async def main():
+        cache._cache = MemcachedBackend('127.0.0.1', await server.start())
+        try:
+            await cache.add('EXT-1', ttl=60, partner='BANKA')
+            await cache.add('EXT-1', ttl=60, partner='BANKB')
+            with pytest.raises(ValueError):
+                await cache.add('EXT-1', ttl=60, partner='BANKA')
+            assert await cache.exists('EXT-1', partner='BANKB')
+            await cache.delete('EXT-1', partner='BANKB')
+            assert not await cache.exists('EXT-1', partner='BANKB')
+        finally:
+            await cache.close()
+            await server.stop()
+
+    asyncio.run(main())
+    key = cache.build_key('EXT-1', 'BANKA').encode()
+    if partition:
+        # memcached: partition per key, `{partition}:{field}`
+        key = f"{cache.partition_name()}:"\
+              f"{cache.build_field('EXT-1', 'BANKA')}".encode()
+    assert list(server.data) == [key]
+
+
+def test_without_compact_keys():
+    cache = SNAPCache('snapapi-demo')
+    assert cache.build_key('EXT-1', 'BANKA') == 'snapapi-demoEXT-1'
+    assert cache.build_field('EXT-1', 'BANKA') == 'EXT-1'
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Memcached Backend
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+
+import pytest
+
+from snapapi.cache.base import CacheError
+from snapapi.cache.memcached import MemcachedBackend, encode_key, read_value
+
+from conftest import FakeMemcached
+
+
+def run(server: FakeMemcached, test) -> None:
+    """ `test(backend)` dengan MemcachedBackend ke `server` """
+    async def main():
+        port = await server.start()
+        backend = MemcachedBackend('127.0.0.1', port, timeout=2)
+        try:
+            await test(backend)
+        finally:
+            await backend.close()
+            await server.stop()
+    asyncio.run(main())
+
+
+def test_encode_key():
+    assert encode_key('NS:P1:X1') == b'NS:P1:X1'
+    for key in ('NS:P1:X 1', 'NS:P1:X\n1', 'X' * 251):
+        encoded = encode_key(key)
+        assert encoded.startswith(b'snapapi:')
+        assert len(encoded) <= 250
+        assert encoded == encode_key(key)
+    assert encode_key('X' * 250) == b'X' * 250
+    assert encode_key('NS:P1:X 1') != encode_key('NS:P1:X 2')
+
+
+def test_invalid_keys(clock):
+    """ Key panjang/berspasi tetap bisa dipakai, tanpa CLIENT_ERROR """
+    server = FakeMemcached(clock)
+
+    async def test(backend):
+        for key in ('NS:P1:X 1', 'X' * 300):
+            assert await backend.add(key, b'1', 60)
+            assert not await backend.add(key, b'1', 60)
+            assert await backend.get(key) == b'1'
+            assert await backend.delete(key)
+
+    run(server, test)
+
+
+def test_ttl(clock):
+    server = FakeMemcached(clock)
+
+    async def test(backend):
+        # lebih dari 30 hari dibaca memcached sebagai unix timestamp
+        assert await backend.add('X1', b'1', 86400 * 60)
+        assert await backend.add('X2', b'1', 0)
+        assert await backend.add('X3', b'1', None)
+
+    run(server, test)
+    assert [args[:4] for args in server.commands] == [
+            [b'add', b'X1', b'0', b'2592000'],
+            [b'add', b'X2', b'0', b'1'],
+            [b'add', b'X3', b'0', b'0'],
+        ]
+
+
+@pytest.mark.parametrize('raw, value', [
+        (b'END\r\n', None),
+        (b'VALUE X1 0 4\r\na\r\nb\r\nEND\r\n', b'a\r\nb'),
+    ])
+def test_read_value(raw, value):
+    async def main():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        return await read_value(reader)
+    assert asyncio.run(main()) == value
+
+
+@pytest.mark.parametrize('raw', [
+        b'ERROR\r\n',
+        b'SERVER_ERROR out of memory\r\n',
+        b'VALUE X1 0 1\r\n1\r\nVALUE\r\n',
+        b'STORED\r\n',
+    ])
+def test_read_value_error(raw):
+    async def main():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        await read_value(reader)
+    with pytest.raises(CacheError):
+        asyncio.run(main())
+
+
+def test_error_reply_discards_connection(clock):
+    server = FakeMemcached(clock)
+
+    async def test(backend):
+        assert await backend.add('X1', b'1', 60)
+        with pytest.raises(CacheError):
+            await backend._request(b'bogus\r\n', read_value)
+        assert backend.stats()['discarded'] == 1
+        assert await backend.get('X1') == b'1'
+        assert server.connections == 2
+
+    run(server, test)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Day Partition
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+from datetime import timezone
+
+import pytest
+
+from snapapi.cache import SNAPCache
+from snapapi.cache.memory import MemoryBackend
+from snapapi.cache.redis import RedisBackend
+from snapapi.tools import DayPartition
+
+from conftest import FakeRedis
+
+# clock: 2023-11-15 05:13:20 WIB
+MIDNIGHT = 18 * 3600 + 46 * 60 + 40
+
+
+def test_day_partition(clock):
+    today = DayPartition(clock=clock)
+    assert today.current() == ('20231115', MIDNIGHT)
+    assert today.label(-1) == '20231114'
+    assert today.label(1) == '20231116'
+    clock.advance(MIDNIGHT - 1)
+    assert today.current() == ('20231115', 1)
+    clock.advance(1)
+    assert today.current() == ('20231116', 86400)
+    assert today.seconds_left() == 86400
+    # tidak tergantung timezone server
+    assert DayPartition(timezone.utc, clock=clock).label() == '20231115'
+    clock.now = 1_700_000_000.0
+    assert DayPartition(timezone.utc, clock=clock).label() == '20231114'
+
+
+@pytest.mark.parametrize('name', ['memory', 'redis'])
+def test_rollover(name, clock):
+    server = FakeRedis(clock)
+    cache = SNAPCache('NS', partition=True)
+    cache._today = DayPartition(clock=clock)
+
+    async def main():
+        if name == 'redis':
+            cache._cache = RedisBackend('127.0.0.1', await server.start())
+        else:
+            cache._cache = MemoryBackend(clock=clock)
+        try:
+            await cache.add('EXT-1', partner='P1')
+            # ttl diabaikan, key berlaku sampai tengah malam
+            await cache.add('EXT-2', ttl=60, partner='P1')
+            with pytest.raises(ValueError):
+                await cache.add('EXT-1', partner='P1')
+            assert cache.partition_name() == 'NS:20231115'
+            if name == 'redis':
+                assert server.ttl(b'NS:20231115') == MIDNIGHT
+            clock.advance(3600)
+            assert await cache.exists('EXT-2', partner='P1')
+            assert not await cache.rollover()
+
+            clock.advance(MIDNIGHT - 3600)
+            assert cache.partition_name() == 'NS:20231116'
+            assert not await cache.exists('EXT-1', partner='P1')
+            await cache.add('EXT-1', partner='P1')
+            if name == 'redis':
+                assert server.ttl(b'NS:20231116') == 86400
+                # expiry Redis tidak tepat di tengah malam
+                server.deadlines.pop(b'NS:20231115')
+                assert await cache.rollover()
+            # memory: partition kemarin sudah expired sendiri
+            assert not await cache.rollover()
+            assert await cache.exists('EXT-1', partner='P1')
+        finally:
+            await cache.close()
+            await server.stop()
+
+    asyncio.run(main())
+    if name == 'redis':
+        assert sorted(server.data) == [b'NS:20231116']
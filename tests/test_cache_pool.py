@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Connection Pool
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+
+import pytest
+
+from snapapi.cache.redis import RedisBackend
+
+from conftest import FakeRedis
+
+
+def run(server: FakeRedis, test, **kwargs) -> None:
+    """ `test(backend)` dengan RedisBackend ke `server` """
+    kwargs.setdefault('timeout', 2)
+
+    async def main():
+        port = await server.start()
+        backend = RedisBackend('127.0.0.1', port, **kwargs)
+        try:
+            await test(backend)
+        finally:
+            await backend.close()
+            await server.stop()
+    asyncio.run(main())
+
+
+def test_reuse(clock):
+    server = FakeRedis(clock)
+
+    async def test(backend):
+        for i in range(10):
+            assert await backend.add(f'X{i}', b'1', 60)
+            assert await backend.get(f'X{i}') == b'1'
+        stats = backend.stats()
+        assert (stats['requests'], stats['created']) == (20, 1)
+        assert (stats['size'], stats['idle'], stats['in_use']) == (1, 1, 0)
+
+    run(server, test)
+    assert server.connections == 1
+
+
+def test_pool_size(clock):
+    server = FakeRedis(clock)
+
+    async def test(backend):
+        assert all(await asyncio.gather(*(backend.add(f'X{i}', b'1', 60)
+                                          for i in range(10))))
+        stats = backend.stats()
+        assert (stats['created'], stats['size'], stats['idle']) == (2, 2, 2)
+        assert stats['waits'] == 8
+        assert stats['wait_time_max'] >= stats['wait_time_avg'] > 0
+
+    run(server, test, pool_size=2)
+    assert server.connections == 2
+
+
+def test_open(clock):
+    server = FakeRedis(clock)
+
+    async def test(backend):
+        await backend.open()
+        assert backend.stats()['idle'] == 3
+        await asyncio.gather(*(backend.add(f'X{i}', b'1', 60)
+                               for i in range(3)))
+        assert backend.stats()['created'] == 3
+        await backend.close()
+        assert backend.stats()['size'] == 0
+        # dibuka lagi saat dibutuhkan
+        assert await backend.get('X1') == b'1'
+
+    run(server, test, pool_minsize=3)
+    assert server.connections == 4
+
+
+def test_closed_by_server(clock):
+    server = FakeRedis(clock)
+
+    async def test(backend):
+        assert await backend.add('X1', b'1', 60)
+        server.disconnect()
+        await asyncio.sleep(0.05)
+        assert await backend.get('X1') == b'1'
+        stats = backend.stats()
+        assert (stats['discarded'], stats['health_checks']) == (1, 0)
+        assert (stats['created'], stats['size']) == (2, 1)
+
+    run(server, test)
+    assert server.connections == 2
+
+
+def test_health_check(clock):
+    server = FakeRedis(clock)
+
+    async def test(backend):
+        assert await backend.add('X1', b'1', 60)
+        await asyncio.sleep(0.01)
+        assert await backend.get('X1') == b'1'
+        assert backend.stats()['health_checks'] == 1
+
+    run(server, test, health_check_interval=0)
+    assert [args[0] for args in server.commands] \
+        == [b'SET', b'PING', b'GET']
+    assert server.connections == 1
+
+
+def test_timeout_discards_connection(clock):
+    """ Reply yang terlambat tidak boleh terbaca oleh request berikutnya """
+    server = FakeRedis(clock)
+
+    async def test(backend):
+        assert await backend.add('X1', b'1', 60)
+        server.stall = True
+        with pytest.raises(asyncio.TimeoutError):
+            await backend.get('X1')
+        stats = backend.stats()
+        assert (stats['discarded'], stats['size']) == (1, 0)
+        server.stall = False
+        assert await backend.get('X2') is None
+        assert backend.stats()['created'] == 2
+
+    run(server, test, timeout=0.2)
+    assert server.connections == 2
+
+
+def test_wait_counted_on_timeout(clock):
+    server = FakeRedis(clock)
+    server.stall = True
+
+    async def test(backend):
+        results = await asyncio.gather(
+                backend.get('X1'), backend.get('X2'),
+                return_exceptions=True)
+        assert all(isinstance(result, asyncio.TimeoutError)
+                   for result in results)
+        stats = backend.stats()
+        assert (stats['waits'], stats['size']) == (1, 0)
+        assert stats['wait_time'] > 0
+
+    run(server, test, timeout=0.2, pool_size=1)
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Redis Backend
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+
+import pytest
+
+from snapapi.cache.base import CacheError
+from snapapi.cache.redis import RedisBackend, encode_command, read_reply
+
+from conftest import FakeRedis
+
+
+def run(server: FakeRedis, test) -> None:
+    """ `test(backend)` dengan RedisBackend ke `server` """
+    async def main():
+        port = await server.start()
+        backend = RedisBackend('127.0.0.1', port, timeout=2)
+        try:
+            await test(backend)
+        finally:
+            await backend.close()
+            await server.stop()
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize('nx', [True, False])
+def test_partition_ttl_after_recreate(clock, nx):
+    """
+    Hash partition yang hilang (eviction, FLUSHALL, drop_partition) lalu
+    dibuat ulang oleh add berikutnya tetap dapat TTL
+    """
+    server = FakeRedis(clock, nx=nx)
+
+    async def test(backend):
+        assert await backend.partition_add('NS:1', 'A', b'1', 600)
+        assert 599 <= server.ttl(b'NS:1') <= 600
+        clock.advance(100)
+        assert await backend.partition_add('NS:1', 'B', b'1', 500)
+        assert 499 <= server.ttl(b'NS:1') <= 500
+
+        server.evict(b'NS:1')
+        assert await backend.partition_add('NS:1', 'A', b'1', 400)
+        assert 399 <= server.ttl(b'NS:1') <= 400
+
+        assert await backend.drop_partition('NS:1')
+        assert await backend.partition_add('NS:1', 'A', b'1', 300)
+        assert 299 <= server.ttl(b'NS:1') <= 300
+        assert not await backend.partition_add('NS:1', 'A', b'1', 300)
+
+        clock.advance(300)
+        assert await backend.partition_get('NS:1', 'A') is None
+        assert await backend.partition_add('NS:1', 'A', b'1', 86400)
+        assert server.ttl(b'NS:1') == 86400
+
+    run(server, test)
+    expires = [args for args in server.commands if args[0] == b'EXPIRE']
+    if nx:
+        assert all(args[3:] == [b'NX'] for args in expires)
+    else:
+        # hanya sekali dicoba dengan NX
+        assert [args for args in expires if args[3:]] == [expires[0]]
+
+
+def test_partition_add_one_roundtrip(clock):
+    server = FakeRedis(clock)
+
+    async def test(backend):
+        await backend.partition_add('NS:1', 'A', b'1', 600)
+        await backend.partition_add('NS:1', 'B', b'1', 600)
+        assert backend.stats()['requests'] == 2
+
+    run(server, test)
+    assert [args[0] for args in server.commands] \
+        == [b'HSETNX', b'EXPIRE', b'HSETNX', b'EXPIRE']
+
+
+def test_encode_command():
+    assert encode_command('SET', 'X1', b'\r\n', 60) \
+        == b'*4\r\n$3\r\nSET\r\n$2\r\nX1\r\n$2\r\n\r\n\r\n$2\r\n60\r\n'
+
+
+@pytest.mark.parametrize('raw, reply', [
+        (b'+OK\r\n', b'OK'),
+        (b':42\r\n', 42),
+        (b'$5\r\na\r\nbc\r\n', b'a\r\nbc'),
+        (b'$0\r\n\r\n', b''),
+        (b'$-1\r\n', None),
+    ])
+def test_read_reply(raw, reply):
+    async def main():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        return await read_reply(reader)
+    assert asyncio.run(main()) == reply
+
+
+@pytest.mark.parametrize('raw', [b'-WRONGTYPE Operation\r\n', b'*1\r\n'])
+def test_read_reply_error(raw):
+    async def main():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        await read_reply(reader)
+    with pytest.raises(CacheError):
+        asyncio.run(main())
+
+
+def test_commands(clock):
+    server = FakeRedis(clock)
+
+    async def main():
+        backend = RedisBackend('127.0.0.1', await server.start(),
+                               db=8, password='secret', timeout=2)
+        try:
+            await backend.add('X1', b'1', None)
+            await backend.add('X2', b'1', 0)
+            await backend.set('X3', b'1', 60.7)
+        finally:
+            await backend.close()
+            await server.stop()
+
+    asyncio.run(main())
+    assert server.commands == [
+            [b'AUTH', b'secret'],
+            [b'SELECT', b'8'],
+            [b'SET', b'X1', b'1', b'NX'],
+            # EX 0 ditolak Redis
+            [b'SET', b'X2', b'1', b'NX', b'EX', b'1'],
+            [b'SET', b'X3', b'1', b'EX', b'60'],
+        ]
+
+
+def test_error_reply_discards_connection(clock):
+    server = FakeRedis(clock)
+
+    async def test(backend):
+        assert await backend.add('X1', b'1', 60)
+        with pytest.raises(CacheError):
+            await backend._request(encode_command('BOOM'), read_reply)
+        assert backend.stats()['discarded'] == 1
+        assert await backend.get('X1') == b'1'
+        assert server.connections == 2
+
+    run(server, test)
+
+
+def test_unavailable():
+    async def main():
+        server = await asyncio.start_server(
+                lambda reader, writer: None, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        server.close()
+        await server.wait_closed()
+        backend = RedisBackend('127.0.0.1', port, timeout=2)
+        with pytest.raises(OSError):
+            await backend.add('X1', b'1', 60)
+        assert backend.stats()['size'] == 0
+
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Response Replay
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+
+from typing import List, Union
+
+import pytest
+
+from snapapi.cache import SNAPCache, replay
+from snapapi.cache.base import CacheError
+from snapapi.cache.memory import MemoryBackend
+from snapapi.routing import SNAPRoute
+
+FINGERPRINT = b'f' * 16
+
+
+class RecordingBackend(MemoryBackend):
+    """ MemoryBackend yang mencatat TTL setiap `set` """
+    def __init__(self) -> None:
+        super().__init__()
+        self.ttls: List[Union[int, None]] = []
+
+    async def set(self, key, value, ttl=None):
+        self.ttls.append(ttl)
+        return await super().set(key, value, ttl)
+
+
+def memory_cache() -> SNAPCache:
+    cache = SNAPCache('test')
+    cache._cache = RecordingBackend()
+    return cache
+
+
+async def claim(cache: SNAPCache, key: str, ttl) -> None:
+    """ `add` di dalam request SNAPRoute (context claims) """
+    token = replay.claims.set(set())
+    try:
+        await cache.add(key, ttl=ttl, partner='P1')
+    finally:
+        replay.claims.reset(token)
+
+
+def test_store_keeps_ttl_from_add():
+    cache = memory_cache()
+
+    async def main():
+        await claim(cache, 'X1', 3600)
+        assert await cache.store('X1', FINGERPRINT, 200, b'{}', 'P1')
+    asyncio.run(main())
+    ttl, = cache.cache.ttls
+    assert 3590 <= ttl <= 3600
+
+
+def test_store_without_claim_expires_today():
+    cache = memory_cache()
+    asyncio.run(cache.store('X1', FINGERPRINT, 200, b'{}', 'P1'))
+    ttl, = cache.cache.ttls
+    assert 1 <= ttl <= 86400
+
+
+def test_replay_roundtrip_and_fingerprint():
+    cache = memory_cache()
+
+    async def main():
+        await claim(cache, 'X1', 60)
+        await cache.store('X1', FINGERPRINT, 200, b'{"a":1}', 'P1')
+        assert await cache.replay('X1', FINGERPRINT, 0, 'P1') \
+                == (200, b'{"a":1}')
+        # request lain dengan X-External-Id yang sama
+        assert await cache.replay('X1', b'g' * 16, 0, 'P1') is None
+        assert await cache.replay('X2', FINGERPRINT, 0, 'P1') is None
+    asyncio.run(main())
+
+
+def test_replay_waits_for_first_request():
+    cache = memory_cache()
+
+    async def main():
+        await claim(cache, 'X1', 60)
+        waiting = asyncio.ensure_future(
+                cache.replay('X1', FINGERPRINT, 5, 'P1'))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+        await cache.store('X1', FINGERPRINT, 201, b'ok', 'P1')
+        assert await asyncio.wait_for(waiting, 1) == (201, b'ok')
+        # masih diproses setelah `wait`
+        await claim(cache, 'X2', 60)
+        assert await cache.replay('X2', FINGERPRINT, 0.05, 'P1') is None
+        cache.release('X2', 'P1')
+    asyncio.run(main())
+
+
+def test_replay_rejects_small_shared_value(tmp_path):
+    small = SNAPCache('test', backend='shared',
+                      path=str(tmp_path / 'small.cache'))
+    with pytest.raises(CacheError):
+        small.check_replay()
+    route = SNAPRoute('/x', lambda: None)
+    with pytest.raises(CacheError):
+        route.replay_cache = small
+    small.cache.abort()
+
+    cache = SNAPCache('test', backend='shared', value_size=1024,
+                      path=str(tmp_path / 'replay.cache'))
+    route.replay_cache = cache
+
+    async def main():
+        await claim(cache, 'X1', 60)
+        assert await cache.store('X1', FINGERPRINT, 200, b'{}' * 100, 'P1')
+        assert await cache.replay('X1', FINGERPRINT, 0, 'P1') \
+                == (200, b'{}' * 100)
+    asyncio.run(main())
+    cache.cache.abort()
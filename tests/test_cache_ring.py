@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Consistent Hash Ring
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+from collections import Counter
+from typing import Dict, List
+
+import pytest
+
+from snapapi.cache.base import CacheBackend
+from snapapi.cache.memory import MemoryBackend
+from snapapi.cache.redis import RedisBackend
+from snapapi.cache.ring import HashRing, ShardedBackend
+
+from conftest import FakeRedis
+
+KEYS = [f'NS:P1:EXT-{i}' for i in range(3000)]
+
+
+def test_ring():
+    ring = HashRing(['a', 'b', 'c'])
+    owners = {key: ring.node(key) for key in KEYS}
+    # virtual nodes: sebaran merata
+    counts = Counter(owners.values())
+    assert all(700 < count < 1300 for count in counts.values())
+    for key in KEYS[:100]:
+        preference = ring.preference(key, 3)
+        assert preference[0] == owners[key]
+        assert sorted(preference) == ['a', 'b', 'c']
+    assert len(ring.preference(KEYS[0], 5)) == 3
+
+    ring.add('d')
+    moved = [key for key in KEYS if ring.node(key) != owners[key]]
+    # hanya ~1/4 yang pindah, dan semuanya ke node baru
+    assert 500 < len(moved) < 1000
+    assert {ring.node(key) for key in moved} == {'d'}
+    ring.remove('d')
+    assert all(ring.node(key) == owners[key] for key in KEYS)
+
+    with pytest.raises(LookupError):
+        HashRing().node(KEYS[0])
+
+
+def test_failover(clock):
+    """ Node pemilik mati: replica tetap menolak duplicate """
+    servers = [FakeRedis(clock) for _ in range(3)]
+
+    async def main():
+        backends: Dict[str, CacheBackend] = {}
+        for i, server in enumerate(servers):
+            backends[f'node{i}'] = RedisBackend(
+                    '127.0.0.1', await server.start(), timeout=2)
+        sharded = ShardedBackend(backends, replicas=2, retry_interval=5,
+                                 clock=clock)
+        try:
+            keys = KEYS[:30]
+            for key in keys:
+                assert await sharded.add(key, b'1', 60)
+            # owner dan satu replica
+            assert sum(len(server.data) for server in servers) == 60
+            owners = [sharded.ring.node(key) for key in keys]
+            await servers[0].stop()
+            backends['node0'].abort()
+
+            for key in keys:
+                assert not await sharded.add(key, b'1', 60)
+            assert sharded.stats()['nodes_down'] == 1
+            assert sharded.failovers == owners.count('node0')
+            assert await sharded.add('NEW', b'1', 60)
+
+            clock.advance(5)
+            # dicoba lagi setelah `retry_interval`
+            assert sharded.stats()['nodes_down'] == 0
+            assert not await sharded.add(keys[0], b'1', 60)
+            assert await sharded.delete(keys[0])
+            assert await sharded.get(keys[0]) is None
+        finally:
+            await sharded.close()
+            for server in servers:
+                await server.stop()
+
+    asyncio.run(main())
+
+
+def test_add_node_settle(clock):
+    """ Selama `settle`, key yang pindah pemilik dicek di pemilik lama """
+    backends: Dict[str, CacheBackend] = {
+            node: MemoryBackend(clock=clock) for node in ('a', 'b', 'c')}
+    sharded = ShardedBackend(backends, settle=3600, clock=clock)
+    keys = KEYS[:300]
+
+    async def main() -> List[bool]:
+        for key in keys:
+            assert await sharded.add(key, b'1', 86400)
+        sharded.add_node('d', MemoryBackend(clock=clock))
+        assert not any([await sharded.add(key, b'1', 86400)
+                        for key in keys])
+        clock.advance(3600)
+        return [await sharded.add(key, b'1', 86400) for key in keys]
+
+    added = asyncio.run(main())
+    moved = [key for key in keys if sharded.ring.node(key) == 'd']
+    assert 40 < len(moved) < 110
+    assert sharded.previous_hits == len(moved)
+    # setelah `settle`, pemilik lama tidak dicek lagi
+    assert [key for key, new in zip(keys, added) if new] == moved
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Shared Memory Backend
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+import uuid
+
+import pytest
+
+from snapapi.cache.base import CacheError
+from snapapi.cache.shared import SharedMemoryBackend
+
+DAY = 86400
+
+
+@pytest.fixture
+def backend(tmp_path, clock):
+    backend = SharedMemoryBackend(str(tmp_path / 'snapapi.test.cache'),
+                                  capacity=1 << 14, stripes=16,
+                                  clock=clock)
+    yield backend
+    backend.abort()
+
+
+def test_add_get_delete(backend):
+    async def main():
+        assert await backend.add('X1', b'1', 60)
+        assert not await backend.add('X1', b'2', 60)
+        assert await backend.get('X1') == b'1'
+        assert await backend.exists('X1')
+        await backend.set('X1', b'done', 60)
+        assert await backend.get('X1') == b'done'
+        assert await backend.delete('X1')
+        assert not await backend.delete('X1')
+        assert await backend.get('X1') is None
+        assert await backend.add('X1', b'1', 60)
+    asyncio.run(main())
+    assert backend.stats()['used'] == 1
+
+
+def test_expiry(backend, clock):
+    async def main():
+        assert await backend.add('X1', b'1', 60)
+        clock.advance(59)
+        assert await backend.exists('X1')
+        clock.advance(2)
+        assert not await backend.exists('X1')
+        assert await backend.add('X1', b'1', 60)
+    asyncio.run(main())
+
+
+def test_value_too_large(backend):
+    with pytest.raises(CacheError):
+        asyncio.run(backend.add('X1', b'x' * (backend.value_size + 1)))
+
+
+def test_shared_between_instances(backend, tmp_path, clock):
+    other = SharedMemoryBackend(backend.path, capacity=1 << 14, stripes=16,
+                                clock=clock)
+    try:
+        assert asyncio.run(backend.add('X1', b'1', 60))
+        assert not asyncio.run(other.add('X1', b'1', 60))
+    finally:
+        other.abort()
+    with pytest.raises(CacheError):
+        SharedMemoryBackend(backend.path, capacity=1 << 12, clock=clock)
+
+
+def test_daily_rollover_stays_bounded(backend, clock):
+    """
+    X-External-Id 30% capacity per hari dengan TTL sampai tengah malam:
+    slot hari sebelumnya dipakai ulang, load factor dan panjang probing
+    tidak terus naik
+    """
+    per_day = int(backend.capacity * 0.3)
+
+    async def day() -> None:
+        for _ in range(per_day):
+            assert await backend.add(uuid.uuid4().hex, b'1', DAY)
+
+    for _ in range(10):
+        asyncio.run(day())
+        stats = backend.stats()
+        assert stats['load_factor'] < 0.7, stats
+        assert stats['probe_mean'] < 4, stats
+        backend._probes = backend._lookups = 0
+        clock.advance(DAY)
+
+
+def test_tombstones_rebuild(backend):
+    """ add/delete berulang: tombstone tidak memperpanjang probing """
+    async def main() -> None:
+        for _ in range(20):
+            keys = [uuid.uuid4().hex for _ in range(backend.capacity // 2)]
+            for key in keys:
+                assert await backend.add(key, b'1', DAY)
+            for key in keys:
+                assert await backend.delete(key)
+        backend._probes = backend._lookups = 0
+        for _ in range(1000):
+            assert not await backend.exists(uuid.uuid4().hex)
+
+    asyncio.run(main())
+    stats = backend.stats()
+    assert stats['used'] == 0, stats
+    assert stats['probe_mean'] < 4, stats
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Crypto Execution
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+import threading
+
+import pytest
+
+from snapapi import SNAPCrypto
+from snapapi.security.registry import SNAPKeyRegistry
+
+
+@pytest.fixture
+def crypto():
+    return SNAPCrypto(client_id='XJAPE8888', client_secret='secret',
+                      token_passphrase='passphrase')
+
+
+def test_execution_without_measuring(crypto, monkeypatch):
+    def calibrate(*args, **kwargs):
+        raise AssertionError('calibrate di event loop')
+
+    monkeypatch.setattr(crypto, 'calibrate', calibrate)
+    assert crypto.execution == {
+            'HMAC-SHA512': 'inline',
+            'JWT': 'inline',
+            'SHA256withRSA': 'thread'
+        }
+    crypto.create_executor(max_workers=1)
+    assert crypto.execution['SHA256withRSA'] == 'process'
+    crypto.executor.shutdown()
+
+
+def test_calibrate_off_loop(crypto, monkeypatch):
+    threads = set()
+    verify = crypto._verify_signature_HMAC_SHA512
+
+    def recording_verify(*args):
+        threads.add(threading.get_ident())
+        return verify(*args)
+
+    monkeypatch.setattr(crypto, '_verify_signature_HMAC_SHA512',
+                        recording_verify)
+    registry = SNAPKeyRegistry()
+    registry.register('bank_a', crypto)
+    asyncio.run(registry.warm_up())
+    assert threads and threading.get_ident() not in threads
+    assert crypto._costs is not None
+    assert set(crypto.execution) == {'HMAC-SHA512', 'JWT', 'SHA256withRSA'}
+
+
+def test_precomputed_execution(monkeypatch):
+    execution = {
+            'HMAC-SHA512': 'thread',
+            'JWT': 'thread',
+            'SHA256withRSA': 'inline'
+        }
+    crypto = SNAPCrypto(client_id='XJAPE8888', client_secret='secret',
+                        execution=execution)
+    monkeypatch.setattr(crypto, '_verify_signature_HMAC_SHA512', None)
+    assert crypto.calibrate() == execution
+    assert crypto._costs is None
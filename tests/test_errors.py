@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Error Response
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+from typing import Type
+
+import pytest
+
+from snapapi import SNAPRoute, exceptions
+from snapapi.responses import SNAPResponse
+
+
+@pytest.fixture
+def route():
+    async def endpoint() -> dict:
+        return {}
+
+    route = SNAPRoute('/snap/v1.0/transfer-va/inquiry', endpoint,
+                      methods=['POST'])
+    route.service_code = '24'
+    return route
+
+
+def baseline(route: SNAPRoute, error: exceptions.SNAPException
+             ) -> SNAPResponse:
+    """ Render per error seperti sebelum di-render sekali per route """
+    responseMessage = error.message
+    if error.additional_message:
+        responseMessage += ' '
+        responseMessage += error.additional_message
+    return SNAPResponse(
+            status_code=error.status_code,
+            content=dict(
+                responseCode=f'{error.status_code}{route.service_code}'
+                             f'{error.case_code}',
+                responseMessage=responseMessage
+            ))
+
+
+def build(error_class: Type[exceptions.SNAPException]
+          ) -> exceptions.SNAPException:
+    try:
+        return error_class()
+    except TypeError:
+        # misal InvalidFieldFormat('[X-Partner-Id]')
+        return error_class('[X-Partner-Id]')
+
+
+def same(response: SNAPResponse, expected: SNAPResponse) -> None:
+    assert response.status_code == expected.status_code
+    assert response.body == expected.body
+    # X-TIMESTAMP berbeda waktu
+    assert [header for header in response.raw_headers
+            if header[0] != b'x-timestamp'] \
+        == [header for header in expected.raw_headers
+            if header[0] != b'x-timestamp']
+    assert response.headers['x-timestamp']
+
+
+@pytest.mark.parametrize('error_class', exceptions.exception_classes(),
+                         ids=lambda error_class: error_class.__name__)
+def test_prerendered(route, error_class, monkeypatch):
+    rendered = []
+    from_rendered = SNAPResponse.from_rendered.__func__
+
+    def recording(cls, template):
+        rendered.append(template)
+        return from_rendered(cls, template)
+
+    monkeypatch.setattr(SNAPResponse, 'from_rendered',
+                        classmethod(recording))
+    error = build(error_class)
+    response = route.error_response(error)
+    same(response, baseline(route, error))
+    # message di instance: render ulang
+    assert bool(rendered) == ('message' not in vars(error))
+    if rendered:
+        assert response is not rendered[0]
+        response.headers['x-timestamp'] = 'now'
+        assert rendered[0].headers['x-timestamp'] != 'now'
+
+
+def test_instance_message(route):
+    error = exceptions.BadRequest()
+    error.message = 'Bad Request Partner'
+    error.additional_message = '[amount]'
+    response = route.error_response(error)
+    same(response, baseline(route, error))
+    assert response.body \
+        == b'{"responseCode":"4002400","responseMessage":'\
+           b'"Bad Request Partner [amount]"}'
+    # message class tidak berubah
+    same(route.error_response(exceptions.BadRequest()),
+         baseline(route, exceptions.BadRequest()))
+
+
+def test_service_code(route):
+    response = route.error_response(exceptions.TransactionConflict())
+    assert response.body.startswith(b'{"responseCode":"40924')
+    route.service_code = '25'
+    response = route.error_response(exceptions.TransactionConflict())
+    assert response.body.startswith(b'{"responseCode":"40925')
+    same(response, baseline(route, exceptions.TransactionConflict()))
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Crypto Executor
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+import gc
+import os
+
+import pytest
+from Crypto.PublicKey import RSA
+
+from snapapi import SNAPCrypto
+from snapapi.security.executor import (
+        SNAPCryptoExecutor, ExecutorClosed, _ping
+    )
+from snapapi.security.registry import SNAPKeyRegistry
+
+
+@pytest.fixture
+def executor():
+    executor = SNAPCryptoExecutor(max_workers=2)
+    yield executor
+    executor.shutdown()
+
+
+def test_pool_not_started_lazily(executor):
+    assert executor.pool is None
+    assert executor.pool is None
+
+
+def test_first_submit_does_not_block_loop(executor):
+    async def main():
+        ticks = 0
+        done = asyncio.Event()
+
+        async def heartbeat():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.ensure_future(heartbeat())
+        await asyncio.sleep(0)
+        pids = await asyncio.gather(*(executor.submit(_ping)
+                                      for _ in range(4)))
+        done.set()
+        await task
+        return ticks, pids
+
+    ticks, pids = asyncio.run(main())
+    # spawn process makan waktu, event loop tetap jalan selama itu
+    assert ticks > 2
+    assert os.getpid() not in pids
+    assert executor.pool is not None
+
+
+def test_start_async_once(executor, monkeypatch):
+    started = []
+    start = executor.start
+
+    def counting_start():
+        started.append(1)
+        start()
+
+    monkeypatch.setattr(executor, 'start', counting_start)
+
+    async def main():
+        await asyncio.gather(*(executor.start_async() for _ in range(4)))
+        await executor.submit(_ping)
+
+    asyncio.run(main())
+    assert started == [1]
+
+
+def test_submit_after_shutdown(executor):
+    executor.shutdown(wait=False)
+    assert executor.closed
+
+    async def main():
+        with pytest.raises(ExecutorClosed):
+            await executor.submit(_ping)
+        with pytest.raises(ExecutorClosed):
+            await executor.start_async()
+
+    asyncio.run(main())
+    assert executor.pool is None
+
+
+def test_reload_keeps_executor_open(executor):
+    async def main():
+        await executor.submit(_ping)
+        executor.reload()
+        assert executor.pool is None
+        await executor.submit(_ping)
+
+    asyncio.run(main())
+    assert not executor.closed
+    assert executor.pool is not None
+
+
+def test_rotate_while_request_pending(monkeypatch):
+    """
+    SNAPCrypto lama dilepas saat request masih antri di executor-nya:
+    request tetap selesai (di thread pool), pool lama tidak dibuat lagi
+    """
+    key = RSA.generate(1024)
+    message = b'XJAPE8888|2025-01-03T14:06:47.798+07:00'
+    signature = SNAPCrypto(private_key=key.export_key()).create_signature(
+            message, algorithm='SHA256withRSA').encode()
+
+    def build() -> SNAPCrypto:
+        crypto = SNAPCrypto(
+                client_id='XJAPE8888',
+                client_secret='secret',
+                public_cert=key.publickey().export_key(),
+                execution={'SHA256withRSA': 'process'}
+            )
+        crypto.create_executor(max_workers=1, max_queue=1)
+        return crypto
+
+    registry = SNAPKeyRegistry()
+    old = registry.register('bank_a', build())
+    executor = old.executor
+    assert executor is not None
+    starts = []
+    start = executor.start
+
+    def counting_start():
+        starts.append(1)
+        start()
+
+    monkeypatch.setattr(executor, 'start', counting_start)
+
+    async def main():
+        await registry.start_executors()
+        requests = [asyncio.ensure_future(old.verify_signature_async(
+                        message=message,
+                        signature=signature,
+                        algorithm='SHA256withRSA'))
+                    for _ in range(3)]
+        while executor.pending < 3:
+            await asyncio.sleep(0)
+        # rotasi: SNAPCrypto baru, yang lama dilepas
+        registry.register('bank_a', build())
+        return await asyncio.gather(*requests)
+
+    try:
+        assert asyncio.run(main()) == [None, None, None]
+    finally:
+        registry.shutdown()
+    assert starts == [1]
+    assert executor.closed and executor.pool is None
+
+
+def test_per_loop_state_released(executor):
+    """ Lock/Semaphore loop yang sudah ditutup tidak dipakai loop baru """
+    async def main():
+        await executor.start_async()
+        await executor.submit(_ping)
+
+    for _ in range(3):
+        asyncio.run(main())
+        gc.collect()
+        assert len(executor._locks) == 0
+        assert len(executor._semaphores) == 0
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: HMAC-SHA512
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import base64
+import hashlib
+import hmac
+
+import pytest
+
+from snapapi import SNAPCrypto
+from snapapi.exceptions import InvalidSignature
+
+SECRETS = [None, b'', 'secret', 'rahasia-ñ', b'\x00\xff' * 10,
+           b'k' * 127, b'k' * 128, b'k' * 129, b'k' * 300]
+MESSAGES = [b'', b'POST:/snap/v1.0/transfer-va/inquiry', b'\x00' * 1000]
+
+
+def raw(secret) -> bytes:
+    if secret is None:
+        return b''
+    return secret if isinstance(secret, bytes) else secret.encode()
+
+
+@pytest.mark.parametrize('secret', SECRETS, ids=[
+        f'{type(secret).__name__}-{secret and len(secret)}'
+        for secret in SECRETS])
+def test_precomputed_hmac(secret):
+    """ Sama dengan `hmac.digest` untuk semua panjang key """
+    crypto = SNAPCrypto(client_id='BANKA', client_secret=secret)
+    for message in MESSAGES:
+        expected = hmac.digest(raw(secret), message, hashlib.sha512)
+        assert crypto._digest_HMAC_SHA512(message) == expected
+        # state precompute tidak berubah setelah dipakai
+        assert crypto._digest_HMAC_SHA512(message) == expected
+        if not message:
+            continue
+        signature = crypto.create_signature(
+                message, algorithm='HMAC-SHA512')
+        assert base64.b64decode(signature) == expected
+        crypto.verify_signature(message=message, signature=signature,
+                                algorithm='HMAC-SHA512')
+
+
+def test_secret_rotated():
+    crypto = SNAPCrypto(client_id='BANKA', client_secret='old')
+    signature = crypto.create_signature(b'message', algorithm='HMAC-SHA512')
+    crypto.client_secret = b'k' * 200
+    assert crypto._digest_HMAC_SHA512(b'message') \
+        == hmac.digest(b'k' * 200, b'message', hashlib.sha512)
+    with pytest.raises(InvalidSignature):
+        crypto.verify_signature(message=b'message', signature=signature,
+                                algorithm='HMAC-SHA512')
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Log Queue
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+from typing_extensions import Annotated
+from fastapi import APIRouter, Body, Request
+from fastapi.testclient import TestClient
+from starlette.responses import Response as StarletteResponse
+
+from snapapi import SNAPAPI, SNAPRoute
+from snapapi.logger import (
+        SNAPLog, SNAPLogQueue, SNAPLogRecord, DROP, DROP_OLDEST, BLOCK
+    )
+
+
+class Record:
+    """ Pengganti SNAPLogRecord """
+    def __init__(self, number: int) -> None:
+        self.number = number
+
+    def build(self) -> Dict[str, Any]:
+        return {'number': self.number}
+
+
+class Backend:
+    """ Backend log, menunggu `gate` dibuka """
+    def __init__(self) -> None:
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.batches: List[List[int]] = []
+
+    async def __call__(self, logs: Any) -> None:
+        await self.gate.wait()
+        if isinstance(logs, dict):
+            logs = [logs]
+        self.batches.append([log['number'] for log in logs])
+
+
+def test_batch_size():
+    async def main():
+        backend = Backend()
+        queue = SNAPLogQueue(backend, batch_size=10, batch_interval=5)
+        for number in range(25):
+            assert await queue.put(Record(number))
+        await asyncio.sleep(0.05)
+        assert [len(batch) for batch in backend.batches] == [10, 10]
+        await queue.close()
+        assert [len(batch) for batch in backend.batches] == [10, 10, 5]
+        assert sum(backend.batches, []) == list(range(25))
+        return queue.stats()
+
+    stats = asyncio.run(main())
+    assert (stats['delivered'], stats['batches'], stats['depth']) \
+        == (25, 3, 0)
+
+
+def test_batch_interval():
+    async def main():
+        backend = Backend()
+        queue = SNAPLogQueue(backend, batch_size=100, batch_interval=0.05)
+        for number in range(3):
+            await queue.put(Record(number))
+        await asyncio.sleep(0.2)
+        assert backend.batches == [[0, 1, 2]]
+        await queue.close()
+
+    asyncio.run(main())
+
+
+def test_without_batch():
+    async def main():
+        backend = Backend()
+        queue = SNAPLogQueue(backend, batch=False, batch_size=2)
+        for number in range(3):
+            await queue.put(Record(number))
+        await queue.close()
+        assert backend.batches == [[0], [1], [2]]
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize('policy, delivered', [
+        (DROP, [0, 1, 2, 3, 4, 5]),
+        (DROP_OLDEST, [0, 5, 6, 7, 8, 9]),
+        (BLOCK, [0, 1, 2, 3, 4, 5]),
+    ])
+def test_policy(policy, delivered):
+    """ Backend lambat: maksimal `maxsize` record menunggu """
+    async def main():
+        backend = Backend()
+        backend.gate.clear()
+        queue = SNAPLogQueue(backend, batch_size=1, maxsize=5,
+                             policy=policy, block_timeout=0.01)
+        assert await queue.put(Record(0))
+        # record 0 sedang dikirim
+        await asyncio.sleep(0.01)
+        results = [await queue.put(Record(number))
+                   for number in range(1, 10)]
+        assert results == [True] * 5 + [policy == DROP_OLDEST] * 4
+        stats = queue.stats()
+        assert (stats['depth'], stats['depth_max']) == (5, 5)
+        backend.gate.set()
+        await queue.close()
+        assert sum(backend.batches, []) == delivered
+        return queue.stats()
+
+    stats = asyncio.run(main())
+    assert (stats['enqueued'], stats['dropped']) \
+        == (6 + 4 * (policy == DROP_OLDEST), 4)
+    assert stats['delivered'] == 6
+
+
+def test_block_waits():
+    """ Request menunggu tempat kosong, tidak dibuang """
+    async def main():
+        backend = Backend()
+        backend.gate.clear()
+        queue = SNAPLogQueue(backend, batch_size=1, maxsize=1,
+                             policy=BLOCK, block_timeout=5)
+        await queue.put(Record(0))
+        await asyncio.sleep(0.01)
+        await queue.put(Record(1))
+        put = asyncio.ensure_future(queue.put(Record(2)))
+        await asyncio.sleep(0.05)
+        assert not put.done()
+        backend.gate.set()
+        assert await put
+        await queue.close()
+        assert backend.batches == [[0], [1], [2]]
+        assert queue.stats()['dropped'] == 0
+
+    asyncio.run(main())
+
+
+def test_backend_error():
+    async def main():
+        async def backend(logs):
+            raise RuntimeError('log server down')
+
+        queue = SNAPLogQueue(backend)
+        assert await queue.put(Record(0))
+        await queue.close()
+        return queue.stats()
+
+    stats = asyncio.run(main())
+    assert (stats['errors'], stats['delivered'], stats['batches']) \
+        == (1, 0, 1)
+
+
+def test_record_from_route():
+    """ Record hanya menyalin yang dibutuhkan `build`, bukan Request """
+    records: List[SNAPLogRecord] = []
+    backend = Backend()
+
+    class LoggedRoute(SNAPRoute):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.logger = SNAPLog(namespace='NS', service_code='24',
+                                  queue=queue)
+
+    async def put(record):
+        records.append(record)
+        return await SNAPLogQueue.put(queue, record)
+
+    queue = SNAPLogQueue(backend, batch_size=1)
+    queue.put = put
+    router = APIRouter(route_class=LoggedRoute)
+
+    @router.post('/snap/v1.0/transfer-va/inquiry')
+    async def inquiry(body: Annotated[Dict[str, Any], Body()]) -> dict:
+        return {'name': body['name']}
+
+    app = SNAPAPI()
+    app.include_router(router)
+    with TestClient(app) as client:
+        response = client.post(
+                '/snap/v1.0/transfer-va/inquiry?a=1',
+                headers={'User-Agent': 'bank-a', 'X-PARTNER-ID': 'BANKA'},
+                content='{"name": "Jörg"}'.encode())
+    assert response.status_code == 200
+
+    record, = records
+    for slot in SNAPLogRecord.__slots__:
+        assert not isinstance(getattr(record, slot),
+                              (Request, StarletteResponse))
+    log = record.build()
+    assert (log['namespace'], log['service_code'], log['status_code']) \
+        == ('NS', '24', 200)
+    assert log['user_agent'] == 'bank-a'
+    assert log['remote_addr'] == 'testclient'
+    assert log['response_time'] >= 0
+    assert log['request']['request_method'] == 'POST'
+    assert log['request']['request_url'] \
+        == 'http://testserver/snap/v1.0/transfer-va/inquiry?a=1'
+    assert log['request']['request_headers']['x-partner-id'] == 'BANKA'
+    assert log['request']['request_body'] == '{"name": "Jörg"}'
+    assert log['response']['response_datetime'] \
+        == response.headers['x-timestamp']
+    assert log['response']['response_body'] == response.text
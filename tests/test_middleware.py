@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Middleware
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Dict, List, Tuple
+
+from typing_extensions import Annotated
+from fastapi import APIRouter, Body, Request
+from starlette.types import Message
+
+from snapapi import SNAPAPI, SNAPCrypto, SNAPRoute
+from snapapi.exceptions import InvalidSignature
+from snapapi.middleware import SNAPBodyDigestMiddleware
+from snapapi.tools import minify_json
+
+PATH = '/snap/v1.0/transfer-va/inquiry'
+TIMESTAMP = '2025-01-03T14:06:47.798+07:00'
+BODY = b'{ "partnerServiceId" : "  88899",\n "amount": { "value": "1.50",'\
+       b' "currency" : "IDR" }, "name": "J\\u00f6rg  \\" }" }'
+
+crypto = SNAPCrypto(client_id='BANKA', client_secret='secret')
+
+
+def build_app() -> SNAPAPI:
+    router = APIRouter(route_class=SNAPRoute)
+
+    @router.post(PATH)
+    async def inquiry(
+            body: Annotated[Dict[str, Any], Body()],
+            request: Request
+        ) -> dict:
+        # body sudah diterima lengkap oleh SNAPRoute
+        digest = request.state.x_body_digest
+        assert digest == hashlib.sha256(
+                minify_json(request.state.x_body)).hexdigest()
+        try:
+            crypto.verify_signature_transactional(
+                    path=PATH,
+                    access_token='token',
+                    request_headers=dict(request.headers),
+                    request_body_digest=digest
+                )
+        except InvalidSignature:
+            return {'valid': False, 'digest': digest}
+        return {'valid': True, 'digest': digest}
+
+    app = SNAPAPI()
+    app.include_router(router)
+    app.add_middleware(SNAPBodyDigestMiddleware)
+    return app
+
+
+def call(app: SNAPAPI, chunks: List[bytes], signature: str
+         ) -> Tuple[int, Any]:
+    """ Body dikirim per chunk """
+    scope = {
+            'type': 'http', 'asgi': {'version': '3.0'},
+            'http_version': '1.1', 'method': 'POST', 'scheme': 'http',
+            'path': PATH, 'raw_path': PATH.encode(), 'query_string': b'',
+            'root_path': '', 'client': ('127.0.0.1', 50000),
+            'server': ('test', 80),
+            'headers': [(b'content-type', b'application/json'),
+                        (b'x-timestamp', TIMESTAMP.encode()),
+                        (b'x-signature', signature.encode())]
+        }
+    messages: List[Message] = [
+            {'type': 'http.request', 'body': chunk,
+             'more_body': index < len(chunks) - 1}
+            for index, chunk in enumerate(chunks)]
+    sent: List[Message] = []
+
+    async def receive() -> Message:
+        return messages.pop(0)
+
+    async def send(message: Message) -> None:
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    body = b''.join(message.get('body', b'') for message in sent[1:])
+    return sent[0]['status'], json.loads(body)
+
+
+def test_body_digest():
+    digest = hashlib.sha256(minify_json(BODY)).hexdigest()
+    signature = crypto.create_signature(
+            f'POST:{PATH}:token:{digest}:{TIMESTAMP}'.encode(),
+            algorithm='HMAC-SHA512')
+    app = build_app()
+    # potong di tengah string, escape dan whitespace
+    for chunks in ([BODY], [BODY[:1], BODY[1:40], BODY[40:]],
+                   [BODY[i:i + 7] for i in range(0, len(BODY), 7)],
+                   [b''] + [BODY[i:i + 1] for i in range(len(BODY))]):
+        status, body = call(app, chunks, signature)
+        assert status == 200
+        assert body == {'valid': True, 'digest': digest}
+
+    status, body = call(app, [BODY.replace(b'1.50', b'1.5')], signature)
+    assert body['valid'] is False
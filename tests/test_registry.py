@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Key Registry
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+import threading
+import time
+from typing import List
+
+import pytest
+from typing_extensions import Annotated
+from fastapi import APIRouter, Depends, Header
+from fastapi.testclient import TestClient
+
+from snapapi import SNAPAPI, SNAPCrypto, SNAPRoute
+from snapapi.exceptions import AccessDenied
+from snapapi.model.virtual_account.inquiry import InquiryHeader
+from snapapi.security.registry import SNAPKeyRegistry
+
+
+@pytest.fixture
+def registry():
+    registry = SNAPKeyRegistry()
+    for namespace, client_id in (('bank_a', 'BANKA'), ('bank_b', 'BANKB')):
+        registry.register(namespace, SNAPCrypto(
+                client_id=client_id, client_secret=f'{client_id}secret'))
+    return registry
+
+
+def test_lookup_oauth2(registry):
+    headers = {'X-CLIENT-KEY': 'BANKA', 'X-PARTNER-ID': 'BANKB'}
+    assert registry.lookup_oauth2(headers).client_id == 'BANKA'
+    with pytest.raises(AccessDenied):
+        registry.lookup_oauth2({'X-PARTNER-ID': 'BANKB'})
+
+
+def test_lookup_transactional(registry):
+    # X-CLIENT-KEY tidak menentukan Partner di request Transactional
+    headers = {'X-CLIENT-KEY': 'BANKA', 'X-PARTNER-ID': 'BANKB'}
+    assert registry.lookup_transactional(headers).client_id == 'BANKB'
+    assert registry.lookup_transactional(
+            {'x_partner_id': 'BANKA'}).client_id == 'BANKA'
+    for headers in ({'X-CLIENT-KEY': 'BANKA'}, {'X-PARTNER-ID': 'NOPE'}):
+        with pytest.raises(AccessDenied):
+            registry.lookup_transactional(headers)
+
+
+def test_missing_partner_id_is_bad_request(registry):
+    """ Seperti demo: dependency lookup Partner dari X-PARTNER-ID """
+    async def partner(x_partner_id: Annotated[str, Header()]) -> str:
+        crypto = registry.lookup_transactional(
+                {'x-partner-id': x_partner_id})
+        return str(crypto.client_id)
+
+    router = APIRouter(route_class=SNAPRoute)
+
+    @router.post('/snap/v1.0/transfer-va/inquiry')
+    async def inquiry(
+            client_id: Annotated[str, Depends(partner)],
+            headers: Annotated[InquiryHeader, Header()]
+        ) -> dict:
+        return {'client_id': client_id}
+
+    app = SNAPAPI()
+    app.include_router(router)
+    headers = {
+            'Content-Type': 'application/json',
+            'X-TIMESTAMP': '2025-01-03T14:06:47.798+07:00',
+            'X-SIGNATURE': 'signature',
+            'X-EXTERNAL-ID': '12345678901234567890',
+            'CHANNEL-ID': '95231'
+        }
+    client = TestClient(app)
+    response = client.post('/snap/v1.0/transfer-va/inquiry',
+                           headers=headers, content=b'{}')
+    assert response.status_code == 400
+    assert response.json()['responseMessage'] \
+        == 'Missing Mandatory Field [X-Partner-Id]'
+
+    response = client.post('/snap/v1.0/transfer-va/inquiry',
+                           headers=dict(headers, **{'X-PARTNER-ID': 'NOPE'}),
+                           content=b'{}')
+    assert response.status_code == 401
+
+    response = client.post('/snap/v1.0/transfer-va/inquiry',
+                           headers=dict(headers, **{'X-PARTNER-ID': 'BANKB'}),
+                           content=b'{}')
+    assert response.json() == {'client_id': 'BANKB'}
+
+
+def test_watch_reload_off_loop(registry, monkeypatch):
+    """ `reload` (baca file, import key) tidak menahan event loop """
+    threads: List[int] = []
+
+    def reload() -> bool:
+        threads.append(threading.get_ident())
+        time.sleep(0.05)
+        if len(threads) == 1:
+            raise ValueError('cert rusak')
+        return False
+
+    monkeypatch.setattr(registry, 'reload', reload)
+
+    async def main() -> int:
+        ticks = 0
+        watcher = registry.start(interval=0.001)
+        while len(threads) < 3:
+            # event loop tetap jalan selama reload
+            await asyncio.sleep(0.005)
+            ticks += 1
+        registry.shutdown()
+        assert watcher.cancelled() or not watcher.done()
+        return ticks
+
+    loop_thread = threading.get_ident()
+    assert asyncio.run(main()) >= 10
+    # reload pertama gagal, watcher tetap jalan
+    assert len(threads) >= 3
+    assert loop_thread not in threads
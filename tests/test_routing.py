@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Routing
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+import json
+from typing import Any, Dict, List, Tuple
+
+import pytest
+import starlette.requests
+from typing_extensions import Annotated
+from fastapi import APIRouter, Body, Form, Request
+from starlette.types import Message
+
+from snapapi import SNAPAPI, SNAPRoute, tools
+
+PATH = '/snap/v1.0/transfer-va/inquiry'
+
+
+@pytest.fixture
+def app():
+    router = APIRouter(route_class=SNAPRoute)
+
+    @router.post(PATH)
+    async def inquiry(
+            body: Annotated[Dict[str, Any], Body()],
+            request: Request
+        ) -> dict:
+        assert request.state.x_body_json == body
+        return {'keys': sorted(body)}
+
+    app = SNAPAPI()
+    app.include_router(router)
+    return app
+
+
+def call(
+        app: SNAPAPI,
+        messages: List[Message],
+        content_type: bytes = b'application/json'
+    ) -> Tuple[int, Any]:
+    """ Request langsung ke ASGI app, `messages` dari `receive` """
+    scope = {
+            'type': 'http', 'asgi': {'version': '3.0'},
+            'http_version': '1.1', 'method': 'POST', 'scheme': 'http',
+            'path': PATH, 'raw_path': PATH.encode(), 'query_string': b'',
+            'root_path': '', 'client': ('127.0.0.1', 50000),
+            'server': ('test', 80),
+            'headers': [(b'content-type', content_type)]
+        }
+    sent: List[Message] = []
+
+    async def receive() -> Message:
+        if not messages:
+            # stream sudah habis: ASGI server menunggu disconnect
+            raise AssertionError('receive() setelah body selesai')
+        return messages.pop(0)
+
+    async def send(message: Message) -> None:
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    body = b''.join(message.get('body', b'') for message in sent[1:])
+    return sent[0]['status'], json.loads(body)
+
+
+def request(body: bytes) -> List[Message]:
+    return [{'type': 'http.request', 'body': body, 'more_body': False}]
+
+
+def test_body_parsed_once(app, monkeypatch):
+    async def parse(self):
+        raise AssertionError('body diparse ulang oleh Starlette')
+
+    monkeypatch.setattr(starlette.requests.Request, 'json', parse)
+    status, body = call(app, request(b'{"b": 1, "a": [1, 2]}'))
+    assert status == 200
+    assert body == {'keys': ['a', 'b']}
+
+
+def test_invalid_json(app):
+    status, body = call(app, request(b'{"a": '))
+    assert status == 400
+    assert body['responseCode'].startswith('400')
+
+
+def test_deep_body(app, monkeypatch):
+    # json.loads (tanpa orjson) RecursionError
+    monkeypatch.setattr(tools, 'has_orjson', False)
+    status, body = call(app, request(b'[' * 100000 + b']' * 100000))
+    assert status == 400
+    assert body['responseMessage'] == 'Bad Request'
+
+
+def test_client_disconnect(app):
+    status, body = call(app, [
+            {'type': 'http.request', 'body': b'{"a"', 'more_body': True},
+            {'type': 'http.disconnect'}
+        ])
+    assert status == 400
+    assert body['responseMessage'] == 'Bad Request'
+
+
+def test_form():
+    """ Body Form sudah dibaca `parse_body`, `form()` tidak baca ulang """
+    pytest.importorskip('python_multipart')
+    router = APIRouter(route_class=SNAPRoute)
+
+    @router.post(PATH)
+    async def inquiry(
+            name: Annotated[str, Form()],
+            request: Request
+        ) -> dict:
+        assert request.state.x_body == b'name=BANK+A&x=1'
+        assert request.state.x_body_json is None
+        return {'name': name}
+
+    app = SNAPAPI()
+    app.include_router(router)
+    status, body = call(app, [
+            {'type': 'http.request', 'body': b'name=BANK+A',
+             'more_body': True},
+            {'type': 'http.request', 'body': b'&x=1', 'more_body': False}
+        ], b'application/x-www-form-urlencoded')
+    assert status == 200
+    assert body == {'name': 'BANK A'}
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: OAuth2 Signature Cache
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+from datetime import datetime
+
+import pytest
+from Crypto.PublicKey import RSA
+
+from snapapi import SNAPCrypto
+from snapapi.exceptions import InvalidSignature
+from snapapi.security.cache import SNAPSignatureCache
+from snapapi.tools import WIB
+
+
+def timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, WIB).isoformat(
+            timespec='milliseconds')
+
+
+@pytest.fixture
+def cache(clock):
+    return SNAPSignatureCache(ttl=60, skew=300, clock=clock)
+
+
+def test_ttl(cache, clock):
+    now = clock()
+    cache.remember(b'BANKA|now', b'signature', timestamp(now))
+    # X-TIMESTAMP hampir lewat skew: umur cache dipotong
+    cache.remember(b'BANKA|old', b'signature', timestamp(now - 280))
+    clock.advance(19.9)
+    assert cache.verified(b'BANKA|old', b'signature')
+    clock.advance(0.1)
+    assert not cache.verified(b'BANKA|old', b'signature')
+    clock.advance(39.9)
+    assert cache.verified(b'BANKA|now', b'signature')
+    clock.advance(0.1)
+    assert not cache.verified(b'BANKA|now', b'signature')
+
+    # sudah lewat skew, atau tidak bisa diparse: tidak disimpan
+    cache.remember(b'BANKA|stale', b'signature', timestamp(now - 400))
+    cache.remember(b'BANKA|bad', b'signature', 'kemarin')
+    assert len(cache) == 0
+
+
+def test_different_triple(cache, clock):
+    cache.remember(b'BANKA|t1', b'signature', timestamp(clock()))
+    assert cache.verified(b'BANKA|t1', b'signature')
+    assert not cache.verified(b'BANKA|t1', b'signature2')
+    assert not cache.verified(b'BANKA|t2', b'signature')
+    assert not cache.verified(b'BANKB|t1', b'signature')
+    # tanpa separator, (message, signature) tidak bisa digeser
+    assert not cache.verified(b'BANKA|t', b'1signature')
+
+
+def test_create_access_token(clock, monkeypatch):
+    key = RSA.generate(1024)
+    signer = SNAPCrypto(private_key=key.export_key())
+    crypto = SNAPCrypto(
+            client_id='BANKA',
+            client_secret='secret',
+            token_passphrase='passphrase',
+            public_cert=key.publickey().export_key(),
+            signature_cache=SNAPSignatureCache(clock=clock)
+        )
+    verified = []
+    verify = crypto.verify_signature
+
+    def counting_verify(**kwargs):
+        verified.append(kwargs['message'])
+        return verify(**kwargs)
+
+    monkeypatch.setattr(crypto, 'verify_signature', counting_verify)
+
+    def headers(seconds: float, signature: str = '') -> dict:
+        message = f'BANKA|{timestamp(seconds)}'.encode()
+        return {
+                'X-CLIENT-KEY': 'BANKA',
+                'X-TIMESTAMP': timestamp(seconds),
+                'X-SIGNATURE': signature or signer.create_signature(
+                    message, algorithm='SHA256withRSA')
+            }
+
+    first = headers(clock())
+    for _ in range(3):
+        assert crypto.create_access_token(request_headers=first)
+    assert len(verified) == 1
+
+    crypto.create_access_token(request_headers=headers(clock() + 1))
+    assert len(verified) == 2
+    tampered = headers(clock(), signature=first['X-SIGNATURE'][:-4] + 'AAA=')
+    for _ in range(2):
+        with pytest.raises(InvalidSignature):
+            crypto.create_access_token(request_headers=tampered)
+    assert len(verified) == 4
+
+    # rotasi key: cache dikosongkan
+    crypto.public_cert = RSA.generate(1024).publickey().export_key()
+    with pytest.raises(InvalidSignature):
+        crypto.create_access_token(request_headers=first)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: String to Sign
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import hashlib
+import json
+
+import pytest
+
+from snapapi import SNAPCrypto
+from snapapi.exceptions import InvalidSignature
+from snapapi.tools import JSONMinifier, minify_json
+
+PATH = '/snap/v1.0/transfer-va/inquiry'
+TIMESTAMP = '2025-01-03T14:06:47.798+07:00'
+
+BODIES = [
+        # escape non-ASCII dan format angka apa adanya
+        (b'{ "name" : "J\\u00f6rg",\n\t"amount": 1.50, "rate": 1E+5,'
+         b' "zero": -0.0, "id": 12345678901234567890 }',
+         b'{"name":"J\\u00f6rg","amount":1.50,"rate":1E+5,'
+         b'"zero":-0.0,"id":12345678901234567890}'),
+        # whitespace dan escape di dalam string tetap
+        (b'{"info" : "  Caf\xc3\xa9 \\" , \\\\", "x" : [ 1 , "\\t" ] }\r\n',
+         b'{"info":"  Caf\xc3\xa9 \\" , \\\\","x":[1,"\\t"]}'),
+        (b'{ }', b'{}'),
+        (b'{"a":1}', b'{"a":1}'),
+        (b'', b''),
+    ]
+
+
+@pytest.mark.parametrize('body, minified', BODIES)
+def test_minify_json(body, minified):
+    assert minify_json(body) == minified
+    assert minify_json(bytearray(body)) == minified
+
+
+@pytest.mark.parametrize('body, minified', BODIES)
+def test_minifier_chunks(body, minified):
+    """ Sama dengan `minify_json` untuk setiap cara potong chunk """
+    for i in range(len(body) + 1):
+        for j in range(i, len(body) + 1):
+            minifier = JSONMinifier()
+            chunks = (body[:i], body[i:j], body[j:])
+            assert b''.join(minifier.feed(memoryview(chunk))
+                            for chunk in chunks) == minified
+    minifier = JSONMinifier()
+    assert b''.join(minifier.feed(body[i:i + 1])
+                    for i in range(len(body))) == minified
+
+
+def digest(crypto: SNAPCrypto, body) -> bytes:
+    message = crypto.encode_string_to_sign(
+            path=PATH, timestamp=TIMESTAMP, request_body=body,
+            http_method='post', access_token='token')
+    return message.split(b':')[3]
+
+
+def sha256(data: bytes) -> bytes:
+    return hashlib.sha256(data).hexdigest().encode()
+
+
+def test_request_body():
+    crypto = SNAPCrypto(client_id='BANKA', client_secret='secret')
+    body, minified = BODIES[0]
+    assert digest(crypto, body) == sha256(minified)
+    # dict: json.dumps, escape dan angka bisa berbeda dari yang dikirim
+    assert digest(crypto, {'a': 1}) == digest(crypto, b'{ "a": 1 }')
+    assert digest(crypto, json.loads(body)) != sha256(minified)
+    # tanpa body
+    for empty in (None, b'', {}):
+        assert digest(crypto, empty) == sha256(b'')
+    # raw bytes selalu sesuai yang dikirim
+    assert digest(crypto, b'{ }') == sha256(b'{}')
+    with pytest.raises(TypeError):
+        digest(crypto, '{}')
+    # digest dari middleware menggantikan body
+    assert crypto.encode_string_to_sign(
+            path=PATH, timestamp=TIMESTAMP, request_body=b'ignored',
+            http_method='POST', request_body_digest='abc'
+        ) == f'POST:{PATH}::abc:{TIMESTAMP}'.encode()
+
+
+def test_verify_raw_body():
+    """ Partner sign body asli (escape non-ASCII, 1.50), bukan hasil parse """
+    crypto = SNAPCrypto(client_id='BANKA', client_secret='secret')
+    body, minified = BODIES[0]
+    message = f'POST:{PATH}:token:'.encode() + sha256(minified) \
+        + f':{TIMESTAMP}'.encode()
+    headers = {
+            'X-TIMESTAMP': TIMESTAMP,
+            'X-SIGNATURE': crypto.create_signature(
+                message, algorithm='HMAC-SHA512')
+        }
+    crypto.verify_signature_transactional(
+            path=PATH, access_token='token', request_headers=headers,
+            request_body=body)
+    with pytest.raises(InvalidSignature):
+        crypto.verify_signature_transactional(
+                path=PATH, access_token='token', request_headers=headers,
+                request_body=json.loads(body))
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Access Token Engine
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import string
+
+import pytest
+
+from snapapi.security.token import CompactTokenEngine
+
+from conftest import Clock
+
+CHARACTERS = string.ascii_letters + string.digits + '-_+/=. '
+
+
+@pytest.fixture
+def engine(clock):
+    return CompactTokenEngine(b'passphrase', kid=2, clock=clock)
+
+
+def issue(engine: CompactTokenEngine, clock: Clock) -> str:
+    """ Token yang berisi '-' atau '_', bentuk base64 biasanya beda """
+    iat = int(clock())
+    while True:
+        token = engine.encode(iat=iat, exp=iat + 900)
+        if '-' in token or '_' in token:
+            return token
+        iat += 1
+
+
+def test_round_trip(engine, clock):
+    token = issue(engine, clock)
+    assert len(token) == CompactTokenEngine.TOKEN_LENGTH
+    claims = engine.decode(token)
+    assert claims['exp'] - claims['iat'] == 900
+    clock.advance(claims['exp'] - clock())
+    with pytest.raises(ValueError):
+        engine.decode(token)
+
+
+def test_standard_base64_alias_rejected(engine, clock):
+    token = issue(engine, clock)
+    alias = token.replace('-', '+').replace('_', '/')
+    assert alias != token
+    with pytest.raises(ValueError, match='format'):
+        engine.decode(alias)
+
+
+def test_single_string_per_token(engine, clock):
+    """ Setiap karakter diganti: tidak ada string lain yang valid """
+    token = issue(engine, clock)
+    for index, original in enumerate(token):
+        for character in CHARACTERS:
+            if character == original:
+                continue
+            forged = token[:index] + character + token[index + 1:]
+            with pytest.raises(ValueError):
+                engine.decode(forged)
+    with pytest.raises(ValueError):
+        engine.decode(token + '=')
+
+
+def test_rotated_kid(clock):
+    old = CompactTokenEngine(b'old', kid=1, clock=clock)
+    new = CompactTokenEngine(b'new', kid=2, keys={1: b'old'}, clock=clock)
+    iat = int(clock())
+    token = old.encode(iat=iat, exp=iat + 60)
+    assert new.decode(token) == {'iat': iat, 'exp': iat + 60}
+    with pytest.raises(ValueError):
+        CompactTokenEngine(b'new', kid=2, clock=clock).decode(token)
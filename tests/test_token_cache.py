@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Access Token Cache
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import pytest
+
+from snapapi import SNAPCrypto
+from snapapi.exceptions import InvalidTokenB2B
+from snapapi.security.cache import SNAPTokenCache
+from snapapi.security.token import CompactTokenEngine
+
+
+@pytest.fixture
+def cache(clock):
+    return SNAPTokenCache(maxsize=2, clock=clock)
+
+
+def test_expiry_at_exp(cache, clock):
+    cache.add('A', clock() + 10)
+    clock.advance(9.999)
+    assert cache.get('A')
+    clock.advance(0.001)
+    # tepat di `exp` sudah tidak valid
+    assert not cache.get('A')
+    assert len(cache) == 0
+    cache.add('B', clock())
+    assert len(cache) == 0
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['expired']) == (1, 1, 1)
+    assert stats['hit_rate'] == 0.5
+
+
+def test_purge_on_add(cache, clock):
+    cache.add('A', clock() + 5)
+    cache.add('B', clock() + 60)
+    clock.advance(5)
+    cache.add('C', clock() + 60)
+    # A expired dibuang, bukan B yang di-evict
+    assert (len(cache), cache.evicted, cache.expired) == (2, 0, 1)
+    assert cache.get('B') and cache.get('C')
+
+
+def test_lru(cache, clock):
+    cache.add('A', clock() + 60)
+    cache.add('B', clock() + 60)
+    assert cache.get('A')
+    cache.add('C', clock() + 60)
+    assert (len(cache), cache.evicted) == (2, 1)
+    assert not cache.get('B')
+    assert cache.get('A') and cache.get('C')
+    # heap tetap dibatasi walaupun token terus diganti
+    for i in range(100):
+        cache.add(f'T{i}', clock() + 60)
+    assert len(cache._expiry) <= cache.maxsize * 2 + 1
+    cache.clear()
+    assert cache.stats()['size'] == 0
+
+
+def test_verify_access_token_cached(clock, monkeypatch):
+    engine = CompactTokenEngine(b'passphrase', clock=clock)
+    crypto = SNAPCrypto(client_id='BANKA', client_secret='secret',
+                        token_passphrase='passphrase', token_engine=engine,
+                        token_cache=SNAPTokenCache(clock=clock))
+    token = engine.encode(iat=int(clock()), exp=int(clock()) + 900)
+    decoded = []
+    decode = engine.decode
+
+    def counting_decode(token):
+        decoded.append(token)
+        return decode(token)
+
+    monkeypatch.setattr(engine, 'decode', counting_decode)
+    for _ in range(3):
+        crypto.verify_access_token(token)
+    assert len(decoded) == 1
+    assert crypto.token_cache is not None
+    assert crypto.token_cache.stats()['hits'] == 2
+
+    clock.advance(900)
+    with pytest.raises(InvalidTokenB2B):
+        crypto.verify_access_token(token)
+    assert len(decoded) == 2
+    with pytest.raises(InvalidTokenB2B):
+        crypto.verify_access_token(token + 'A')
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Validation Error
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import asyncio
+import json
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+import pytest
+from fastapi import APIRouter, Body, Header
+from fastapi.exceptions import RequestValidationError
+from fastapi.testclient import TestClient
+from typing_extensions import Annotated, Literal
+
+from snapapi import SNAPAPI, SNAPRoute, exceptions
+from snapapi.model.virtual_account.inquiry import (
+        InquiryHeader, InquiryRequest
+    )
+
+PATH = '/snap/v1.0/transfer-va/inquiry'
+
+HEADERS = {
+        'Content-Type': 'application/json',
+        'X-TIMESTAMP': '2024-01-01T10:00:00+07:00',
+        'X-SIGNATURE': 'signature',
+        'X-PARTNER-ID': '88899',
+        'X-EXTERNAL-ID': '1234567890',
+        'CHANNEL-ID': '95221',
+    }
+
+BODY = {
+        'partnerServiceId': '   88899',
+        'customerNo': '12345678901234567890',
+        'virtualAccountNo': '   8889912345678901234567890',
+        'inquiryRequestId': 'abcdef-123456-abcdef',
+    }
+
+
+class JSONHeader(InquiryHeader):
+    content_type: Literal['application/json']
+
+
+def baseline(exc: RequestValidationError) -> exceptions.SNAPException:
+    """ `parse_validation_exception` sebelum ada `ValidationTranslator` """
+    tmp = defaultdict(list)
+    for e in exc.errors():
+        tmp[e['type']].append(e)
+
+    def _get_location(error: dict) -> str:
+        location: str = ''
+        try:
+            location = error['loc'][0] == 'header' \
+                and error['loc'][1].replace('_', '-').title() \
+                or error['loc'][1].replace('_', '-')
+        except:
+            pass
+        return location
+
+    if list(filter(lambda e:
+            e['type'] == 'literal_error' \
+            and e['loc'][0] == 'header' \
+            and e['loc'][1] == 'content_type',
+            exc.errors()
+        )):
+        return exceptions.BadRequest('Content Type Should Be JSON')
+    error_fields = []
+    error_values = []
+    for error_type, errors in tmp.items():
+        if error_type == 'missing':
+            error_fields += list(map(_get_location, errors))
+        else:
+            error_values += list(map(_get_location, errors))
+    if error_fields:
+        return exceptions.MissingMandatoryField(
+                f"[{', '.join(error_fields)}]")
+    elif error_values:
+        return exceptions.InvalidFieldFormat(f"[{', '.join(error_values)}]")
+    return exceptions.BadRequest()
+
+
+@pytest.fixture
+def app():
+    router = APIRouter(route_class=SNAPRoute)
+
+    @router.post(PATH)
+    async def inquiry(
+            headers: Annotated[JSONHeader, Header()],
+            body: Annotated[InquiryRequest, Body()]
+        ) -> dict:
+        return {}
+
+    app = SNAPAPI()
+    app.include_router(router)
+    return app
+
+
+def translate(app: SNAPAPI, headers: Dict[str, str], body: Any
+              ) -> Tuple[Any, ...]:
+    """ Request ke route, hasil `translate` dan baseline dari error asli """
+    route = next(route for route in app.routes
+                 if isinstance(route, SNAPRoute))
+    translated: List[Tuple[Any, ...]] = []
+    original = route.validation.translate
+
+    def record(errors: Any) -> exceptions.SNAPException:
+        error: exceptions.SNAPException = original(errors)
+        expected = baseline(RequestValidationError(errors))
+        translated.append((result(error), result(expected)))
+        return error
+
+    route.validation.translate = record  # type: ignore[method-assign]
+    content = body if isinstance(body, bytes) else json.dumps(body)
+    response = TestClient(app).post(PATH, headers=headers, content=content)
+    assert response.status_code == 400
+    assert len(translated) == 1
+    return translated[0]
+
+
+def result(error: exceptions.SNAPException) -> Tuple[Any, ...]:
+    return type(error), str(error), error.message, error.additional_message
+
+
+def without(data: Dict[str, Any], *keys: str) -> Dict[str, Any]:
+    return {key: value for key, value in data.items() if key not in keys}
+
+
+CASES = {
+        'missing_header': (without(HEADERS, 'X-SIGNATURE', 'CHANNEL-ID'),
+                           BODY),
+        'missing_body': (HEADERS, without(BODY, 'customerNo',
+                                          'inquiryRequestId')),
+        'missing_both': (without(HEADERS, 'X-EXTERNAL-ID'),
+                         without(BODY, 'virtualAccountNo')),
+        'no_body': (HEADERS, b''),
+        'wrong_type': (HEADERS, dict(BODY, partnerServiceId=88899,
+                                     channelCode='BCA')),
+        'wrong_format': (dict(HEADERS, **{'X-PARTNER-ID': '1'}),
+                         dict(BODY, customerNo='1' * 30)),
+        'missing_and_format': (without(HEADERS, 'X-SIGNATURE'),
+                               dict(BODY, customerNo='1' * 30)),
+        'content_type': (dict(HEADERS, **{'Content-Type': 'text/plain'}),
+                         without(BODY, 'customerNo')),
+    }
+
+
+@pytest.mark.parametrize('case', CASES)
+def test_translate(app, case):
+    error, expected = translate(app, *CASES[case])
+    assert error == expected
+
+
+def test_translate_types(app):
+    """ Contoh hasil, supaya perbandingan di atas tidak kosong """
+    results = {case: translate(app, *CASES[case])[0] for case in CASES}
+    assert results['missing_header'][0] \
+        is exceptions.MissingMandatoryField
+    assert results['missing_header'][1] \
+        == 'Missing Mandatory Field [X-Signature, Channel-Id]'
+    assert results['missing_body'][1] \
+        == 'Missing Mandatory Field [customerNo, inquiryRequestId]'
+    assert results['missing_both'][1] \
+        == 'Missing Mandatory Field [X-External-Id, virtualAccountNo]'
+    assert results['no_body'][1] == 'Missing Mandatory Field []'
+    assert results['wrong_type'][0] is exceptions.InvalidFieldFormat
+    assert results['wrong_type'][1] \
+        == 'Invalid Field Format [partnerServiceId, channelCode]'
+    assert results['wrong_format'][1] \
+        == 'Invalid Field Format [X-Partner-Id, customerNo]'
+    assert results['missing_and_format'][1] \
+        == 'Missing Mandatory Field [X-Signature]'
+    assert results['content_type'][0] is exceptions.BadRequest
+    assert results['content_type'][1] == 'Content Type Should Be JSON'
+
+
+def test_parse_validation_exception(app):
+    """ Fungsi module-level tetap sama dengan baseline """
+    errors = [
+            dict(type='missing', loc=('header', 'x_signature')),
+            dict(type='string_type', loc=('body', 'partnerServiceId')),
+            dict(type='literal_error', loc=('header', 'content_type')),
+        ]
+    for errors_ in (errors[:1], errors[1:2], errors, []):
+        exc = RequestValidationError(errors_)
+        error = asyncio.run(exceptions.parse_validation_exception(exc))
+        expected = baseline(exc)
+        assert result(error) == result(expected)
+
+
+def test_shared_field_once():
+    """ Beda dengan baseline: field endpoint + dependency disebut sekali """
+    errors = [
+            dict(type='missing', loc=('header', 'x_partner_id')),
+            dict(type='missing', loc=('header', 'x_partner_id')),
+            dict(type='missing', loc=('body', 'customerNo')),
+        ]
+    error = exceptions.ValidationTranslator().translate(errors)
+    assert str(error) == 'Missing Mandatory Field [X-Partner-Id, customerNo]'
+    assert str(baseline(RequestValidationError(errors))) \
+        == 'Missing Mandatory Field [X-Partner-Id, X-Partner-Id, customerNo]'
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# SNAP-API Tests: Verify Many
+# Author: S Deta Harvianto <sdetta@gmail.com>
+
+import base64
+from typing import Any, List, Tuple
+
+import pytest
+from Crypto.PublicKey import RSA
+
+from snapapi import SNAPCrypto
+from snapapi.security.crypto import (
+        VERIFY_ERROR, VERIFY_INVALID, VERIFY_VALID
+    )
+
+PATH = '/snap/v1.0/transfer-va/inquiry'
+TIMESTAMP = '2025-01-03T14:06:47.798+07:00'
+ACCESS_TOKEN = 'gp9HjjEj813Y9JGoqwOeOPWbnt4CUpvIJbU1mMU4a11MNDZ7Sg5u9a'
+BODY = b'{"partnerServiceId": "   12345", "customerNo": "1"}'
+SECRET = 'secretsecretsecretsecret'
+
+
+@pytest.fixture(scope='module')
+def key():
+    return RSA.generate(1024)
+
+
+def sign(signer: SNAPCrypto, algorithm: Any, body: bytes,
+         http_method: str = 'POST') -> str:
+    signature: str = signer.create_signature_transactional(
+            http_method=http_method,
+            path=PATH,
+            timestamp=TIMESTAMP,
+            request_body=body,
+            access_token=ACCESS_TOKEN,
+            algorithm=algorithm
+        )
+    return signature
+
+
+def records(signer: SNAPCrypto, algorithm: Any
+            ) -> List[Tuple[Any, int]]:
+    """ (record, hasil yang diharapkan), termasuk yang bukan `RECORD` """
+    signature = sign(signer, algorithm, BODY)
+    tampered = bytearray(base64.b64decode(signature))
+    tampered[-1] ^= 1
+    headers = {'X-TIMESTAMP': TIMESTAMP, 'X-SIGNATURE': signature}
+    return [
+            ((PATH, 'POST', ACCESS_TOKEN, headers, BODY), VERIFY_VALID),
+            # body, path, token atau signature diubah
+            ((PATH, 'POST', ACCESS_TOKEN, headers, BODY + b' '),
+             VERIFY_VALID),
+            ((PATH, 'POST', ACCESS_TOKEN, headers, BODY[:-1] + b', "a": 1}'),
+             VERIFY_INVALID),
+            ((PATH + '/', 'POST', ACCESS_TOKEN, headers, BODY),
+             VERIFY_INVALID),
+            ((PATH, 'POST', ACCESS_TOKEN[::-1], headers, BODY),
+             VERIFY_INVALID),
+            ((PATH, 'POST', ACCESS_TOKEN,
+              dict(headers, **{'X-SIGNATURE':
+                               base64.b64encode(tampered).decode()}),
+              BODY),
+             VERIFY_INVALID),
+            # base64 rusak
+            ((PATH, 'POST', ACCESS_TOKEN,
+              dict(headers, **{'X-SIGNATURE': signature[:-3]}), BODY),
+             VERIFY_INVALID),
+            ((PATH, 'POST', ACCESS_TOKEN,
+              dict(headers, **{'X-SIGNATURE': '!@#$%^&*'}), BODY),
+             VERIFY_INVALID),
+            # header tidak lengkap atau record rusak
+            ((PATH, 'POST', ACCESS_TOKEN,
+              {'X-SIGNATURE': signature}, BODY),
+             VERIFY_ERROR),
+            ((PATH, 'POST', ACCESS_TOKEN,
+              {'X-TIMESTAMP': TIMESTAMP}, BODY),
+             VERIFY_ERROR),
+            ((PATH, 'POST', ACCESS_TOKEN, None, BODY), VERIFY_ERROR),
+            ((PATH, 'POST', ACCESS_TOKEN, headers, 'bukan bytes'),
+             VERIFY_ERROR),
+            # tanpa body, header lowercase
+            ((PATH, 'GET', ACCESS_TOKEN,
+              {'x-timestamp': TIMESTAMP,
+               'x-signature': sign(signer, algorithm, b'', 'GET')},
+              None),
+             VERIFY_VALID),
+            ((PATH, 'POST', ACCESS_TOKEN, headers, BODY), VERIFY_VALID),
+        ]
+
+
+@pytest.mark.parametrize('algorithm', ['HMAC-SHA512', 'SHA256withRSA'])
+@pytest.mark.parametrize('executor', [False, True])
+def test_verify_many(key, algorithm, executor, monkeypatch):
+    signer = SNAPCrypto(private_key=key.export_key(), client_secret=SECRET)
+    crypto = SNAPCrypto(public_cert=key.publickey().export_key(),
+                        client_secret=SECRET)
+    chunks: List[int] = []
+    if executor:
+        pool = crypto.create_executor(max_workers=1)
+        verify = pool.verify_many_SHA256withRSA
+
+        def counted(items: Any, chunksize: int = 64) -> bytes:
+            chunks.append(len(items))
+            verified: bytes = verify(items, chunksize=chunksize)
+            return verified
+
+        monkeypatch.setattr(pool, 'verify_many_SHA256withRSA', counted)
+    try:
+        cases = records(signer, algorithm)
+        # chunksize kecil: hasil dari beberapa chunk tetap urut
+        results = crypto.verify_many((record for record, _ in cases),
+                                     algorithm=algorithm, chunksize=3)
+    finally:
+        if crypto.executor is not None:
+            crypto.executor.shutdown()
+    assert list(results) == [expected for _, expected in cases]
+    # RSA: record yang bisa diparse dikirim ke process pool
+    assert chunks == (executor and algorithm == 'SHA256withRSA'
+                      and [10] or [])